@@ -71,6 +71,41 @@ CREATE TABLE IF NOT EXISTS billing (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Daily revenue rollup, kept current by the trigger below (src/models/revenue.py)
+CREATE TABLE IF NOT EXISTS revenue_daily (
+    revenue_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    insurer TEXT NOT NULL,
+    bill_count INTEGER NOT NULL DEFAULT 0,
+    amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (revenue_date, status, doctor_id, insurer)
+);
+
+CREATE OR REPLACE FUNCTION billing_revenue_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO revenue_daily (revenue_date, status, doctor_id, insurer, bill_count, amount)
+        VALUES (OLD.service_date, COALESCE(OLD.status, ''), COALESCE((SELECT doctor_id FROM appointments WHERE appointment_id = OLD.appointment_id), 0), COALESCE(OLD.insurance_info, ''), -1, -OLD.amount)
+        ON CONFLICT (revenue_date, status, doctor_id, insurer) DO UPDATE SET
+            bill_count = revenue_daily.bill_count + excluded.bill_count,
+            amount = revenue_daily.amount + excluded.amount;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO revenue_daily (revenue_date, status, doctor_id, insurer, bill_count, amount)
+        VALUES (NEW.service_date, COALESCE(NEW.status, ''), COALESCE((SELECT doctor_id FROM appointments WHERE appointment_id = NEW.appointment_id), 0), COALESCE(NEW.insurance_info, ''), +1, +NEW.amount)
+        ON CONFLICT (revenue_date, status, doctor_id, insurer) DO UPDATE SET
+            bill_count = revenue_daily.bill_count + excluded.bill_count,
+            amount = revenue_daily.amount + excluded.amount;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS billing_revenue_rollup ON billing;
+CREATE TRIGGER billing_revenue_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF service_date, amount, status, appointment_id, insurance_info ON billing
+    FOR EACH ROW EXECUTE FUNCTION billing_revenue_rollup();
+
 CREATE TABLE IF NOT EXISTS inventory (
     item_id SERIAL PRIMARY KEY,
     item_name VARCHAR(100) NOT NULL,
@@ -82,13 +117,58 @@ CREATE TABLE IF NOT EXISTS inventory (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Row change log behind ETags and the in-memory indexes, appended to by the
+-- triggers below (src/models/changes.py)
+CREATE TABLE IF NOT EXISTS row_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(50) NOT NULL,
+    row_id INTEGER NOT NULL,
+    tx BIGINT NOT NULL,
+    changed_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_row_changes_table_tx ON row_changes(table_name, tx);
+
+CREATE OR REPLACE FUNCTION log_row_change() RETURNS trigger AS $$
+DECLARE
+    changed jsonb := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+BEGIN
+    INSERT INTO row_changes (table_name, row_id, tx, changed_at)
+    VALUES (TG_TABLE_NAME, (changed ->> TG_ARGV[0])::integer, txid_current(), now() AT TIME ZONE 'utc');
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS patients_row_changes ON patients;
+CREATE TRIGGER patients_row_changes AFTER INSERT OR UPDATE OR DELETE ON patients
+    FOR EACH ROW EXECUTE FUNCTION log_row_change('patient_id');
+
+DROP TRIGGER IF EXISTS doctors_row_changes ON doctors;
+CREATE TRIGGER doctors_row_changes AFTER INSERT OR UPDATE OR DELETE ON doctors
+    FOR EACH ROW EXECUTE FUNCTION log_row_change('doctor_id');
+
+DROP TRIGGER IF EXISTS appointments_row_changes ON appointments;
+CREATE TRIGGER appointments_row_changes AFTER INSERT OR UPDATE OR DELETE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION log_row_change('appointment_id');
+
+DROP TRIGGER IF EXISTS inventory_row_changes ON inventory;
+CREATE TRIGGER inventory_row_changes AFTER INSERT OR UPDATE OR DELETE ON inventory
+    FOR EACH ROW EXECUTE FUNCTION log_row_change('item_id');
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(first_name, last_name);
+-- Trigram indexes behind the fuzzy name search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_patients_name_trgm ON patients USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_doctors_name_trgm ON doctors USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_doctors_specialization ON doctors(specialization);
-CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date);
+-- Dashboard panels count appointments over a date range; status rides along
+CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date) INCLUDE (status);
 CREATE INDEX IF NOT EXISTS idx_appointments_patient_doctor ON appointments(patient_id, doctor_id);
+-- Doctor calendars and booking overlap checks scan these by time range
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date ON appointments(doctor_id, appointment_date) INCLUDE (status);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_date ON appointments(patient_id, appointment_date);
 CREATE INDEX IF NOT EXISTS idx_medical_records_patient ON medical_records(patient_id);
 CREATE INDEX IF NOT EXISTS idx_prescriptions_patient ON prescriptions(patient_id);
+CREATE INDEX IF NOT EXISTS idx_billing_patient ON billing(patient_id);
 
 -- Create admin user for the application
 DO $$ 
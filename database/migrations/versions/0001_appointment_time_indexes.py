@@ -0,0 +1,35 @@
+"""Index appointments by doctor and by patient over time
+
+Doctor calendars and the booking overlap check read one doctor's (or one
+patient's) appointments in a time range. On PostgreSQL the doctor index
+also carries status, so calendars filtered by status stay in the index, and
+both are built CONCURRENTLY so bookings keep flowing meanwhile.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Replaces the plain index create_all() made on newer databases
+        op.drop_index("idx_appointments_doctor_date", table_name="appointments", if_exists=True, postgresql_concurrently=True)
+        op.create_index(
+            "idx_appointments_doctor_date", "appointments", ["doctor_id", "appointment_date"],
+            postgresql_include=["status"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "idx_appointments_patient_date", "appointments", ["patient_id", "appointment_date"],
+            if_not_exists=True, postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_appointments_patient_date", table_name="appointments", postgresql_concurrently=True)
+        op.drop_index("idx_appointments_doctor_date", table_name="appointments", postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""Daily revenue rollup maintained by billing triggers
+
+Creates revenue_daily, installs the triggers that keep it current (see
+src/models/revenue.py) and fills it from the existing bills.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.models.revenue import POSTGRES_TRIGGER, REBUILD_SQL, SQLITE_TRIGGER
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "revenue_daily",
+        sa.Column("revenue_date", sa.Date(), primary_key=True),
+        sa.Column("status", sa.String(20), primary_key=True),
+        sa.Column("doctor_id", sa.Integer(), primary_key=True),
+        sa.Column("insurer", sa.Text(), primary_key=True),
+        sa.Column("bill_count", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False),
+        if_not_exists=True
+    )
+    triggers = POSTGRES_TRIGGER if op.get_bind().dialect.name == "postgresql" else SQLITE_TRIGGER
+    for statement in triggers + REBUILD_SQL:
+        op.execute(statement)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS billing_revenue_rollup ON billing")
+        op.execute("DROP FUNCTION IF EXISTS billing_revenue_rollup()")
+    else:
+        for name in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS billing_revenue_{name}")
+    op.drop_table("revenue_daily")
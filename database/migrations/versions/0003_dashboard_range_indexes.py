@@ -0,0 +1,29 @@
+"""Index appointments for dashboard date ranges
+
+The dashboard filters every panel by a date range across all doctors. The
+appointment_date index carries status so range counts stay in the index,
+and is built CONCURRENTLY.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Replaces the plain index init.sql made on older databases
+        op.drop_index("idx_appointments_date", table_name="appointments", if_exists=True, postgresql_concurrently=True)
+        op.create_index(
+            "idx_appointments_date", "appointments", ["appointment_date"],
+            postgresql_include=["status"], postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_appointments_date", table_name="appointments", postgresql_concurrently=True)
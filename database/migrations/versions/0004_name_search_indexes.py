@@ -0,0 +1,47 @@
+"""Name search indexes for patients and doctors
+
+Patient and doctor search by full name reads a pg_trgm GIN index on
+PostgreSQL, built CONCURRENTLY so registrations keep flowing meanwhile, and
+an FTS5 trigram table kept in sync by triggers on SQLite (see
+src/models/search.py), filled from the existing rows.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+from src.models.search import postgres_name_search, sqlite_name_search
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = (("patients", "patient_id"), ("doctors", "doctor_id"))
+
+def drop_sqlite_name_search(name: str) -> None:
+    for trigger in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}_fts_{trigger}")
+    op.execute(f"DROP TABLE IF EXISTS {name}_fts")
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            for name, _ in TABLES:
+                op.execute(postgres_name_search(name, concurrently=True))
+    else:
+        for name, pk in TABLES:
+            # Rebuilt from scratch: the contentless table cannot be refilled in place
+            drop_sqlite_name_search(name)
+            for statement in sqlite_name_search(name, pk):
+                op.execute(statement)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, _ in TABLES:
+                op.drop_index(f"idx_{name}_name_trgm", table_name=name, postgresql_concurrently=True)
+    else:
+        for name, _ in TABLES:
+            drop_sqlite_name_search(name)
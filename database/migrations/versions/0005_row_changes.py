@@ -0,0 +1,44 @@
+"""Row change log behind ETags and the in-memory indexes
+
+Creates row_changes and installs the triggers that append to it on every
+write to patients, doctors, appointments and inventory (see
+src/models/changes.py).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.models.changes import POSTGRES_TRIGGERS, SQLITE_TRIGGERS, TRACKED_TABLES
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "row_changes",
+        sa.Column("change_id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("tx", sa.BigInteger(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        if_not_exists=True
+    )
+    op.create_index("idx_row_changes_table_tx", "row_changes", ["table_name", "tx"], if_not_exists=True)
+    triggers = POSTGRES_TRIGGERS if op.get_bind().dialect.name == "postgresql" else SQLITE_TRIGGERS
+    for statement in triggers:
+        op.execute(statement)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for name in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}_row_changes ON {name}")
+        op.execute("DROP FUNCTION IF EXISTS log_row_change()")
+    else:
+        for name in TRACKED_TABLES:
+            for trigger in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {name}_changes_{trigger}")
+    op.drop_table("row_changes")
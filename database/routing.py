@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Callable, List, Optional
+from sqlalchemy import Select, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+class ReplicaSet:
+    """
+    Read replicas handed out round-robin, skipping replicas that are down.
+
+    A replica is pinged before use at most every `check_interval` seconds;
+    one that fails is skipped for `retry_after` seconds. When every replica
+    is down, reads fall back to the primary.
+
+    For `max_lag` seconds after a session tracked by track() commits a
+    write, reads go to the primary as well, so this process never reads
+    back (and caches or tags with a fresh ETag) a row the replicas have not
+    caught up with yet. Replicas lagging more than `max_lag` can still serve
+    stale reads after that.
+    """
+
+    def __init__(
+        self, engines: List[Engine], check_interval: float = 10.0, retry_after: float = 30.0,
+        max_lag: float = 0.0, timer: Callable[[], float] = time.monotonic
+    ):
+        self.engines = engines
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.max_lag = max_lag
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._next = 0
+        self._checked_at = [float("-inf")] * len(engines)
+        self._down_until = [float("-inf")] * len(engines)
+        self._wrote_at = float("-inf")
+
+    def _rotation(self) -> List[int]:
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.engines)
+        return [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+
+    def _healthy(self, index: int) -> bool:
+        now = self.timer()
+        if now < self._down_until[index]:
+            return False
+        if now - self._checked_at[index] < self.check_interval:
+            return True
+        try:
+            with self.engines[index].connect():
+                pass
+        except DBAPIError:
+            self._down_until[index] = now + self.retry_after
+            return False
+        self._checked_at[index] = now
+        return True
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None when there is none or a write is too recent"""
+        if self.timer() - self._wrote_at < self.max_lag:
+            return None
+        for index in (self._rotation() if self.engines else []):
+            if self._healthy(index):
+                return self.engines[index]
+        return None
+
+    def track(self, session_class=Session) -> None:
+        """Note the commits of writes by every session created from `session_class`"""
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "do_orm_execute", self._do_orm_execute)
+        event.listen(session_class, "after_commit", self._after_commit)
+        event.listen(session_class, "after_rollback", self._after_rollback)
+
+    @staticmethod
+    def _after_flush(session, flush_context):
+        session.info["replica_lag_write"] = True
+
+    @staticmethod
+    def _do_orm_execute(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info["replica_lag_write"] = True
+
+    def _after_commit(self, session):
+        if session.info.pop("replica_lag_write", False):
+            self._wrote_at = self.timer()
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop("replica_lag_write", None)
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary.
+
+    The replica is picked on the first query and kept for the session, so a
+    request sees one consistent snapshot. Once the session flushes or runs
+    an INSERT/UPDATE/DELETE it stays on the primary, so reads after a write
+    in the same request see that write. Raw SQL (text()) is only sent to a
+    replica when the session is `read_only`.
+
+    Rows read from a replica may lag the primary by up to the replica set's
+    `max_lag`; `reads_replica` tells callers that keep rows beyond the
+    request (the entity cache) not to.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, read_only: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.read_only = read_only
+        self.replica: Optional[Engine] = None
+        self.wrote = False
+        self.on_replica = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or (clause is not None and not self.is_read(clause)):
+            self.wrote = True
+        if self.wrote or self.replicas is None:
+            return primary
+        if self.replica is None:
+            replica = self.replicas.choose()
+            self.replica = replica or primary
+            self.on_replica = replica is not None
+        return self.replica
+
+    @property
+    def reads_replica(self) -> bool:
+        """True while queries of this session go to a replica"""
+        return self.on_replica and not self.wrote
+
+    def is_read(self, clause) -> bool:
+        return isinstance(clause, Select) or self.read_only and not clause.is_dml
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Run the analytics queries in-process, vectorized with pandas.
+
+Reads the Parquet snapshots (see run_snapshot_export.py) by default, or the
+database (a replica when configured) with --database, and prints the
+result of each HealthcareSQLQueries analysis.
+"""
+import argparse
+import sys
+import os
+import time
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.config import SNAPSHOT_DIR, ReadSessionLocal
+from src.analytics import ANALYSES, database_frames, snapshot_frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--database", action="store_true", help="read the database instead of the snapshots")
+    parser.add_argument("queries", nargs="*", type=int, help="query numbers to run (default: all)")
+    args = parser.parse_args()
+
+    if args.database:
+        with ReadSessionLocal() as db:
+            frames = database_frames(db)
+    else:
+        frames = snapshot_frames(args.root)
+    for number in args.queries or ANALYSES:
+        analysis = ANALYSES[number]
+        started = time.perf_counter()
+        result = analysis(frames)
+        print(f"\n{number}. {analysis.__name__} ({len(result)} rows, {(time.perf_counter() - started) * 1000:.1f} ms)")
+        print(result.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
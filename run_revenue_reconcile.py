@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily revenue rollup from the billing table.
+
+Triggers keep revenue_daily current as bills change; run this periodically
+(e.g. nightly from cron) to repair any drift, such as bills whose
+appointment moved to another doctor, or after restoring billing data.
+"""
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.config import SessionLocal
+from src.crud import billing_crud
+
+def main():
+    with SessionLocal() as db:
+        rows = billing_crud.rebuild_revenue_rollup(db)
+    print(f"Rebuilt revenue_daily: {rows} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Export the database to Parquet snapshots for analytics.
+
+Appends rows created since the last run; run it periodically (e.g. every
+few minutes from cron) and with --full now and then (e.g. nightly) so
+updated rows are refreshed too. Reads go to a replica when configured.
+"""
+import argparse
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.config import SNAPSHOT_DIR, ReadSessionLocal
+from src.analytics import export_snapshots
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--full", action="store_true", help="rewrite every snapshot from scratch")
+    parser.add_argument("tables", nargs="*", help="tables to export (default: all)")
+    args = parser.parse_args()
+
+    with ReadSessionLocal() as db:
+        counts = export_snapshots(db, args.root, tables=args.tables or None, full=args.full)
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+
+if __name__ == "__main__":
+    main()
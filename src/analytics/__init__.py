@@ -0,0 +1,8 @@
+# Analytics over columnar snapshots, kept off the OLTP database
+from .snapshots import export_snapshots, read_snapshot, snapshot_dataset
+from .olap import ANALYSES, database_frames, run_all, snapshot_frames
+
+__all__ = [
+    "export_snapshots", "read_snapshot", "snapshot_dataset",
+    "ANALYSES", "database_frames", "run_all", "snapshot_frames",
+]
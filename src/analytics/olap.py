@@ -0,0 +1,437 @@
+"""
+Vectorized versions of the HealthcareSQLQueries analyses.
+
+Each analysis takes columnar frames, one pandas DataFrame per table holding
+the columns listed in COLUMNS, and returns the columns and rows of its SQL
+counterpart (query N of HealthcareSQLQueries is ANALYSES[N]). Joins are
+index lookups, group-by cubes are built from one finest-grained aggregate,
+and ranks, lags and rolling windows are whole-column operations, so the
+analyses run on Parquet snapshots, SQLite or PostgreSQL alike without
+loading production with PostgreSQL-only SQL.
+
+Known gaps: text ordering is by code point (PostgreSQL follows the
+database collation) and inventory names are matched as plain substrings
+(in SQL, % and _ in an item name would act as LIKE wildcards).
+"""
+from datetime import date, timedelta
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.config import Base, SNAPSHOT_DIR
+from src.analytics.snapshots import arrow_type, read_snapshot
+
+Frames = Dict[str, pd.DataFrame]
+
+# Columns the analyses read, by table; sources load nothing else
+COLUMNS = {
+    "patients": [
+        "patient_id", "first_name", "last_name", "date_of_birth", "gender", "phone", "email"
+    ],
+    "doctors": ["doctor_id", "first_name", "last_name", "specialization", "is_active"],
+    "appointments": ["appointment_id", "patient_id", "doctor_id", "appointment_date", "status", "reason", "created_at"],
+    "medical_records": ["record_id", "patient_id", "doctor_id", "visit_date", "diagnosis", "treatment"],
+    "prescriptions": [
+        "prescription_id", "patient_id", "doctor_id", "medication_name", "dosage", "frequency", "start_date"
+    ],
+    "billing": ["bill_id", "patient_id", "appointment_id", "amount", "status", "insurance_info", "created_at"],
+    "inventory": ["item_id", "item_name", "category", "quantity", "unit_price"],
+}
+
+def to_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    DataFrame of an Arrow table with decimals as float64 and dates as
+    datetime64, the dtypes the analyses compute on
+    """
+    schema = pa.schema([
+        pa.field(field.name, pa.float64()) if pa.types.is_decimal(field.type) else field for field in table.schema
+    ])
+    return table.cast(schema).to_pandas(date_as_object=False)
+
+def snapshot_frames(root: str = SNAPSHOT_DIR, tables: Optional[Iterable[str]] = None) -> Frames:
+    """Frames read from the Parquet snapshots, only the columns in COLUMNS"""
+    return {table: to_frame(read_snapshot(table, COLUMNS[table], root=root)) for table in tables or COLUMNS}
+
+def database_frames(db: Session, tables: Optional[Iterable[str]] = None) -> Frames:
+    """Frames queried from a database (any dialect), only the columns in COLUMNS"""
+    frames = {}
+    for name in tables or COLUMNS:
+        columns = [Base.metadata.tables[name].c[column] for column in COLUMNS[name]]
+        rows = db.execute(select(*columns)).all()
+        values = list(zip(*rows)) or [()] * len(columns)
+        frames[name] = to_frame(pa.table({
+            column.name: pa.array(column_values, type=arrow_type(column.type))
+            for column, column_values in zip(columns, values)
+        }))
+    return frames
+
+def pg_round(values: Any, digits: int = 2) -> Any:
+    """ROUND(x, digits) as PostgreSQL rounds numerics: halves away from zero"""
+    scale = 10.0 ** digits
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+def full_name(first: pd.Series, last: pd.Series) -> pd.Series:
+    return first + " " + last
+
+def age_years(born: pd.Series, today: date) -> pd.Series:
+    """EXTRACT(YEAR FROM AGE(today, born)): completed years"""
+    before_birthday = born.dt.month * 100 + born.dt.day > today.month * 100 + today.day
+    return today.year - born.dt.year - before_birthday
+
+def lookup(keys: pd.Series, frame: pd.DataFrame, key: str, column: str) -> pd.Series:
+    """frame[column] of the row whose `key` equals each of `keys`: a LEFT JOIN on a unique key"""
+    return frame.set_index(key)[column].reindex(keys).set_axis(keys.index)
+
+def ordered(frame: pd.DataFrame, by: List[str], ascending: Any = True, limit: Optional[int] = None) -> pd.DataFrame:
+    """ORDER BY (NULLS LAST ascending, NULLS FIRST descending, as PostgreSQL) and LIMIT"""
+    ascending = [ascending] * len(by) if isinstance(ascending, bool) else ascending
+    first = frame[by[0]]
+    if limit is not None and len(frame) > limit and first.dtype.kind in "iufmM" and first.notna().all():
+        # Only rows up to the limit-th value of the first key can make the cut
+        if ascending[0]:
+            frame = frame[first <= first.nsmallest(limit).iloc[-1]]
+        else:
+            frame = frame[first >= first.nlargest(limit).iloc[-1]]
+    nulls = {f"_null_{i}": frame[column].isna() == asc for i, (column, asc) in enumerate(zip(by, ascending))}
+    frame = frame.assign(**nulls).sort_values(
+        [key for null, column in zip(nulls, by) for key in (null, column)],
+        ascending=[order for asc in ascending for order in (True, asc)], kind="stable"
+    ).drop(columns=list(nulls))
+    return (frame.head(limit) if limit is not None else frame).reset_index(drop=True)
+
+def grouping_sets(
+    base: pd.DataFrame, keys: Sequence[str], sets: Iterable[Tuple[str, ...]], sums: Sequence[str]
+) -> pd.DataFrame:
+    """
+    GROUP BY GROUPING SETS over a finest-grained aggregate: each set re-sums
+    `sums` of `base` (one row per combination of `keys`), with the keys left
+    out of a set NULL
+    """
+    parts = []
+    for grouping in sets:
+        if grouping:
+            parts.append(base.groupby(list(grouping), dropna=False, sort=False)[list(sums)].sum().reset_index())
+        else:
+            parts.append(pd.DataFrame([base[list(sums)].sum()]))
+    return pd.concat(parts, ignore_index=True).reindex(columns=[*keys, *sums])
+
+def cube(keys: Sequence[str]) -> List[Tuple[str, ...]]:
+    return [grouping for size in range(len(keys), -1, -1) for grouping in combinations(keys, size)]
+
+# 1-3: basic queries
+
+def female_patients_by_age(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    today = today or date.today()
+    patients = frames["patients"]
+    selected = patients[(patients.gender == "Female") & (patients.date_of_birth < pd.Timestamp(2000, 1, 1))]
+    selected = selected.assign(age=age_years(selected.date_of_birth, today))
+    columns = ["patient_id", "first_name", "last_name", "gender", "age", "phone", "email"]
+    return ordered(selected[columns], ["age"], False, limit=10)
+
+def doctors_by_specialization(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    doctors = frames["doctors"]
+    counts = doctors[doctors.is_active == True].groupby("specialization", dropna=False).size()
+    result = counts.rename("doctor_count").reset_index()
+    result["percentage"] = result.doctor_count * 100.0 / len(doctors)
+    return ordered(result, ["doctor_count"], False)
+
+def appointments_by_status(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    appointments = frames["appointments"]
+    lead_days = (appointments.appointment_date - appointments.created_at).dt.total_seconds() / 86400
+    result = appointments.assign(lead_days=lead_days).groupby("status", dropna=False).agg(
+        total_appointments=("appointment_id", "size"),
+        avg_lead_time_days=("lead_days", "mean"),
+        earliest_appointment=("appointment_date", "min"),
+        latest_appointment=("appointment_date", "max")
+    ).reset_index()
+    return ordered(result, ["total_appointments"], False)
+
+# 4-6: joins
+
+def upcoming_appointments(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    today = today or date.today()
+    patients, doctors = frames["patients"], frames["doctors"]
+    appointments = frames["appointments"]
+    upcoming = appointments[appointments.appointment_date >= pd.Timestamp(today)]
+    upcoming = upcoming.merge(
+        patients[["patient_id", "first_name", "last_name"]].rename(
+            columns={"first_name": "patient_first", "last_name": "patient_last"}
+        ), on="patient_id"
+    ).merge(
+        doctors[["doctor_id", "first_name", "last_name", "specialization"]].rename(
+            columns={"first_name": "doctor_first", "last_name": "doctor_last"}
+        ), on="doctor_id"
+    )
+    upcoming = ordered(upcoming, ["appointment_date", "patient_last"], limit=15)
+    return pd.DataFrame({
+        "patient_id": upcoming.patient_id,
+        "patient_name": full_name(upcoming.patient_first, upcoming.patient_last),
+        "doctor_name": full_name(upcoming.doctor_first, upcoming.doctor_last),
+        "specialization": upcoming.specialization,
+        "appointment_date": upcoming.appointment_date,
+        "status": upcoming.status,
+        "reason": upcoming.reason,
+    })
+
+def medical_history(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    records = frames["medical_records"]
+    records = records[records.diagnosis.notna()].merge(
+        frames["patients"][["patient_id", "first_name", "last_name"]], on="patient_id"
+    ).merge(
+        frames["prescriptions"][["patient_id", "start_date", "medication_name", "dosage", "frequency"]],
+        left_on=["patient_id", "visit_date"], right_on=["patient_id", "start_date"], how="left"
+    )
+    records = ordered(records, ["last_name", "visit_date"], [True, False], limit=15)
+    return pd.DataFrame({
+        "patient_id": records.patient_id,
+        "patient_name": full_name(records.first_name, records.last_name),
+        **{column: records[column] for column in (
+            "visit_date", "diagnosis", "treatment", "medication_name", "dosage", "frequency"
+        )}
+    })
+
+def large_bills(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    patients, bills = frames["patients"], frames["billing"]
+    bills = bills[(bills.amount > 100) & bills.patient_id.isin(patients.patient_id)]
+    bills = ordered(bills, ["amount"], False, limit=12)
+    return pd.DataFrame({
+        "bill_id": bills.bill_id,
+        "patient_name": full_name(
+            lookup(bills.patient_id, patients, "patient_id", "first_name"),
+            lookup(bills.patient_id, patients, "patient_id", "last_name")
+        ),
+        "appointment_date": lookup(bills.appointment_id, frames["appointments"], "appointment_id", "appointment_date"),
+        "amount": bills.amount,
+        "status": bills.status,
+        "insurance_info": bills.insurance_info,
+    })
+
+# 7-9: window functions
+
+def doctor_rankings(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    doctors = frames["doctors"]
+    counts = frames["appointments"].groupby("doctor_id").size()
+    appointment_count = doctors.doctor_id.map(counts).fillna(0).astype("int64")
+    result = pd.DataFrame({
+        "doctor_id": doctors.doctor_id,
+        "doctor_name": full_name(doctors.first_name, doctors.last_name),
+        "specialization": doctors.specialization,
+        "appointment_count": appointment_count,
+        "rank_by_appointments": appointment_count.rank(method="min", ascending=False).astype("int64"),
+        "percentage_of_total": pg_round(100.0 * appointment_count / appointment_count.sum()),
+        "avg_appointments_all_doctors": pg_round(appointment_count.mean()),
+    })
+    return ordered(result, ["rank_by_appointments"])
+
+def patient_spending(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    patients, bills = frames["patients"], frames["billing"]
+    paid = bills[bills.status == "Paid"].groupby("patient_id").amount.sum()
+    total_spent = patients.patient_id.map(paid).fillna(0.0)
+    result = pd.DataFrame({
+        "patient_id": patients.patient_id,
+        "patient_name": full_name(patients.first_name, patients.last_name),
+        "total_spent": total_spent,
+        "spending_rank": total_spent.rank(method="min", ascending=False).astype("int64"),
+        "avg_patient_spending": pg_round(total_spent.mean()),
+    })
+    # SUM() OVER (ORDER BY total_spent DESC) frames by RANGE: ties share a running total
+    by_spending = result.total_spent.sort_values(ascending=False, kind="stable")
+    result["running_total"] = by_spending.cumsum().groupby(by_spending).transform("max")
+    result["percentage_of_total_revenue"] = pg_round(100.0 * total_spent / total_spent.sum())
+    return ordered(result, ["spending_rank"], limit=15)
+
+def monthly_revenue(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    bills = frames["billing"]
+    paid = bills[bills.status == "Paid"]
+    month = paid.created_at.values.astype("datetime64[M]")
+    result = paid.groupby(month, dropna=False).agg(
+        monthly_revenue=("amount", "sum"), bill_count=("amount", "size")
+    ).sort_index(na_position="last")
+    previous = result.monthly_revenue.shift(1)
+    result = pd.DataFrame({
+        "month": result.index.strftime("%Y-%m").where(result.index.notna(), None),
+        "monthly_revenue": result.monthly_revenue.values,
+        "bill_count": result.bill_count.values,
+        "previous_month_revenue": previous.values,
+        "growth_percentage": pg_round(100.0 * (result.monthly_revenue - previous) / previous).values,
+        "moving_avg_3_months": pg_round(result.monthly_revenue.rolling(3, min_periods=1).mean()).values,
+    })
+    return ordered(result, ["month"], False)
+
+# 10-11: OLAP
+
+def revenue_cube(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    bills = frames["billing"]
+    doctor_id = lookup(bills.appointment_id, frames["appointments"], "appointment_id", "doctor_id")
+    base = pd.DataFrame({
+        "month": bills.created_at.values.astype("datetime64[M]"),
+        "specialization": lookup(doctor_id, frames["doctors"], "doctor_id", "specialization"),
+        "billing_status": bills.status,
+        "bill_count": 1,
+        "total_amount": bills.amount,
+    }).groupby(["month", "specialization", "billing_status"], dropna=False).sum().reset_index()
+    keys = ["month", "specialization", "billing_status"]
+    result = grouping_sets(base, keys, cube(keys), ["bill_count", "total_amount"])
+    months = pd.to_datetime(result.month)
+    result["month"] = months.dt.strftime("%Y-%m").where(months.notna(), "All Months")
+    result["specialization"] = result.specialization.fillna("All Specializations")
+    result["billing_status"] = result.billing_status.fillna("All Statuses")
+    result["bill_count"] = result.bill_count.astype("int64")
+    result["total_amount"] = result.total_amount.astype(float)
+    result["avg_amount"] = pg_round(result.total_amount / result.bill_count)
+    return ordered(
+        result, ["month", "specialization", "billing_status", "total_amount"], [True, True, True, False], limit=20
+    )
+
+def demographics_cube(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    today = today or date.today()
+    patients = frames["patients"]
+    age = age_years(patients.date_of_birth, today)
+    base = pd.DataFrame({
+        "gender": patients.gender,
+        # NULL ages fail both tests and fall through to '50+', as in the CASE
+        "age_group": np.select([age < 30, age < 50], ["Under 30", "30-49"], default="50+"),
+        "patient_count": 1,
+    }).groupby(["gender", "age_group"], dropna=False).sum().reset_index()
+    result = grouping_sets(base, ["gender", "age_group"], cube(["gender", "age_group"]), ["patient_count"])
+    result["gender"] = result.gender.fillna("All Genders")
+    result["age_group"] = result.age_group.fillna("All Age Groups")
+    result["patient_count"] = result.patient_count.astype("int64")
+    result["percentage"] = pg_round(100.0 * result.patient_count / result.patient_count.sum())
+    return ordered(result, ["gender", "age_group"])
+
+# 12-15: complex analytics
+
+def readmissions(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    records = frames["medical_records"].sort_values(["patient_id", "visit_date"], kind="stable")
+    same_patient = records.patient_id.eq(records.patient_id.shift(1))
+    previous = records.visit_date.shift(1).where(same_patient)
+    days = (records.visit_date - previous).dt.days
+    readmitted = records.assign(previous_visit=previous, days_between_visits=days)[previous.notna() & (days <= 30)]
+    patients = frames["patients"]
+    readmitted = readmitted.merge(patients[["patient_id", "first_name", "last_name"]], on="patient_id")
+    readmitted = ordered(readmitted, ["days_between_visits", "last_name"], limit=10)
+    return pd.DataFrame({
+        "patient_name": full_name(readmitted.first_name, readmitted.last_name),
+        "readmission_date": readmitted.visit_date,
+        "previous_visit": readmitted.previous_visit,
+        "days_between_visits": readmitted.days_between_visits.astype("int64"),
+        "diagnosis": readmitted.diagnosis,
+    })
+
+def inventory_optimization(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    items = frames["inventory"]
+    # Match each item against the distinct medication names, not every prescription
+    per_name = frames["prescriptions"].medication_name.str.lower().value_counts()
+    names = per_name.index.to_numpy(dtype=object)
+    monthly = np.array([
+        per_name.values[np.char.find(names.astype(str), item) >= 0].sum() if isinstance(item, str) else 0
+        for item in items.item_name.str.lower()
+    ], dtype="int64")
+    stock = items.quantity
+    result = pd.DataFrame({
+        "item_name": items.item_name,
+        "category": items.category,
+        "current_stock": stock,
+        "unit_price": items.unit_price,
+        "monthly_prescriptions": monthly,
+        "avg_category_stock": items.groupby("category", dropna=False).quantity.transform("mean"),
+        "stock_status": np.select(
+            [stock < 10, stock < 20, stock > 100], ["CRITICAL", "LOW", "OVERSTOCKED"], default="OPTIMAL"
+        ),
+        # integer / integer truncates in SQL
+        "months_of_supply": np.where(monthly > 0, np.trunc(stock / np.where(monthly > 0, monthly, 1)), np.nan),
+    })
+    return ordered(result, ["stock_status", "months_of_supply"], limit=15)
+
+def doctor_performance(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    doctors = frames["doctors"]
+    doctors = doctors[doctors.is_active == True]
+    appointments = frames["appointments"]
+    # COUNT(DISTINCT) of a primary key is a plain count
+    by_doctor = appointments.assign(completed=appointments.status == "Completed").groupby("doctor_id").agg(
+        total_appointments=("appointment_id", "size"),
+        unique_patients=("patient_id", "nunique"),
+        completed=("completed", "sum")
+    )
+    records = frames["medical_records"].groupby("doctor_id").size()
+    prescriptions = frames["prescriptions"].groupby("doctor_id").size()
+
+    def per_doctor(values: pd.Series) -> pd.Series:
+        return doctors.doctor_id.map(values).fillna(0).astype("int64")
+
+    total = per_doctor(by_doctor.total_appointments)
+    # Every appointment is repeated once per record x prescription row of the
+    # SQL join, which cancels out of the average
+    completion_rate = (per_doctor(by_doctor.completed) / total.where(total > 0)).fillna(0.0)
+    unique_patients = per_doctor(by_doctor.unique_patients)
+    result = pd.DataFrame({
+        "doctor_name": full_name(doctors.first_name, doctors.last_name),
+        "specialization": doctors.specialization,
+        "total_appointments": total,
+        "unique_patients": unique_patients,
+        "completion_rate_percent": pg_round(completion_rate * 100),
+        "medical_records_created": per_doctor(records),
+        "prescriptions_written": per_doctor(prescriptions),
+        "avg_appointments_per_patient": pg_round(unique_patients / total.where(total > 0)),
+        "performance_category": np.select(
+            [(total > 20) & (completion_rate > 0.8), (total > 10) & (completion_rate > 0.6)],
+            ["HIGH PERFORMER", "GOOD PERFORMER"], default="NEEDS REVIEW"
+        ),
+        "completion_rate": completion_rate,
+    })
+    return ordered(result, ["total_appointments", "completion_rate"], False, limit=12).drop(columns="completion_rate")
+
+def revenue_trends(frames: Frames, today: Optional[date] = None) -> pd.DataFrame:
+    today = today or date.today()
+    bills = frames["billing"]
+    bills = bills[(bills.status == "Paid") & (bills.created_at >= pd.Timestamp(today - timedelta(days=90)))]
+    daily = bills.groupby(bills.created_at.values.astype("datetime64[D]")).agg(
+        daily_revenue=("amount", "sum"), daily_transactions=("amount", "size")
+    ).sort_index()
+    revenue = daily.daily_revenue
+    week_ago = revenue.shift(7)
+    moving_avg = revenue.rolling(7, min_periods=1).mean()
+    result = pd.DataFrame({
+        "revenue_date": daily.index,
+        "daily_revenue": revenue.values,
+        "daily_transactions": daily.daily_transactions.values,
+        "revenue_7_days_ago": week_ago.values,
+        "weekly_growth_percent": pg_round(100.0 * (revenue - week_ago) / week_ago.where(week_ago != 0)).values,
+        "weekly_moving_avg": moving_avg.values,
+        "monthly_running_total": revenue.rolling(30, min_periods=1).sum().values,
+        "trend_status": np.select(
+            [revenue > moving_avg * 1.2, revenue < moving_avg * 0.8], ["ABOVE TREND", "BELOW TREND"], default="ON TREND"
+        ),
+    })
+    result = result[result.revenue_date >= pd.Timestamp(today - timedelta(days=30))]
+    return ordered(result, ["revenue_date"], False, limit=15)
+
+Analysis = Callable[[Frames, Optional[date]], pd.DataFrame]
+
+# Query number in HealthcareSQLQueries -> vectorized analysis
+ANALYSES: Dict[int, Analysis] = {
+    1: female_patients_by_age,
+    2: doctors_by_specialization,
+    3: appointments_by_status,
+    4: upcoming_appointments,
+    5: medical_history,
+    6: large_bills,
+    7: doctor_rankings,
+    8: patient_spending,
+    9: monthly_revenue,
+    10: revenue_cube,
+    11: demographics_cube,
+    12: readmissions,
+    13: inventory_optimization,
+    14: doctor_performance,
+    15: revenue_trends,
+}
+
+def run_all(frames: Frames, today: Optional[date] = None) -> Dict[int, pd.DataFrame]:
+    return {number: analysis(frames, today) for number, analysis in ANALYSES.items()}
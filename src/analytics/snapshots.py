@@ -0,0 +1,183 @@
+"""
+Columnar Parquet snapshots of the database for analytics.
+
+export_snapshots() copies every table to <root>/<table>/ as Parquet, hive
+partitioned by the month rows were created (created_month=YYYY-MM). After
+the first run only rows created since the previous run's watermark are
+appended; tables without created_at are rewritten whole. read_snapshot()
+loads only the requested columns, with filters pushed down to partitions
+and Parquet row-group statistics, so analytical reads cost the columns
+they touch and stay off the database.
+
+Rows updated after they were exported keep their exported values until the
+next full export (full=True), which is worth scheduling e.g. nightly.
+"""
+import glob
+import json
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Table, or_, select
+from sqlalchemy.orm import Session
+
+from database.config import Base, SNAPSHOT_DIR, SNAPSHOT_LAG_SECONDS, SNAPSHOT_ROW_GROUP
+import src.models  # noqa: F401  (registers every table)
+
+PARTITION = "created_month"
+WATERMARKS = "_watermarks.json"
+
+def arrow_type(column_type: Any) -> pa.DataType:
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float) or (isinstance(column_type, Numeric) and column_type.precision is None):
+        return pa.float64()
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def partitioned(table: Table) -> bool:
+    return "created_at" in table.columns
+
+def table_schema(table: Table) -> pa.Schema:
+    """Arrow schema of a table's snapshot, partition column included"""
+    fields = [pa.field(column.name, arrow_type(column.type)) for column in table.columns]
+    if partitioned(table):
+        fields.append(pa.field(PARTITION, pa.string()))
+    return pa.schema(fields)
+
+def partitioning() -> ds.Partitioning:
+    return ds.partitioning(pa.schema([pa.field(PARTITION, pa.string())]), flavor="hive")
+
+def record_batches(db: Session, table: Table, query: Any, schema: pa.Schema, counts: Dict[str, int]) -> Iterator[pa.RecordBatch]:
+    """Stream query results as record batches of up to a row group each"""
+    result = db.execute(query.execution_options(yield_per=SNAPSHOT_ROW_GROUP))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+        if partitioned(table):
+            arrays.append(pc.strftime(arrays[schema.get_field_index("created_at")], format="%Y-%m"))
+        counts[table.name] += len(rows)
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write(db: Session, table: Table, query: Any, directory: str, basename: str, counts: Dict[str, int]) -> None:
+    schema = table_schema(table)
+    ds.write_dataset(
+        record_batches(db, table, query, schema, counts), directory, schema=schema, format="parquet",
+        partitioning=partitioning() if partitioned(table) else None,
+        basename_template=f"{basename}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore",
+        min_rows_per_group=SNAPSHOT_ROW_GROUP, max_rows_per_group=SNAPSHOT_ROW_GROUP
+    )
+
+def load_watermarks(root: str) -> Dict[str, str]:
+    path = os.path.join(root, WATERMARKS)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def save_watermarks(root: str, watermarks: Dict[str, str]) -> None:
+    path = os.path.join(root, WATERMARKS)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(watermarks, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+def export_snapshots(
+    db: Session, root: str = SNAPSHOT_DIR, tables: Optional[Sequence[str]] = None, full: bool = False,
+    now: Optional[datetime] = None, lag: float = SNAPSHOT_LAG_SECONDS
+) -> Dict[str, int]:
+    """
+    Bring the snapshots of `tables` (default: all) up to date; returns the
+    number of rows written per table.
+
+    Rows are exported up to `lag` seconds before `now` (UTC), so a row of a
+    transaction that commits after the export still lands after the new
+    watermark. Files of an incremental run are named after the watermark it
+    started from, so a run that failed half way is cleaned up by the next.
+    """
+    os.makedirs(root, exist_ok=True)
+    watermarks = load_watermarks(root)
+    high = (now or datetime.utcnow()) - timedelta(seconds=lag)
+    counts: Dict[str, int] = {}
+    for table in Base.metadata.sorted_tables:
+        if tables is not None and table.name not in tables:
+            continue
+        counts[table.name] = 0
+        query = select(*table.columns)
+        low = watermarks.get(table.name)
+        if partitioned(table) and low and not full:
+            basename = "part-" + low.replace(":", "").replace("-", "").replace(".", "")
+            for leftover in glob.glob(os.path.join(root, table.name, "*", f"{basename}-*.parquet")):
+                os.remove(leftover)
+            created_at = table.c.created_at
+            query = query.where(created_at >= datetime.fromisoformat(low), created_at < high).order_by(created_at)
+            write(db, table, query, os.path.join(root, table.name), basename, counts)
+        else:
+            if partitioned(table):
+                query = query.where(or_(table.c.created_at < high, table.c.created_at.is_(None)))
+            staging = os.path.join(root, f".{table.name}.new")
+            shutil.rmtree(staging, ignore_errors=True)
+            write(db, table, query, staging, "part-full", counts)
+            target, old = os.path.join(root, table.name), os.path.join(root, f".{table.name}.old")
+            shutil.rmtree(old, ignore_errors=True)
+            if os.path.exists(target):
+                os.rename(target, old)
+            if os.path.exists(staging):
+                os.rename(staging, target)
+            shutil.rmtree(old, ignore_errors=True)
+        if partitioned(table):
+            watermarks[table.name] = high.isoformat()
+            save_watermarks(root, watermarks)
+    return counts
+
+def created_between(start: Optional[date] = None, end: Optional[date] = None) -> Optional[ds.Expression]:
+    """
+    Filter on created_at in [start, end) that also prunes whole
+    created_month partitions
+    """
+    conditions = []
+    if start:
+        conditions += [pc.field(PARTITION) >= f"{start:%Y-%m}", pc.field("created_at") >= pa.scalar(
+            datetime.combine(start, datetime.min.time()), pa.timestamp("us")
+        )]
+    if end:
+        conditions += [pc.field(PARTITION) <= f"{end - timedelta(days=1):%Y-%m}", pc.field("created_at") < pa.scalar(
+            datetime.combine(end, datetime.min.time()), pa.timestamp("us")
+        )]
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def snapshot_dataset(table: str, root: str = SNAPSHOT_DIR) -> ds.Dataset:
+    """The snapshot of `table` as a lazily scanned dataset (empty if never exported)"""
+    schema = table_schema(Base.metadata.tables[table])
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return ds.dataset(schema.empty_table())
+    return ds.dataset(
+        path, schema=schema, format="parquet", partitioning=partitioning() if PARTITION in schema.names else None
+    )
+
+def read_snapshot(
+    table: str, columns: Optional[List[str]] = None, filter: Optional[ds.Expression] = None,
+    root: str = SNAPSHOT_DIR
+) -> pa.Table:
+    """
+    `columns` (default: all) of the snapshot rows of `table` matching
+    `filter`, a pyarrow expression such as pc.field("status") == "Paid".
+
+    Only those columns are read, and partitions and row groups the filter
+    rules out are skipped.
+    """
+    return snapshot_dataset(table, root).to_table(columns=columns, filter=filter)
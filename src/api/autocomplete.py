@@ -0,0 +1,40 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Dict, List
+from database.config import AUTOCOMPLETE_REFRESH, ROW_CHANGES_RETENTION, SessionLocal
+from src.crud import appointment_crud, doctor_crud, patient_crud, table_versions
+from src.crud.async_base import AsyncCRUDBase, DBSession
+
+logger = logging.getLogger(__name__)
+
+async def suggest(db: DBSession, crud: AsyncCRUDBase, q: str, limit: int) -> List[Dict[str, Any]]:
+    """Look up suggestions, from db until the index is built"""
+    if not crud.index.ready:
+        return await crud.suggest_from_db(db, q, limit)
+    return crud.index.search(q, limit)
+
+def refresh_indexes(stop: threading.Event) -> None:
+    """
+    Build the autocomplete and schedule indexes now, then every
+    AUTOCOMPLETE_REFRESH seconds apply the rows other processes changed,
+    and drop row changes older than ROW_CHANGES_RETENTION.
+
+    Everything is read from the primary: the change log is only complete
+    there, and a lagging replica would leave the index behind it.
+    """
+    while True:
+        try:
+            with SessionLocal() as db:
+                table_versions.prune(db, timedelta(seconds=ROW_CHANGES_RETENTION))
+        except Exception:
+            logger.exception("Pruning the row change log failed")
+        for crud in (patient_crud, doctor_crud, appointment_crud):
+            try:
+                with SessionLocal() as db:
+                    if crud.refresh_index(db):
+                        logger.info("Built the %s index", crud.model.__tablename__)
+            except Exception:
+                logger.exception("Building the %s index failed", crud.model.__tablename__)
+        if stop.wait(AUTOCOMPLETE_REFRESH):
+            return
@@ -0,0 +1,29 @@
+from typing import Any, Dict, List, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from src.crud.async_base import AsyncCRUDBase, DBSession
+from src.schemas.bulk import BulkRowError, MAX_BULK_ROWS, validate_rows
+
+async def bulk_create(
+    db: DBSession, crud: AsyncCRUDBase, schema: Type[BaseModel], rows: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Validate a batch of raw rows and insert the valid ones in one transaction.
+
+    Rows that fail validation or hit a database constraint are reported in
+    `errors` by their index in the request body; the rest are created.
+    """
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Bulk requests are limited to {MAX_BULK_ROWS} rows"
+        )
+
+    valid, errors = validate_rows(schema, rows)
+    created, failures = await crud.create_many(db, objs_in=[obj for _, obj in valid])
+    errors.extend(
+        BulkRowError(index=valid[position][0], errors=[{"type": "integrity_error", "msg": message}])
+        for position, message in failures
+    )
+    errors.sort(key=lambda error: error.index)
+    return {"created": created, "errors": errors}
@@ -1,37 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from src.api.sessions import get_api_db
 from src.schemas.appointment import Appointment, AppointmentCreate, AppointmentUpdate
-from src.crud import appointment_crud
+from src.crud import async_appointment_crud, async_doctor_crud
+from src.crud.appointment import UPCOMING_ORDER_BY
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.expand import expand_param
+from src.schemas.expanded import AppointmentExpanded
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.api.schedule import find_slots
+from src.schemas.bulk import BulkCreateResult
+from src.schemas.schedule import Slot
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Appointment])
-def read_appointments(
+@router.get("/", response_model=List[AppointmentExpanded], response_model_exclude_unset=True)
+async def read_appointments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     upcoming: bool = False,
-    db: Session = Depends(get_db)
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
 ):
     """
     Retrieve appointments with optional filtering.
+
+    Upcoming appointments come soonest first; the others in ID order.
     """
+    order_by = None
     if status:
-        return appointment_crud.get_by_status(db, status=status, skip=skip, limit=limit)
+        appointments = await async_appointment_crud.get_by_status(db, status=status, skip=skip, limit=limit, cursor=cursor, expand=expand)
     elif upcoming:
-        return appointment_crud.get_upcoming_appointments(db, skip=skip, limit=limit)
+        appointments = await async_appointment_crud.get_upcoming_appointments(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+        order_by = UPCOMING_ORDER_BY
     else:
-        return appointment_crud.get_multi(db, skip=skip, limit=limit)
+        appointments = await async_appointment_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+    return fast_list(
+        response, Appointment, with_next_cursor(response, async_appointment_crud, appointments, limit, order_by), expand
+    )
+
+@router.get("/export")
+async def export_appointments(
+    format: ExportFormat = "ndjson",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_api_db)
+):
+    """
+    Stream all appointments as NDJSON or CSV, optionally limited to a
+    appointment_date range (both ends inclusive).
+    """
+    return export_response(db, async_appointment_crud, format, date_from=date_from, date_to=date_to)
 
-@router.get("/{appointment_id}", response_model=Appointment)
-def read_appointment(appointment_id: int, db: Session = Depends(get_db)):
+@router.get("/slots", response_model=List[Slot])
+async def read_free_slots(
+    specialization: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_api_db)
+):
+    """
+    Next free appointment slots across active doctors, optionally of one
+    specialization, earliest first.
+
+    Searches from now (or `date_from`) through `date_to`, both inclusive,
+    which defaults to SCHEDULE_HORIZON_DAYS ahead.
+    """
+    doctor_ids = await async_doctor_crud.get_active_ids(db, specialization=specialization)
+    return await find_slots(db, async_appointment_crud, doctor_ids, date_from, date_to, limit)
+
+@router.get("/{appointment_id}", response_model=AppointmentExpanded, response_model_exclude_unset=True)
+async def read_appointment(appointment_id: int, expand: List[str] = Depends(expand_param), db: Session = Depends(get_api_db)):
     """
     Get a specific appointment by ID.
     """
-    appointment = appointment_crud.get(db, id=appointment_id)
+    appointment = await async_appointment_crud.get(db, id=appointment_id, expand=expand)
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,13 +91,17 @@ def read_appointment(appointment_id: int, db: Session = Depends(get_db)):
     return appointment
 
 @router.post("/", response_model=Appointment, status_code=status.HTTP_201_CREATED)
-def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get_db)):
+async def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get_api_db)):
     """
     Create a new appointment.
+
+    An appointment starting less than one slot from another live
+    appointment of the same doctor or patient is rejected with 409 and the
+    conflicting appointment.
     """
     # Check if patient exists
-    from src.crud import patient_crud
-    patient = patient_crud.get(db, id=appointment.patient_id)
+    from src.crud import async_patient_crud
+    patient = await async_patient_crud.get(db, id=appointment.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,8 +109,7 @@ def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get
         )
     
     # Check if doctor exists and is active
-    from src.crud import doctor_crud
-    doctor = doctor_crud.get(db, id=appointment.doctor_id)
+    doctor = await async_doctor_crud.get(db, id=appointment.doctor_id)
     if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -67,51 +121,86 @@ def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get
             detail="Cannot schedule appointment with inactive doctor"
         )
     
-    return appointment_crud.create(db, obj_in=appointment)
+    return await async_appointment_crud.create(db, obj_in=appointment)
+
+@router.post("/bulk", response_model=BulkCreateResult[Appointment], status_code=status.HTTP_201_CREATED)
+async def create_appointments_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    """
+    Create many appointments in one transaction.
+
+    Invalid rows, rows violating a constraint and rows that fail the checks
+    of a single booking (unknown patient, unknown or inactive doctor, or an
+    overlap with a live appointment, including one earlier in the batch)
+    are returned in `errors` with their index in the request body; all
+    other rows are created.
+    """
+    return await bulk_create(db, async_appointment_crud, AppointmentCreate, rows)
 
 @router.put("/{appointment_id}", response_model=Appointment)
-def update_appointment(
+async def update_appointment(
     appointment_id: int,
     appointment_update: AppointmentUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_api_db)
 ):
     """
     Update an appointment.
     """
-    appointment = appointment_crud.get(db, id=appointment_id)
+    appointment = await async_appointment_crud.get(db, id=appointment_id)
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Appointment with ID {appointment_id} not found"
         )
     
-    return appointment_crud.update(db, db_obj=appointment, obj_in=appointment_update)
+    return await async_appointment_crud.update(db, db_obj=appointment, obj_in=appointment_update)
 
 @router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_appointment(appointment_id: int, db: Session = Depends(get_db)):
+async def delete_appointment(appointment_id: int, db: Session = Depends(get_api_db)):
     """
     Delete an appointment.
     """
-    appointment = appointment_crud.get(db, id=appointment_id)
+    appointment = await async_appointment_crud.get(db, id=appointment_id)
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Appointment with ID {appointment_id} not found"
         )
     
-    appointment_crud.remove(db, id=appointment_id)
+    await async_appointment_crud.remove(db, id=appointment_id)
     return {"message": "Appointment deleted successfully"}
 
-@router.get("/patient/{patient_id}", response_model=List[Appointment])
-def get_patient_appointments(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/patient/{patient_id}", response_model=List[AppointmentExpanded], response_model_exclude_unset=True)
+async def get_patient_appointments(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
     """
     Get all appointments for a specific patient.
     """
-    return appointment_crud.get_by_patient(db, patient_id=patient_id)
+    appointments = await async_appointment_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_appointment_crud, appointments, limit)
 
-@router.get("/doctor/{doctor_id}", response_model=List[Appointment])
-def get_doctor_appointments(doctor_id: int, db: Session = Depends(get_db)):
+@router.get("/doctor/{doctor_id}", response_model=List[AppointmentExpanded], response_model_exclude_unset=True)
+async def get_doctor_appointments(
+    doctor_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
     """
     Get all appointments for a specific doctor.
     """
-    return appointment_crud.get_by_doctor(db, doctor_id=doctor_id)
+    appointments = await async_appointment_crud.get_by_doctor(
+        db, doctor_id=doctor_id, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_appointment_crud, appointments, limit)
@@ -1,32 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status
 from sqlalchemy.orm import Session
-from typing import List
-from database.config import get_db
-from src.schemas.billing import Billing, BillingCreate, BillingUpdate
-from src.crud import billing_crud
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date
+from src.api.sessions import get_api_db
+from src.schemas.billing import Billing, BillingCreate, BillingUpdate, DailyRevenue
+from src.crud import async_billing_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.expand import expand_param
+from src.schemas.expanded import BillingExpanded
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Billing])
-def read_billing_records(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return billing_crud.get_multi(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[BillingExpanded], response_model_exclude_unset=True)
+async def read_billing_records(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    bills = await async_billing_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+    return fast_list(response, Billing, with_next_cursor(response, async_billing_crud, bills, limit), expand)
 
-@router.get("/{bill_id}", response_model=Billing)
-def read_billing_record(bill_id: int, db: Session = Depends(get_db)):
-    bill = billing_crud.get(db, id=bill_id)
+@router.get("/export")
+async def export_billing(
+    format: ExportFormat = "ndjson",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_api_db)
+):
+    """
+    Stream all bills as NDJSON or CSV, optionally limited to a
+    service_date range (both ends inclusive).
+    """
+    return export_response(db, async_billing_crud, format, date_from=date_from, date_to=date_to)
+
+@router.get("/{bill_id}", response_model=BillingExpanded, response_model_exclude_unset=True)
+async def read_billing_record(bill_id: int, expand: List[str] = Depends(expand_param), db: Session = Depends(get_api_db)):
+    bill = await async_billing_crud.get(db, id=bill_id, expand=expand)
     if not bill:
         raise HTTPException(status_code=404, detail="Billing record not found")
     return bill
 
 @router.post("/", response_model=Billing, status_code=201)
-def create_billing_record(billing: BillingCreate, db: Session = Depends(get_db)):
-    return billing_crud.create(db, obj_in=billing)
+async def create_billing_record(billing: BillingCreate, db: Session = Depends(get_api_db)):
+    return await async_billing_crud.create(db, obj_in=billing)
+
+@router.post("/bulk", response_model=BulkCreateResult[Billing], status_code=201)
+async def create_billing_records_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    return await bulk_create(db, async_billing_crud, BillingCreate, rows)
 
-@router.get("/patient/{patient_id}", response_model=List[Billing])
-def get_patient_billing(patient_id: int, db: Session = Depends(get_db)):
-    return billing_crud.get_by_patient(db, patient_id=patient_id)
+@router.get("/patient/{patient_id}", response_model=List[BillingExpanded], response_model_exclude_unset=True)
+async def get_patient_billing(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    bills = await async_billing_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_billing_crud, bills, limit)
 
 @router.get("/revenue/total")
-def get_total_revenue(db: Session = Depends(get_db)):
-    total = billing_crud.get_total_revenue(db)
+async def get_total_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_api_db)
+):
+    """
+    Paid revenue, optionally for a service_date range (both ends inclusive).
+    """
+    total = await async_billing_crud.get_total_revenue(db, date_from=date_from, date_to=date_to)
     return {"total_revenue": float(total)}
+
+@router.get("/revenue/daily", response_model=List[DailyRevenue], response_model_exclude_unset=True)
+async def get_daily_revenue(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = "Paid",
+    group_by: Optional[Literal["status", "doctor", "insurer"]] = None,
+    db: Session = Depends(get_api_db)
+):
+    """
+    Revenue and bill count per service date (both ends inclusive), of one
+    status (all statuses if empty) and optionally split by status, doctor
+    or insurer.
+    """
+    return await async_billing_crud.get_daily_revenue(
+        db, date_from=date_from, date_to=date_to, status=status or None, group_by=group_by
+    )
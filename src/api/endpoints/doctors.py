@@ -1,39 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, time, timedelta
+from src.api.sessions import get_api_db
 from src.schemas.doctor import Doctor, DoctorCreate, DoctorUpdate
-from src.crud import doctor_crud
+from src.schemas.autocomplete import Suggestion
+from src.schemas.schedule import Slot
+from src.schemas.appointment import Appointment
+from src.schemas.expanded import AppointmentExpanded
+from src.api.expand import expand_param
+from src.crud import async_appointment_crud, async_doctor_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.api.autocomplete import suggest
+from src.api.schedule import find_slots
+from src.api.etag import conditional_get
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Doctor])
-def read_doctors(
+# Longest range one calendar request may cover
+CALENDAR_MAX_DAYS = 31
+
+# Conditional GET for the routes that read nothing but the doctors table
+not_modified = Depends(conditional_get("doctors"))
+
+@router.get("/", response_model=List[Doctor], dependencies=[not_modified])
+async def read_doctors(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     specialization: Optional[str] = None,
     active_only: bool = True,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_api_db)
 ):
     """
     Retrieve doctors with optional filtering.
+
+    `search` ranks doctors by full-name match, best first, and is paged
+    with `skip` only.
     """
     if specialization:
-        return doctor_crud.get_by_specialization(db, specialization=specialization, skip=skip, limit=limit)
-    elif active_only:
-        return doctor_crud.get_active_doctors(db, skip=skip, limit=limit)
+        doctors = await async_doctor_crud.get_by_specialization(db, specialization=specialization, skip=skip, limit=limit, cursor=cursor)
     elif search:
-        return doctor_crud.search_by_name(db, name=search, skip=skip, limit=limit)
+        doctors = await async_doctor_crud.search_by_name(
+            db, name=search, skip=skip, limit=limit, cursor=cursor, active_only=active_only
+        )
+        return fast_list(response, Doctor, doctors)
+    elif active_only:
+        doctors = await async_doctor_crud.get_active_doctors(db, skip=skip, limit=limit, cursor=cursor)
     else:
-        return doctor_crud.get_multi(db, skip=skip, limit=limit)
+        doctors = await async_doctor_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    return fast_list(response, Doctor, with_next_cursor(response, async_doctor_crud, doctors, limit))
+
+@router.get("/export")
+async def export_doctors(format: ExportFormat = "ndjson", db: Session = Depends(get_api_db)):
+    """
+    Stream all doctors as NDJSON or CSV.
+    """
+    return export_response(db, async_doctor_crud, format)
 
-@router.get("/{doctor_id}", response_model=Doctor)
-def read_doctor(doctor_id: int, db: Session = Depends(get_db)):
+@router.get("/autocomplete", response_model=List[Suggestion])
+async def autocomplete_doctors(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_api_db)):
+    """
+    Suggest doctors by name prefix, phone number suffix or ID prefix.
+    """
+    return await suggest(db, async_doctor_crud, q, limit)
+
+@router.get("/{doctor_id}", response_model=Doctor, dependencies=[not_modified])
+async def read_doctor(doctor_id: int, db: Session = Depends(get_api_db)):
     """
     Get a specific doctor by ID.
     """
-    doctor = doctor_crud.get(db, id=doctor_id)
+    doctor = await async_doctor_crud.get(db, id=doctor_id)
     if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,80 +84,152 @@ def read_doctor(doctor_id: int, db: Session = Depends(get_db)):
         )
     return doctor
 
-@router.post("/", response_model=Doctor, status_code=status.HTTP_201_CREATED)
-def create_doctor(doctor: DoctorCreate, db: Session = Depends(get_db)):
+@router.get("/{doctor_id}/availability", response_model=List[Slot])
+async def read_doctor_availability(
+    doctor_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_api_db)
+):
     """
-    Create a new doctor.
+    Next free appointment slots of a doctor, earliest first.
+
+    Searches from now (or `date_from`) through `date_to`, both inclusive,
+    which defaults to SCHEDULE_HORIZON_DAYS ahead. Inactive doctors have no
+    free slots.
     """
-    # Check if phone already exists
-    if doctor_crud.get_by_phone(db, phone=doctor.phone):
+    doctor = await async_doctor_crud.get(db, id=doctor_id)
+    if not doctor:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Doctor with this phone number already exists"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Doctor with ID {doctor_id} not found"
         )
-    
-    # Check if email already exists
-    if doctor_crud.get_by_email(db, email=doctor.email):
+    if not doctor.is_active:
+        return []
+    return await find_slots(db, async_appointment_crud, [doctor_id], date_from, date_to, limit)
+
+@router.get("/{doctor_id}/calendar", response_model=List[AppointmentExpanded], response_model_exclude_unset=True)
+async def read_doctor_calendar(
+    doctor_id: int,
+    response: Response,
+    date_from: date = Query(..., alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    """
+    A doctor's appointments from `from` through `to` (both inclusive,
+    default one day), in time order, optionally with one status only.
+
+    Ranges are limited to CALENDAR_MAX_DAYS days.
+    """
+    date_to = date_to or date_from
+    if not 0 <= (date_to - date_from).days < CALENDAR_MAX_DAYS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Doctor with this email already exists"
+            detail=f"Calendar range must run forwards and span at most {CALENDAR_MAX_DAYS} days"
         )
-    
-    # Check if license number already exists
-    if doctor_crud.get_by_license(db, license_number=doctor.license_number):
+    doctor = await async_doctor_crud.get(db, id=doctor_id)
+    if not doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Doctor with ID {doctor_id} not found"
+        )
+    appointments = await async_appointment_crud.get_doctor_calendar(
+        db, doctor_id=doctor_id, start=datetime.combine(date_from, time()),
+        end=datetime.combine(date_to, time()) + timedelta(days=1), status=status_filter, expand=expand
+    )
+    return fast_list(response, Appointment, appointments, expand)
+
+@router.post("/", response_model=Doctor, status_code=status.HTTP_201_CREATED)
+async def create_doctor(doctor: DoctorCreate, db: Session = Depends(get_api_db)):
+    """
+    Create a new doctor.
+
+    Duplicate phone numbers, emails or license numbers are rejected by the
+    unique constraints and reported as 400.
+    """
+    return await async_doctor_crud.create_unique(db, obj_in=doctor)
+
+@router.post("/bulk", response_model=BulkCreateResult[Doctor], status_code=status.HTTP_201_CREATED)
+async def create_doctors_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    """
+    Create many doctors in one transaction.
+
+    Invalid rows and rows violating a constraint are returned in `errors`
+    with their index in the request body; all other rows are created.
+    """
+    return await bulk_create(db, async_doctor_crud, DoctorCreate, rows)
+
+@router.put("/by-license/{license_number}", response_model=Doctor)
+async def upsert_doctor_by_license(license_number: str, doctor: DoctorCreate, db: Session = Depends(get_api_db)):
+    """
+    Create the doctor with this license number, or replace its details.
+
+    Idempotent: repeating the request leaves a single doctor.
+    """
+    if doctor.license_number != license_number:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Doctor with this license number already exists"
+            detail="License number in the body does not match the URL"
         )
-    
-    return doctor_crud.create(db, obj_in=doctor)
+    return await async_doctor_crud.upsert(db, key="license_number", obj_in=doctor)
 
 @router.put("/{doctor_id}", response_model=Doctor)
-def update_doctor(
+async def update_doctor(
     doctor_id: int,
     doctor_update: DoctorUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_api_db)
 ):
     """
     Update a doctor's information.
     """
-    doctor = doctor_crud.get(db, id=doctor_id)
+    doctor = await async_doctor_crud.get(db, id=doctor_id)
     if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Doctor with ID {doctor_id} not found"
         )
     
-    return doctor_crud.update(db, db_obj=doctor, obj_in=doctor_update)
+    return await async_doctor_crud.update(db, db_obj=doctor, obj_in=doctor_update)
 
 @router.delete("/{doctor_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_doctor(doctor_id: int, db: Session = Depends(get_db)):
+async def delete_doctor(doctor_id: int, db: Session = Depends(get_api_db)):
     """
     Delete a doctor.
     """
-    doctor = doctor_crud.get(db, id=doctor_id)
+    doctor = await async_doctor_crud.get(db, id=doctor_id)
     if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Doctor with ID {doctor_id} not found"
         )
     
-    doctor_crud.remove(db, id=doctor_id)
+    await async_doctor_crud.remove(db, id=doctor_id)
     return {"message": "Doctor deleted successfully"}
 
-@router.get("/specializations/", response_model=List[str])
-def get_specializations(db: Session = Depends(get_db)):
+@router.get("/specializations/", response_model=List[str], dependencies=[not_modified])
+async def get_specializations(db: Session = Depends(get_api_db)):
     """
     Get all available doctor specializations.
     """
-    specializations = db.query(Doctor.specialization).distinct().all()
-    return [spec[0] for spec in specializations]
+    return await async_doctor_crud.get_specializations(db)
 
-@router.get("/{doctor_id}/appointments", response_model=List[dict])
-def get_doctor_appointments(doctor_id: int, db: Session = Depends(get_db)):
+@router.get("/{doctor_id}/appointments", response_model=List[Appointment])
+async def get_doctor_appointments(
+    doctor_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
     """
     Get all appointments for a specific doctor.
     """
-    from src.crud import appointment_crud
-    appointments = appointment_crud.get_by_doctor(db, doctor_id=doctor_id)
-    return appointments
+    appointments = await async_appointment_crud.get_by_doctor(
+        db, doctor_id=doctor_id, skip=skip, limit=limit, cursor=cursor
+    )
+    return with_next_cursor(response, async_appointment_crud, appointments, limit)
@@ -1,31 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status
 from sqlalchemy.orm import Session
-from typing import List
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from src.api.sessions import get_api_db
 from src.schemas.inventory import Inventory, InventoryCreate, InventoryUpdate
-from src.crud import inventory_crud
+from src.crud import async_inventory_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.api.etag import conditional_get
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Inventory])
-def read_inventory(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return inventory_crud.get_multi(db, skip=skip, limit=limit)
+# Conditional GET for the routes that read nothing but the inventory table
+not_modified = Depends(conditional_get("inventory"))
 
-@router.get("/{item_id}", response_model=Inventory)
-def read_inventory_item(item_id: int, db: Session = Depends(get_db)):
-    item = inventory_crud.get(db, id=item_id)
+@router.get("/", response_model=List[Inventory], dependencies=[not_modified])
+async def read_inventory(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
+    items = await async_inventory_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    return fast_list(response, Inventory, with_next_cursor(response, async_inventory_crud, items, limit))
+
+@router.get("/export")
+async def export_inventory(format: ExportFormat = "ndjson", db: Session = Depends(get_api_db)):
+    """
+    Stream all inventory items as NDJSON or CSV.
+    """
+    return export_response(db, async_inventory_crud, format)
+
+@router.get("/{item_id}", response_model=Inventory, dependencies=[not_modified])
+async def read_inventory_item(item_id: int, db: Session = Depends(get_api_db)):
+    item = await async_inventory_crud.get(db, id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
     return item
 
 @router.post("/", response_model=Inventory, status_code=201)
-def create_inventory_item(item: InventoryCreate, db: Session = Depends(get_db)):
-    return inventory_crud.create(db, obj_in=item)
+async def create_inventory_item(item: InventoryCreate, db: Session = Depends(get_api_db)):
+    return await async_inventory_crud.create(db, obj_in=item)
+
+@router.post("/bulk", response_model=BulkCreateResult[Inventory], status_code=201)
+async def create_inventory_items_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    return await bulk_create(db, async_inventory_crud, InventoryCreate, rows)
 
-@router.get("/low-stock/", response_model=List[Inventory])
-def get_low_stock(threshold: int = 20, db: Session = Depends(get_db)):
-    return inventory_crud.get_low_stock(db, threshold=threshold)
+@router.get("/low-stock/", response_model=List[Inventory], dependencies=[not_modified])
+async def get_low_stock(
+    response: Response,
+    threshold: int = 20,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
+    items = await async_inventory_crud.get_low_stock(
+        db, threshold=threshold, skip=skip, limit=limit, cursor=cursor
+    )
+    return with_next_cursor(response, async_inventory_crud, items, limit)
 
-@router.get("/category/{category}", response_model=List[Inventory])
-def get_by_category(category: str, db: Session = Depends(get_db)):
-    return inventory_crud.get_by_category(db, category=category)
+@router.get("/category/{category}", response_model=List[Inventory], dependencies=[not_modified])
+async def get_by_category(
+    category: str,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
+    items = await async_inventory_crud.get_by_category(
+        db, category=category, skip=skip, limit=limit, cursor=cursor
+    )
+    return with_next_cursor(response, async_inventory_crud, items, limit)
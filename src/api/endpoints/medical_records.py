@@ -1,27 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status
 from sqlalchemy.orm import Session
-from typing import List
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from datetime import date
+from src.api.sessions import get_api_db
 from src.schemas.medical_record import MedicalRecord, MedicalRecordCreate, MedicalRecordUpdate
-from src.crud import medical_record_crud
+from src.crud import async_medical_record_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.expand import expand_param
+from src.schemas.expanded import MedicalRecordExpanded
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[MedicalRecord])
-def read_medical_records(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return medical_record_crud.get_multi(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[MedicalRecordExpanded], response_model_exclude_unset=True)
+async def read_medical_records(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    records = await async_medical_record_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+    return fast_list(response, MedicalRecord, with_next_cursor(response, async_medical_record_crud, records, limit), expand)
 
-@router.get("/{record_id}", response_model=MedicalRecord)
-def read_medical_record(record_id: int, db: Session = Depends(get_db)):
-    record = medical_record_crud.get(db, id=record_id)
+@router.get("/export")
+async def export_medical_records(
+    format: ExportFormat = "ndjson",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_api_db)
+):
+    """
+    Stream all medical records as NDJSON or CSV, optionally limited to a
+    visit_date range (both ends inclusive).
+    """
+    return export_response(db, async_medical_record_crud, format, date_from=date_from, date_to=date_to)
+
+@router.get("/{record_id}", response_model=MedicalRecordExpanded, response_model_exclude_unset=True)
+async def read_medical_record(record_id: int, expand: List[str] = Depends(expand_param), db: Session = Depends(get_api_db)):
+    record = await async_medical_record_crud.get(db, id=record_id, expand=expand)
     if not record:
         raise HTTPException(status_code=404, detail="Medical record not found")
     return record
 
 @router.post("/", response_model=MedicalRecord, status_code=201)
-def create_medical_record(record: MedicalRecordCreate, db: Session = Depends(get_db)):
-    return medical_record_crud.create(db, obj_in=record)
+async def create_medical_record(record: MedicalRecordCreate, db: Session = Depends(get_api_db)):
+    return await async_medical_record_crud.create(db, obj_in=record)
+
+@router.post("/bulk", response_model=BulkCreateResult[MedicalRecord], status_code=201)
+async def create_medical_records_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    return await bulk_create(db, async_medical_record_crud, MedicalRecordCreate, rows)
 
-@router.get("/patient/{patient_id}", response_model=List[MedicalRecord])
-def get_patient_records(patient_id: int, db: Session = Depends(get_db)):
-    return medical_record_crud.get_by_patient(db, patient_id=patient_id)
+@router.get("/patient/{patient_id}", response_model=List[MedicalRecordExpanded], response_model_exclude_unset=True)
+async def get_patient_records(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    records = await async_medical_record_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_medical_record_crud, records, limit)
@@ -1,36 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from src.api.sessions import get_api_db
 from src.schemas.patient import Patient, PatientCreate, PatientUpdate
-from src.crud import patient_crud
+from src.schemas.appointment import Appointment
+from src.schemas.medical_record import MedicalRecord
+from src.schemas.chart import PatientChart
+from src.schemas.autocomplete import Suggestion
+from src.crud import async_patient_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.expand import expand_param
+from src.schemas.expanded import PatientExpanded
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.api.autocomplete import suggest
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Patient])
-def read_patients(
+@router.get("/", response_model=List[PatientExpanded], response_model_exclude_unset=True)
+async def read_patients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     gender: Optional[str] = None,
-    db: Session = Depends(get_db)
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
 ):
     """
     Retrieve patients with optional filtering and search.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the
+    next page; `skip` is still honoured when no cursor is given. `search`
+    matches the full name with typo tolerance and returns the best matches
+    first, paged with `skip` only.
     """
     if search:
-        return patient_crud.search_by_name(db, name=search, skip=skip, limit=limit)
+        patients = await async_patient_crud.search_by_name(db, name=search, skip=skip, limit=limit, cursor=cursor, expand=expand)
+        return fast_list(response, Patient, patients, expand)
     elif gender:
-        return patient_crud.get_multi_by_gender(db, gender=gender, skip=skip, limit=limit)
+        patients = await async_patient_crud.get_multi_by_gender(db, gender=gender, skip=skip, limit=limit, cursor=cursor, expand=expand)
     else:
-        return patient_crud.get_multi(db, skip=skip, limit=limit)
+        patients = await async_patient_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+    return fast_list(response, Patient, with_next_cursor(response, async_patient_crud, patients, limit), expand)
+
+@router.get("/export")
+async def export_patients(format: ExportFormat = "ndjson", db: Session = Depends(get_api_db)):
+    """
+    Stream all patients as NDJSON or CSV.
+    """
+    return export_response(db, async_patient_crud, format)
+
+@router.get("/autocomplete", response_model=List[Suggestion])
+async def autocomplete_patients(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_api_db)):
+    """
+    Suggest patients as the user types: by first or last name prefix, by
+    the last digits of the phone number, or by ID prefix.
+    """
+    return await suggest(db, async_patient_crud, q, limit)
 
-@router.get("/{patient_id}", response_model=Patient)
-def read_patient(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/{patient_id}", response_model=PatientExpanded, response_model_exclude_unset=True)
+async def read_patient(patient_id: int, expand: List[str] = Depends(expand_param), db: Session = Depends(get_api_db)):
     """
     Get a specific patient by ID.
     """
-    patient = patient_crud.get(db, id=patient_id)
+    patient = await async_patient_crud.get(db, id=patient_id, expand=expand)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,73 +76,131 @@ def read_patient(patient_id: int, db: Session = Depends(get_db)):
     return patient
 
 @router.post("/", response_model=Patient, status_code=status.HTTP_201_CREATED)
-def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+async def create_patient(patient: PatientCreate, db: Session = Depends(get_api_db)):
     """
     Create a new patient.
+
+    Duplicate phone numbers or emails are rejected by the unique constraints
+    and reported as 400.
     """
-    # Check if phone already exists
-    if patient_crud.get_by_phone(db, phone=patient.phone):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Patient with this phone number already exists"
-        )
-    
-    # Check if email already exists (if provided)
-    if patient.email and patient_crud.get_by_email(db, email=patient.email):
+    return await async_patient_crud.create_unique(db, obj_in=patient)
+
+@router.post("/bulk", response_model=BulkCreateResult[Patient], status_code=status.HTTP_201_CREATED)
+async def create_patients_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    """
+    Create many patients in one transaction.
+
+    Invalid rows and rows violating a constraint are returned in `errors`
+    with their index in the request body; all other rows are created.
+    """
+    return await bulk_create(db, async_patient_crud, PatientCreate, rows)
+
+@router.put("/by-phone/{phone}", response_model=Patient)
+async def upsert_patient_by_phone(phone: str, patient: PatientCreate, db: Session = Depends(get_api_db)):
+    """
+    Create the patient with this phone number, or replace its details.
+
+    Idempotent: repeating the request leaves a single patient.
+    """
+    if patient.phone != phone:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Patient with this email already exists"
+            detail="Phone number in the body does not match the URL"
         )
-    
-    return patient_crud.create(db, obj_in=patient)
+    return await async_patient_crud.upsert(db, key="phone", obj_in=patient)
 
 @router.put("/{patient_id}", response_model=Patient)
-def update_patient(
+async def update_patient(
     patient_id: int,
     patient_update: PatientUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_api_db)
 ):
     """
     Update a patient's information.
     """
-    patient = patient_crud.get(db, id=patient_id)
+    patient = await async_patient_crud.get(db, id=patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Patient with ID {patient_id} not found"
         )
     
-    return patient_crud.update(db, db_obj=patient, obj_in=patient_update)
+    return await async_patient_crud.update(db, db_obj=patient, obj_in=patient_update)
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_patient(patient_id: int, db: Session = Depends(get_db)):
+async def delete_patient(patient_id: int, db: Session = Depends(get_api_db)):
     """
     Delete a patient.
     """
-    patient = patient_crud.get(db, id=patient_id)
+    patient = await async_patient_crud.get(db, id=patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Patient with ID {patient_id} not found"
         )
     
-    patient_crud.remove(db, id=patient_id)
+    await async_patient_crud.remove(db, id=patient_id)
     return {"message": "Patient deleted successfully"}
 
-@router.get("/{patient_id}/appointments", response_model=List[dict])
-def get_patient_appointments(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/{patient_id}/appointments", response_model=List[Appointment])
+async def get_patient_appointments(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
     """
     Get all appointments for a specific patient.
     """
-    from src.crud import appointment_crud
-    appointments = appointment_crud.get_by_patient(db, patient_id=patient_id)
-    return appointments
+    from src.crud import async_appointment_crud
+    appointments = await async_appointment_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor
+    )
+    return with_next_cursor(response, async_appointment_crud, appointments, limit)
 
-@router.get("/{patient_id}/medical-records", response_model=List[dict])
-def get_patient_medical_records(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/{patient_id}/medical-records", response_model=List[MedicalRecord])
+async def get_patient_medical_records(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_api_db)
+):
     """
     Get all medical records for a specific patient.
     """
-    from src.crud import medical_record_crud
-    records = medical_record_crud.get_by_patient(db, patient_id=patient_id)
-    return records
+    from src.crud import async_medical_record_crud
+    records = await async_medical_record_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor
+    )
+    return with_next_cursor(response, async_medical_record_crud, records, limit)
+
+@router.get("/{patient_id}/chart", response_model=PatientChart)
+async def get_patient_chart(
+    patient_id: int,
+    appointments_limit: int = Query(10, ge=0, le=100),
+    records_limit: int = Query(10, ge=0, le=100),
+    prescriptions_limit: int = Query(10, ge=0, le=100),
+    bills_limit: int = Query(10, ge=0, le=100),
+    db: Session = Depends(get_api_db)
+):
+    """
+    Get a patient's chart in one request: demographics, recent appointments
+    and medical records, active prescriptions and outstanding bills.
+    """
+    chart = await async_patient_crud.get_chart(
+        db, patient_id,
+        appointments_limit=appointments_limit,
+        records_limit=records_limit,
+        prescriptions_limit=prescriptions_limit,
+        bills_limit=bills_limit
+    )
+    if not chart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Patient with ID {patient_id} not found"
+        )
+    return chart
@@ -1,31 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, status
 from sqlalchemy.orm import Session
-from typing import List
-from database.config import get_db
+from typing import Any, Dict, List, Optional
+from src.api.sessions import get_api_db
 from src.schemas.prescription import Prescription, PrescriptionCreate, PrescriptionUpdate
-from src.crud import prescription_crud
+from src.crud import async_prescription_crud
+from src.api.pagination import with_next_cursor
+from src.api.serialize import fast_list
+from src.api.expand import expand_param
+from src.schemas.expanded import PrescriptionExpanded
+from src.api.bulk import bulk_create
+from src.api.export import ExportFormat, export_response
+from src.schemas.bulk import BulkCreateResult
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Prescription])
-def read_prescriptions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return prescription_crud.get_multi(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[PrescriptionExpanded], response_model_exclude_unset=True)
+async def read_prescriptions(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    prescriptions = await async_prescription_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor, expand=expand)
+    return fast_list(response, Prescription, with_next_cursor(response, async_prescription_crud, prescriptions, limit), expand)
 
-@router.get("/{prescription_id}", response_model=Prescription)
-def read_prescription(prescription_id: int, db: Session = Depends(get_db)):
-    prescription = prescription_crud.get(db, id=prescription_id)
+@router.get("/export")
+async def export_prescriptions(format: ExportFormat = "ndjson", db: Session = Depends(get_api_db)):
+    """
+    Stream all prescriptions as NDJSON or CSV.
+    """
+    return export_response(db, async_prescription_crud, format)
+
+@router.get("/{prescription_id}", response_model=PrescriptionExpanded, response_model_exclude_unset=True)
+async def read_prescription(prescription_id: int, expand: List[str] = Depends(expand_param), db: Session = Depends(get_api_db)):
+    prescription = await async_prescription_crud.get(db, id=prescription_id, expand=expand)
     if not prescription:
         raise HTTPException(status_code=404, detail="Prescription not found")
     return prescription
 
 @router.post("/", response_model=Prescription, status_code=201)
-def create_prescription(prescription: PrescriptionCreate, db: Session = Depends(get_db)):
-    return prescription_crud.create(db, obj_in=prescription)
+async def create_prescription(prescription: PrescriptionCreate, db: Session = Depends(get_api_db)):
+    return await async_prescription_crud.create(db, obj_in=prescription)
+
+@router.post("/bulk", response_model=BulkCreateResult[Prescription], status_code=201)
+async def create_prescriptions_bulk(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_api_db)):
+    return await bulk_create(db, async_prescription_crud, PrescriptionCreate, rows)
 
-@router.get("/patient/{patient_id}", response_model=List[Prescription])
-def get_patient_prescriptions(patient_id: int, db: Session = Depends(get_db)):
-    return prescription_crud.get_by_patient(db, patient_id=patient_id)
+@router.get("/patient/{patient_id}", response_model=List[PrescriptionExpanded], response_model_exclude_unset=True)
+async def get_patient_prescriptions(
+    patient_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    prescriptions = await async_prescription_crud.get_by_patient(
+        db, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_prescription_crud, prescriptions, limit)
 
-@router.get("/active/", response_model=List[Prescription])
-def get_active_prescriptions(db: Session = Depends(get_db)):
-    return prescription_crud.get_active_prescriptions(db)
+@router.get("/active/", response_model=List[PrescriptionExpanded], response_model_exclude_unset=True)
+async def get_active_prescriptions(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: List[str] = Depends(expand_param),
+    db: Session = Depends(get_api_db)
+):
+    prescriptions = await async_prescription_crud.get_active_prescriptions(
+        db, skip=skip, limit=limit, cursor=cursor, expand=expand
+    )
+    return with_next_cursor(response, async_prescription_crud, prescriptions, limit)
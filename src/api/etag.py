@@ -0,0 +1,37 @@
+import hashlib
+from typing import Callable
+from fastapi import Depends, HTTPException, Request, Response, status
+from src.api.sessions import get_api_db
+from src.crud import table_versions
+from src.crud.async_base import DBSession, run_sync
+
+async def current_etag(db: DBSession, *tables: str) -> str:
+    """Strong validator for responses built only from `tables`"""
+    versions = ".".join(map(str, await run_sync(db, table_versions.version, *tables)))
+    digest = hashlib.blake2b(f"{':'.join(tables)}:{versions}".encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+def conditional_get(*tables: str) -> Callable:
+    """
+    Route dependency adding an ETag to GET responses read from `tables`.
+
+    The tag comes from the tables' entries in the row change log, read on
+    the request's own session, so a matching If-None-Match is answered with
+    304 after that one lookup, before the handler runs its queries or
+    serializes anything.
+    """
+    async def dependency(request: Request, response: Response, db: DBSession = Depends(get_api_db)) -> None:
+        etag = await current_etag(db, *tables)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return dependency
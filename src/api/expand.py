@@ -0,0 +1,13 @@
+from typing import List, Optional
+from fastapi import Query
+
+def expand_param(
+    expand: Optional[str] = Query(
+        None,
+        description="Comma-separated relationships to embed, e.g. patient,doctor,bills"
+    )
+) -> List[str]:
+    """Parse ?expand=a,b into a list of relationship names"""
+    if not expand:
+        return []
+    return [name.strip() for name in expand.split(",") if name.strip()]
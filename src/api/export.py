@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, AsyncIterator, Literal, Optional
+from fastapi.responses import StreamingResponse
+from src.crud.async_base import AsyncCRUDBase, DBSession
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def json_value(value: Any) -> Any:
+    """Render dates as ISO 8601 and decimals as numbers, like the JSON API"""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+async def ndjson_chunks(batches: AsyncIterator) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(json.dumps(dict(row), default=json_value) + "\n" for row in batch)
+
+async def csv_chunks(batches: AsyncIterator, columns: list) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows(row.values() for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(
+    db: DBSession,
+    crud: AsyncCRUDBase,
+    format: ExportFormat,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> StreamingResponse:
+    """
+    Stream a whole table as NDJSON or CSV, one chunk per fetched batch.
+
+    The session stays open until the last chunk is sent, since dependencies
+    with yield are torn down after the response.
+    """
+    batches = crud.export_batches(db, date_from=date_from, date_to=date_to)
+    table = crud.model.__table__
+    if format == "csv":
+        chunks = csv_chunks(batches, [column.name for column in table.columns])
+    else:
+        chunks = ndjson_chunks(batches)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table.name}.{format}"'}
+    )
@@ -1,9 +1,26 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from database.config import get_db
+from database.config import AUTOCOMPLETE_WARMUP, get_pool_stats
 from src.schemas import *
 from src.crud import *
+from src.crud.appointment import BookingConflict
+from src.crud.base import DuplicateKeyError, InvalidCursor, InvalidExpand
+from src.api.pagination import NEXT_CURSOR_HEADER
+from src.api.autocomplete import refresh_indexes
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Autocomplete and schedule indexes are built off the request path and
+    # kept current from the row change log
+    stop = threading.Event()
+    if AUTOCOMPLETE_WARMUP:
+        threading.Thread(target=refresh_indexes, args=(stop,), daemon=True).start()
+    yield
+    stop.set()
 
 # Create FastAPI application
 app = FastAPI(
@@ -11,7 +28,8 @@ app = FastAPI(
     description="A comprehensive REST API for managing healthcare operations including patients, doctors, appointments, medical records, prescriptions, billing, and inventory.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,8 +39,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# CRUD-layer errors that are the client's fault
+async def bad_request_handler(request: Request, exc: ValueError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+for client_error in (InvalidCursor, InvalidExpand, DuplicateKeyError):
+    app.add_exception_handler(client_error, bad_request_handler)
+
+@app.exception_handler(BookingConflict)
+async def booking_conflict_handler(request: Request, exc: BookingConflict):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc), "conflict": exc.appointment.model_dump(mode="json")}
+    )
+
 # Health check endpoint
 @app.get("/", tags=["Health"])
 def read_root():
@@ -45,6 +78,18 @@ def read_root():
 def health_check():
     return {"status": "healthy", "message": "Healthcare API is running"}
 
+@app.get("/health/cache", tags=["Health"])
+def cache_stats():
+    """Entity cache hit/miss/eviction counters for this worker"""
+    if entity_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **entity_cache.stats()}
+
+@app.get("/health/db-pool", tags=["Health"])
+def db_pool_stats():
+    """Connection pool in-use/idle gauges and checkout wait times for this worker"""
+    return get_pool_stats()
+
 # Include routers
 from src.api.endpoints import patients, doctors, appointments, medical_records, prescriptions, billing, inventory
 
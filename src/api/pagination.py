@@ -0,0 +1,15 @@
+from typing import Any, List
+from fastapi import Response
+
+# Response header carrying the opaque keyset token for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def with_next_cursor(response: Response, crud: Any, items: List[Any], limit: int, order_by: Any = None) -> List[Any]:
+    """
+    Set X-Next-Cursor when there may be a following page and return items;
+    order_by must be the sort column the page was fetched with
+    """
+    token = crud.next_cursor(items, limit, order_by=order_by)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return items
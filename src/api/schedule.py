@@ -0,0 +1,19 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+from database.config import SCHEDULE_HORIZON_DAYS
+from src.crud.async_base import AsyncCRUDBase, DBSession
+
+async def find_slots(
+    db: DBSession, crud: AsyncCRUDBase, doctor_ids: List[int], date_from: Optional[date],
+    date_to: Optional[date], limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Free slots of `doctor_ids` between date_from and date_to (both ends
+    inclusive), never in the past; from db until the schedule index is built
+    """
+    now = datetime.now()
+    start = max(now, datetime.combine(date_from, time())) if date_from else now
+    end = datetime.combine(date_to or start.date() + timedelta(days=SCHEDULE_HORIZON_DAYS), time()) + timedelta(days=1)
+    if not crud.index.ready:
+        return await crud.free_slots_from_db(db, doctor_ids, start, end, limit)
+    return crud.index.free_slots(doctor_ids, start, end, limit)
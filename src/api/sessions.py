@@ -0,0 +1,27 @@
+from fastapi import Request
+from database.config import USE_ASYNC_DB, RoutingSessionLocal, SessionLocal, get_async_sessionmaker
+
+def is_read(request: Request) -> bool:
+    return request.method in ("GET", "HEAD")
+
+def get_routed_db(request: Request):
+    """
+    Database dependency sending GET/HEAD requests to the read replicas.
+
+    Other methods get a primary session. A GET that writes is moved to the
+    primary for the rest of the request by RoutingSession.
+    """
+    factory = RoutingSessionLocal if is_read(request) else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_routed_async_db(request: Request):
+    """get_routed_db for the async stack, reading from the async replicas"""
+    async with get_async_sessionmaker(routed=is_read(request))() as db:
+        yield db
+
+# Dependency used by the API routers; USE_ASYNC_DB selects the stack
+get_api_db = get_routed_async_db if USE_ASYNC_DB else get_routed_db
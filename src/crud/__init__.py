@@ -5,18 +5,54 @@ from .medical_record import CRUDMedicalRecord
 from .prescription import CRUDPrescription
 from .billing import CRUDBilling
 from .inventory import CRUDInventory
+from .async_base import AsyncCRUDBase
+from .autocomplete import AutocompleteIndex
+from .cache import EntityCache
+from .schedule import ScheduleIndex
+from .versions import table_versions
+from database.config import (
+    ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL, SCHEDULE_DAY_END, SCHEDULE_DAY_START, SCHEDULE_SLOT_MINUTES,
+    SCHEDULE_WORKDAYS
+)
+
+# Patients and doctors are read (and existence-checked) far more often than
+# they are written, so their detail lookups go through a shared entity cache
+entity_cache = EntityCache(maxsize=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL) if ENTITY_CACHE_SIZE > 0 else None
+
+# Front-desk name/phone/ID suggestions, served from memory
+patient_autocomplete = AutocompleteIndex()
+doctor_autocomplete = AutocompleteIndex()
+
+# Booked appointment times per doctor, for free-slot searches
+doctor_schedule = ScheduleIndex(
+    day_start=SCHEDULE_DAY_START, day_end=SCHEDULE_DAY_END, slot_minutes=SCHEDULE_SLOT_MINUTES,
+    workdays=SCHEDULE_WORKDAYS
+)
 
 # Create instances
-patient_crud = CRUDPatient()
-doctor_crud = CRUDDoctor()
-appointment_crud = CRUDAppointment()
+patient_crud = CRUDPatient(cache=entity_cache, index=patient_autocomplete)
+doctor_crud = CRUDDoctor(cache=entity_cache, index=doctor_autocomplete)
+appointment_crud = CRUDAppointment(index=doctor_schedule)
 medical_record_crud = CRUDMedicalRecord()
 prescription_crud = CRUDPrescription()
 billing_crud = CRUDBilling()
 inventory_crud = CRUDInventory()
 
+# Awaitable wrappers used by the async API handlers
+async_patient_crud = AsyncCRUDBase(patient_crud)
+async_doctor_crud = AsyncCRUDBase(doctor_crud)
+async_appointment_crud = AsyncCRUDBase(appointment_crud)
+async_medical_record_crud = AsyncCRUDBase(medical_record_crud)
+async_prescription_crud = AsyncCRUDBase(prescription_crud)
+async_billing_crud = AsyncCRUDBase(billing_crud)
+async_inventory_crud = AsyncCRUDBase(inventory_crud)
+
 __all__ = [
     "patient_crud", "doctor_crud", "appointment_crud", 
     "medical_record_crud", "prescription_crud", "billing_crud", 
-    "inventory_crud"
+    "inventory_crud", "entity_cache", "table_versions",
+    "patient_autocomplete", "doctor_autocomplete", "doctor_schedule",
+    "async_patient_crud", "async_doctor_crud", "async_appointment_crud",
+    "async_medical_record_crud", "async_prescription_crud", "async_billing_crud",
+    "async_inventory_crud"
 ]
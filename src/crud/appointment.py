@@ -1,58 +1,248 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime
+from sqlalchemy import Select, and_, func, or_, select
+from datetime import datetime, timedelta
+from database.config import SCHEDULE_SLOT_MINUTES
 from src.models.appointment import Appointment
-from src.schemas.appointment import AppointmentCreate, AppointmentUpdate
-from .base import CRUDBase
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.schemas.appointment import Appointment as AppointmentOut, AppointmentCreate, AppointmentUpdate
+from .base import BULK_CHUNK_SIZE, CRUDBase
+from .indexed import IndexedMixin
+from .schedule import FREE_STATUSES, ScheduleIndex
 
-class CRUDAppointment(CRUDBase[Appointment, AppointmentCreate, AppointmentUpdate]):
-    def __init__(self):
-        super().__init__(Appointment)
+# First key of the advisory locks serializing bookings per doctor and patient
+DOCTOR_LOCK = 1
+PATIENT_LOCK = 2
+
+# SQLite drivers whose connections tell whether a transaction is open
+SQLITE_DRIVERS = ("pysqlite", "aiosqlite")
+
+# Upcoming appointments are listed soonest first, keyset paged on it
+UPCOMING_ORDER_BY = Appointment.appointment_date
+
+class BookingConflict(ValueError):
+    """Raised when an appointment would overlap one of the doctor or the patient"""
+
+    def __init__(self, conflict: Appointment, doctor_id: int):
+        self.appointment = AppointmentOut.model_validate(conflict)
+        who = f"Doctor {doctor_id}" if conflict.doctor_id == doctor_id else f"Patient {conflict.patient_id}"
+        super().__init__(f"{who} already has an appointment at {conflict.appointment_date.isoformat()}")
+
+class CRUDAppointment(IndexedMixin, CRUDBase[Appointment, AppointmentCreate, AppointmentUpdate]):
+    expandable = ("patient", "doctor", "bills")
+    date_column = "appointment_date"
+
+    def __init__(self, index: Optional[ScheduleIndex] = None):
+        super().__init__(Appointment, index=index)
+
+    def index_query(self) -> Select:
+        # Past appointments never block a free slot
+        cutoff = datetime.now() - timedelta(days=1)
+        return super().index_query().where(Appointment.appointment_date >= cutoff)
+
+    def free_slots_from_db(
+        self, db: Session, doctor_ids: Sequence[int], start: datetime, end: datetime, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        What the schedule index would answer, from these doctors'
+        appointments around [start, end), for lookups made before the index
+        is built
+        """
+        slot = timedelta(minutes=SCHEDULE_SLOT_MINUTES)
+        rows = db.execute(self.index_query().where(
+            Appointment.doctor_id.in_(set(doctor_ids)),
+            Appointment.appointment_date > start - slot,
+            Appointment.appointment_date < end + slot
+        ))
+        index = self.index.blank()
+        index.build(index.entry(row[0], row) for row in rows)
+        return index.free_slots(doctor_ids, start, end, limit)
+
+    def lock_booking(self, db: Session, doctor_id: int, patient_id: int) -> None:
+        """
+        Serialize bookings for this doctor and patient until the transaction
+        ends, so the overlap check and the write happen as one step.
+        """
+        self.lock_bookings(db, [doctor_id], [patient_id])
+
+    def lock_bookings(self, db: Session, doctor_ids: Iterable[int], patient_ids: Iterable[int]) -> None:
+        """
+        Take the booking locks of several doctors and patients at once.
+
+        PostgreSQL takes transaction-scoped advisory locks, doctors before
+        patients and each in ID order, so two bookings never wait on each
+        other; SQLite has a single writer, which BEGIN IMMEDIATE takes up
+        front.
+        """
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            for namespace, keys in ((DOCTOR_LOCK, doctor_ids), (PATIENT_LOCK, patient_ids)):
+                for key in sorted(set(keys)):
+                    connection.execute(select(func.pg_advisory_xact_lock(namespace, key)))
+        elif connection.dialect.name == "sqlite":
+            if connection.dialect.driver not in SQLITE_DRIVERS:
+                raise NotImplementedError(f"Booking locks are not supported on {connection.dialect.driver}")
+            # The sqlite3 connection, or the aiosqlite one wrapping it
+            if not connection.connection.driver_connection.in_transaction:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def find_conflict(
+        self, db: Session, doctor_id: int, patient_id: int, appointment_date: datetime,
+        exclude_id: Optional[int] = None
+    ) -> Optional[Appointment]:
+        """
+        The earliest live appointment of the doctor or the patient starting
+        less than one slot before or after appointment_date
+        """
+        slot = timedelta(minutes=SCHEDULE_SLOT_MINUTES)
+        query = db.query(Appointment).filter(
+            or_(Appointment.doctor_id == doctor_id, Appointment.patient_id == patient_id),
+            Appointment.appointment_date > appointment_date - slot,
+            Appointment.appointment_date < appointment_date + slot,
+            or_(Appointment.status.is_(None), Appointment.status.notin_(FREE_STATUSES))
+        )
+        if exclude_id is not None:
+            query = query.filter(Appointment.appointment_id != exclude_id)
+        return query.order_by(Appointment.appointment_date).first()
+
+    def check_booking(self, db: Session, values: Any, exclude_id: Optional[int] = None) -> None:
+        """Lock and check the slot of `values`, raising BookingConflict on an overlap"""
+        if values.status in FREE_STATUSES:
+            return
+        self.lock_booking(db, values.doctor_id, values.patient_id)
+        conflict = self.find_conflict(
+            db, values.doctor_id, values.patient_id, values.appointment_date, exclude_id=exclude_id
+        )
+        if conflict is not None:
+            error = BookingConflict(conflict, values.doctor_id)
+            db.rollback()
+            raise error
+
+    def create(self, db: Session, *, obj_in: AppointmentCreate) -> Appointment:
+        self.check_booking(db, obj_in)
+        return super().create(db, obj_in=obj_in)
+
+    def create_many(
+        self, db: Session, *, objs_in: List[AppointmentCreate], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Tuple[List[Appointment], List[Tuple[int, str]]]:
+        """
+        Bulk insert with the checks of a single booking: rows for an unknown
+        patient, an unknown or inactive doctor, or overlapping a live
+        appointment (stored or earlier in the batch) are rejected by
+        position, and the rest are inserted.
+
+        The booking locks of every doctor and patient in the batch are held
+        from the checks through the insert.
+        """
+        self.lock_bookings(db, (obj.doctor_id for obj in objs_in), (obj.patient_id for obj in objs_in))
+        doctors = dict(db.execute(
+            select(Doctor.doctor_id, Doctor.is_active).where(Doctor.doctor_id.in_({obj.doctor_id for obj in objs_in}))
+        ).all())
+        patients = set(db.scalars(
+            select(Patient.patient_id).where(Patient.patient_id.in_({obj.patient_id for obj in objs_in}))
+        ))
+
+        accepted: List[Tuple[int, AppointmentCreate]] = []
+        rejected: List[Tuple[int, str]] = []
+        # Start times already booked by earlier rows of the batch
+        booked: Dict[Tuple[str, int], List[datetime]] = defaultdict(list)
+        slot = timedelta(minutes=SCHEDULE_SLOT_MINUTES)
+        for position, obj in enumerate(objs_in):
+            if obj.patient_id not in patients:
+                rejected.append((position, f"Patient with ID {obj.patient_id} not found"))
+                continue
+            if obj.doctor_id not in doctors:
+                rejected.append((position, f"Doctor with ID {obj.doctor_id} not found"))
+                continue
+            if not doctors[obj.doctor_id]:
+                rejected.append((position, "Cannot schedule appointment with inactive doctor"))
+                continue
+            if obj.status not in FREE_STATUSES:
+                keys = (("Doctor", obj.doctor_id), ("Patient", obj.patient_id))
+                clash = next((
+                    (who, key, when) for who, key in keys for when in booked[who, key]
+                    if abs(when - obj.appointment_date) < slot
+                ), None)
+                if clash is not None:
+                    who, key, when = clash
+                    rejected.append((position, f"{who} {key} already has an appointment at {when.isoformat()} in this batch"))
+                    continue
+                conflict = self.find_conflict(db, obj.doctor_id, obj.patient_id, obj.appointment_date)
+                if conflict is not None:
+                    rejected.append((position, str(BookingConflict(conflict, obj.doctor_id))))
+                    continue
+                for key in keys:
+                    booked[key].append(obj.appointment_date)
+            accepted.append((position, obj))
+
+        created, failures = super().create_many(db, objs_in=[obj for _, obj in accepted], chunk_size=chunk_size)
+        rejected.extend((accepted[position][0], message) for position, message in failures)
+        return created, sorted(rejected)
+
+    def update(self, db: Session, *, db_obj: Appointment, obj_in: AppointmentUpdate) -> Appointment:
+        values = AppointmentOut.model_validate(db_obj).model_copy(update=obj_in.model_dump(exclude_unset=True))
+        self.check_booking(db, values, exclude_id=db_obj.appointment_id)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
     
     def get_by_patient(
-        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Appointment]:
-        return (
+        return self.paginate(
             db.query(Appointment)
-            .filter(Appointment.patient_id == patient_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Appointment.patient_id == patient_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_by_doctor(
-        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Appointment]:
-        return (
+        return self.paginate(
             db.query(Appointment)
-            .filter(Appointment.doctor_id == doctor_id)
-            .offset(skip)
-            .limit(limit)
+            .filter(Appointment.doctor_id == doctor_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
+        )
+
+    def get_doctor_calendar(
+        self, db: Session, doctor_id: int, start: datetime, end: datetime,
+        status: Optional[str] = None, expand: Sequence[str] = ()
+    ) -> List[Appointment]:
+        """A doctor's appointments starting in [start, end), in time order"""
+        query = db.query(Appointment).filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.appointment_date >= start,
+            Appointment.appointment_date < end
+        )
+        if status:
+            query = query.filter(Appointment.status == status)
+        return (
+            query.options(*self.load_options(expand))
+            .order_by(Appointment.appointment_date, Appointment.appointment_id)
             .all()
         )
 
     def get_by_status(
-        self, db: Session, status: str, skip: int = 0, limit: int = 100
+        self, db: Session, status: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Appointment]:
-        return (
+        return self.paginate(
             db.query(Appointment)
-            .filter(Appointment.status == status)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Appointment.status == status),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_upcoming_appointments(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Appointment]:
-        return (
+        return self.paginate(
             db.query(Appointment)
             .filter(and_(
                 Appointment.appointment_date >= datetime.now(),
                 Appointment.status == "Scheduled"
-            ))
-            .offset(skip)
-            .limit(limit)
-            .all()
+            )),
+            skip=skip, limit=limit, cursor=cursor, order_by=UPCOMING_ORDER_BY, expand=expand
         )
@@ -0,0 +1,92 @@
+from datetime import date
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Generic, List, Optional, Sequence, Tuple, Union
+import anyio
+from starlette.concurrency import iterate_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+from .base import CRUDBase, ModelType, CreateSchemaType, UpdateSchemaType
+
+DBSession = Union[Session, AsyncSession]
+
+async def run_sync(db: DBSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call fn(session, ...) without blocking the event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await anyio.to_thread.run_sync(partial(fn, db, *args, **kwargs))
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Awaitable front for a sync CRUD object.
+
+    With an AsyncSession the wrapped query code runs through
+    AsyncSession.run_sync on the async driver, so the event loop never blocks
+    on I/O. With a plain Session it runs in a worker thread instead. Helpers
+    defined on the CRUD subclasses (get_by_phone, get_by_doctor, ...) are
+    exposed as coroutines with the same signature.
+    """
+
+    def __init__(self, crud: CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+        self.crud = crud
+        self.model = crud.model
+
+    async def run(self, db: DBSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await run_sync(db, fn, *args, **kwargs)
+
+    async def get(self, db: DBSession, id: Any, expand: Sequence[str] = ()) -> Optional[ModelType]:
+        return await self.run(db, self.crud.get, id, expand=expand)
+
+    async def get_multi(
+        self, db: DBSession, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        expand: Sequence[str] = ()
+    ) -> List[ModelType]:
+        return await self.run(db, self.crud.get_multi, skip=skip, limit=limit, cursor=cursor, expand=expand)
+
+    async def create(self, db: DBSession, *, obj_in: CreateSchemaType) -> ModelType:
+        return await self.run(db, self.crud.create, obj_in=obj_in)
+
+    async def create_unique(self, db: DBSession, *, obj_in: CreateSchemaType) -> ModelType:
+        return await self.run(db, self.crud.create_unique, obj_in=obj_in)
+
+    async def upsert(self, db: DBSession, *, key: str, obj_in: CreateSchemaType) -> ModelType:
+        return await self.run(db, self.crud.upsert, key=key, obj_in=obj_in)
+
+    async def create_many(
+        self, db: DBSession, *, objs_in: List[CreateSchemaType]
+    ) -> Tuple[List[ModelType], List[Tuple[int, str]]]:
+        return await self.run(db, self.crud.create_many, objs_in=objs_in)
+
+    async def update(
+        self, db: DBSession, *, db_obj: ModelType, obj_in: UpdateSchemaType
+    ) -> ModelType:
+        return await self.run(db, self.crud.update, db_obj=db_obj, obj_in=obj_in)
+
+    async def remove(self, db: DBSession, *, id: int) -> ModelType:
+        return await self.run(db, self.crud.remove, id=id)
+
+    async def export_batches(
+        self, db: DBSession, *, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        if isinstance(db, AsyncSession):
+            result = await db.stream(self.crud.export_query(date_from=date_from, date_to=date_to))
+            async for batch in result.mappings().partitions():
+                yield batch
+        else:
+            batches = self.crud.export_batches(db, date_from=date_from, date_to=date_to)
+            async for batch in iterate_in_threadpool(batches):
+                yield batch
+
+    def next_cursor(self, items: List[ModelType], limit: int, order_by: Any = None) -> Optional[str]:
+        return self.crud.next_cursor(items, limit, order_by=order_by)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.crud, name)
+        if not callable(attr):
+            return attr
+
+        async def method(db: DBSession, *args, **kwargs):
+            return await self.run(db, attr, *args, **kwargs)
+
+        method.__name__ = name
+        return method
@@ -0,0 +1,213 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice, takewhile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Leading bytes keeping phone and ID keys apart from names, which are
+# normalized to lowercase letters, digits and spaces
+PHONE_KEY = "\x02"
+ID_KEY = "\x03"
+FIELD_SEP = "\x01"
+ENTRY_SEP = b"\x00"
+
+Entry = Tuple[int, str, str, str]
+
+def normalize(text: str) -> str:
+    """Lowercase, accent-free, single-spaced alphanumerics"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text).split())
+
+def digits(text: Optional[str]) -> str:
+    return re.sub(r"\D", "", text or "")
+
+def printable(text: Optional[str]) -> str:
+    """Display value with the separator bytes removed"""
+    return re.sub(r"[\x00-\x03]", "", text or "")
+
+class AutocompleteIndex:
+    """
+    In-process prefix index over names, phone suffixes and IDs.
+
+    Every row is stored under "first last", "last first", its phone digits
+    reversed (so typing the last digits of a number is a prefix match) and
+    its ID. Entries live in one sorted, NUL-separated bytes blob plus an
+    array of offsets: a few dozen bytes per entry and no Python object per
+    row, and a lookup is a binary search. Writes go to a small sorted
+    overlay, with rewritten or deleted rows hidden from the blob, and the
+    overlay is folded into the blob once it outgrows `merge_threshold`.
+    """
+
+    def __init__(
+        self, name_fields: Tuple[str, str] = ("first_name", "last_name"), phone_field: str = "phone",
+        merge_threshold: int = 10000
+    ):
+        self.name_fields = name_fields
+        self.phone_field = phone_field
+        self.merge_threshold = merge_threshold
+        self._lock = threading.Lock()
+        self._blob = b""
+        self._offsets = array("Q", [0])
+        self._overlay: List[bytes] = []
+        self._overlay_ids: Dict[int, List[bytes]] = {}
+        self._hidden: Set[int] = set()
+        self.ready = False
+        self.built_at = 0.0
+        # Change log position the index is current up to and when it got
+        # there, see IndexedMixin.refresh_index
+        self.horizon = 0
+        self.refreshed_at = 0.0
+
+    def blank(self) -> "AutocompleteIndex":
+        """An empty index with the same settings"""
+        return AutocompleteIndex(self.name_fields, self.phone_field, self.merge_threshold)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return (*self.name_fields, self.phone_field)
+
+    def entry(self, id: int, obj: Any) -> Entry:
+        """Fields of a row (ORM object or result row) needed to index it"""
+        first, last = (printable(getattr(obj, field)) for field in self.name_fields)
+        return id, first, last, printable(getattr(obj, self.phone_field))
+
+    @staticmethod
+    def encode(entry: Entry) -> List[bytes]:
+        id, first, last, phone = entry
+        payload = f"{FIELD_SEP}{id}{FIELD_SEP}{first} {last}{FIELD_SEP}{phone}"
+        first, last = normalize(first), normalize(last)
+        keys = {f"{first} {last}".strip(), f"{last} {first}".strip(), f"{ID_KEY}{id}"}
+        if digits(phone):
+            keys.add(PHONE_KEY + digits(phone)[::-1])
+        return [(key + payload).encode() for key in keys if key]
+
+    @staticmethod
+    def decode(raw: bytes) -> Dict[str, Any]:
+        _, id, name, phone = raw.decode().split(FIELD_SEP)
+        return {"id": int(id), "name": name, "phone": phone}
+
+    @staticmethod
+    def entry_id(raw: bytes) -> int:
+        return int(raw.split(FIELD_SEP.encode(), 2)[1])
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """Replace the whole index with `entries`"""
+        encoded = sorted(raw for entry in entries for raw in self.encode(entry))
+        blob, offsets = self.pack(encoded)
+        with self._lock:
+            self._blob, self._offsets = blob, offsets
+            self._overlay, self._overlay_ids, self._hidden = [], {}, set()
+            self.ready = True
+            self.built_at = self.refreshed_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Empty the index until it is built again"""
+        with self._lock:
+            self._blob, self._offsets = b"", array("Q", [0])
+            self._overlay, self._overlay_ids, self._hidden = [], {}, set()
+            self.ready = False
+            self.horizon = 0
+
+    @staticmethod
+    def pack(encoded: List[bytes]) -> Tuple[bytes, array]:
+        offsets = array("Q", [0])
+        for raw in encoded:
+            offsets.append(offsets[-1] + len(raw) + 1)
+        return b"".join(raw + ENTRY_SEP for raw in encoded), offsets
+
+    def _base(self, position: int) -> bytes:
+        return self._blob[self._offsets[position]:self._offsets[position + 1] - 1]
+
+    def put(self, entry: Entry) -> None:
+        """Add or replace one row"""
+        with self._lock:
+            if not self.ready:
+                return
+            self._discard(entry[0])
+            encoded = self.encode(entry)
+            for raw in encoded:
+                insort(self._overlay, raw)
+            self._overlay_ids[entry[0]] = encoded
+            if len(self._overlay) > self.merge_threshold:
+                self._merge()
+
+    def discard(self, id: int) -> None:
+        with self._lock:
+            if self.ready:
+                self._discard(id)
+
+    def _discard(self, id: int) -> None:
+        self._hidden.add(id)
+        for raw in self._overlay_ids.pop(id, []):
+            del self._overlay[bisect_left(self._overlay, raw)]
+
+    def _merge(self) -> None:
+        base = (
+            self._base(position) for position in range(len(self._offsets) - 1)
+        )
+        kept = [raw for raw in base if self.entry_id(raw) not in self._hidden]
+        self._blob, self._offsets = self.pack(sorted(kept + self._overlay))
+        self._overlay, self._overlay_ids, self._hidden = [], {}, set()
+
+    def _base_matches(self, prefix: bytes) -> Iterator[bytes]:
+        count = len(self._offsets) - 1
+        position = bisect_left(range(count), prefix, key=self._base)
+        while position < count:
+            raw = self._base(position)
+            if not raw.startswith(prefix):
+                return
+            if self.entry_id(raw) not in self._hidden:
+                yield raw
+            position += 1
+
+    def _scan(self, prefix: bytes, limit: int) -> List[bytes]:
+        """
+        Entries starting with `prefix` in key order, first one per row, for
+        up to `limit` rows: a row has several keys and more than one can match
+        """
+        overlay = islice(self._overlay, bisect_left(self._overlay, prefix), None)
+        found, seen = [], set()
+        for raw in heapq.merge(self._base_matches(prefix), takewhile(lambda raw: raw.startswith(prefix), overlay)):
+            id = self.entry_id(raw)
+            if id not in seen:
+                seen.add(id)
+                found.append(raw)
+                if len(found) == limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rows whose name starts with `query` (first or last name first), or
+        for digit-only queries rows whose ID starts with it or whose phone
+        number ends with it
+        """
+        query = normalize(query)
+        if re.search("[a-z]", query):
+            prefixes = [query]
+        else:
+            number = digits(query)
+            prefixes = [ID_KEY + number, PHONE_KEY + number[::-1]] if number else []
+        results, seen = [], set()
+        with self._lock:
+            for prefix in prefixes:
+                for raw in self._scan(prefix.encode(), limit):
+                    suggestion = self.decode(raw)
+                    if suggestion["id"] not in seen and len(results) < limit:
+                        seen.add(suggestion["id"])
+                        results.append(suggestion)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "entries": len(self._offsets) - 1 + len(self._overlay),
+                "bytes": len(self._blob) + self._offsets.itemsize * len(self._offsets),
+                "pending": len(self._overlay)
+            }
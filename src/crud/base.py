@@ -1,45 +1,364 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+import base64
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, and_, insert, inspect, or_, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session, joinedload, make_transient_to_detached, selectinload
 from database.config import Base
+from .cache import EntityCache
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows per multi-row INSERT statement in create_many
+BULK_CHUNK_SIZE = 1000
+
+# Rows fetched per round trip by the export streams
+EXPORT_BATCH_SIZE = 1000
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+class InvalidExpand(ValueError):
+    """Raised when an expand parameter names an unknown relationship"""
+
+class DuplicateKeyError(ValueError):
+    """Raised when a write collides with a unique natural key"""
+
+    def __init__(self, model_name: str, label: Optional[str]):
+        self.model_name = model_name
+        self.label = label
+        if label:
+            super().__init__(f"{model_name} with this {label} already exists")
+        else:
+            super().__init__(f"{model_name} already exists")
+
+def dialect_insert(db: Session):
+    """Dialect-specific insert() supporting ON CONFLICT clauses"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert
+    raise NotImplementedError(f"ON CONFLICT is not supported on {dialect}")
+
+def keep_loaded(db: Session, objs: Sequence[Any]) -> None:
+    """
+    Detach rows that INSERT ... RETURNING loaded in full, so the commit does
+    not expire them and reading them afterwards (serializing a response)
+    does not cost a SELECT per row
+    """
+    for obj in objs:
+        db.expunge(obj)
+
+def like_pattern(value: str) -> str:
+    """Substring ILIKE pattern with the LIKE wildcards in value escaped"""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def encode_cursor(values: List[Any]) -> str:
+    """Pack the keyset values of the last row into an opaque token"""
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: List[Any]) -> List[Any]:
+    """Unpack a token from encode_cursor back into typed column values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort columns")
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid pagination cursor: {cursor}") from e
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    # Unique natural keys mapped to the label used in conflict messages,
+    # in the order conflicts are reported
+    unique_fields: Dict[str, str] = {}
+
+    # Relationships that list/detail endpoints may eager load via ?expand=
+    expandable: Tuple[str, ...] = ()
+    # Column that export date-range filters apply to, if any
+    date_column: Optional[str] = None
+
+    def __init__(self, model: Type[ModelType], cache: Optional[EntityCache] = None):
         self.model = model
+        self.primary_key = model.__mapper__.primary_key[0]
+        # Optional read-through cache for get(); None disables caching
+        self.cache = cache
+
+    def cache_key(self, id: Any) -> Tuple[str, Any]:
+        return (self.model.__tablename__, id)
+
+    def invalidate(self, id: Any) -> None:
+        """Drop a row from the entity cache after it was written"""
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_key(id))
+
+    # Hooks the writes below call to keep an in-memory index current; no-ops
+    # unless IndexedMixin (src/crud/indexed.py) provides one
+
+    def index_entries(self, objs: Sequence[Any]) -> List[Any]:
+        """Snapshot rows for the in-memory index while they are still loaded"""
+        return []
+
+    def reindex(self, entries: List[Any]) -> None:
+        pass
+
+    def unindex(self, id: Any) -> None:
+        pass
+
+    def load_options(self, expand: Sequence[str]) -> List[Any]:
+        """
+        Eager-loading options for the requested relationships.
+
+        Many-to-one relationships are joined into the main query; collections
+        are fetched with one extra SELECT ... IN per relationship, so the
+        statement count does not grow with the page size.
+        """
+        options = []
+        for name in expand:
+            if name not in self.expandable:
+                raise InvalidExpand(
+                    f"Cannot expand '{name}' on {self.model.__name__}; "
+                    f"choose from: {', '.join(self.expandable) or 'nothing'}"
+                )
+            relationship = getattr(self.model, name)
+            if relationship.property.uselist:
+                options.append(selectinload(relationship))
+            else:
+                options.append(joinedload(relationship))
+        return options
+
+    def get(self, db: Session, id: Any, expand: Sequence[str] = ()) -> Optional[ModelType]:
+        if self.cache is None or expand:
+            return db.get(self.model, id, options=self.load_options(expand))
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.patient_id == id).first()
+        key = self.cache_key(id)
+        values = self.cache.get(key)
+        if values is not None:
+            # Rebuild a persistent instance from the snapshot without a query
+            db_obj = self.model(**values)
+            make_transient_to_detached(db_obj)
+            return db.merge(db_obj, load=False)
+
+        db_obj = db.get(self.model, id)
+        # A replica may not have caught up with the latest write yet, and a
+        # cached copy would outlive the lag by the whole TTL
+        if db_obj is not None and not getattr(db, "reads_replica", False):
+            columns = self.model.__mapper__.column_attrs
+            self.cache.set(key, {attr.key: getattr(db_obj, attr.key) for attr in columns})
+        return db_obj
+
+    def sort_columns(self, order_by: Any = None) -> List[Any]:
+        """Keyset columns: the optional sort column plus the primary key as tiebreaker"""
+        if order_by is None or order_by is self.primary_key:
+            return [self.primary_key]
+        return [order_by, self.primary_key]
+
+    def paginate(
+        self,
+        query: Query,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_by: Any = None,
+        expand: Sequence[str] = ()
+    ) -> List[ModelType]:
+        """
+        Apply a stable ORDER BY and either keyset (cursor) or offset paging.
+
+        With a cursor the page starts right after the row it encodes, so the
+        cost stays flat however deep the page is; skip is ignored.
+        """
+        columns = self.sort_columns(order_by)
+        query = query.options(*self.load_options(expand)).order_by(*columns)
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            if len(columns) == 1:
+                query = query.filter(columns[0] > values[0])
+            else:
+                query = query.filter(or_(
+                    columns[0] > values[0],
+                    and_(columns[0] == values[0], columns[1] > values[1])
+                ))
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    def next_cursor(
+        self, items: List[ModelType], limit: int, order_by: Any = None
+    ) -> Optional[str]:
+        """Token for the page after items, or None when this was the last page"""
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor([getattr(last, column.key) for column in self.sort_columns(order_by)])
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        expand: Sequence[str] = ()
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.paginate(db.query(self.model), skip=skip, limit=limit, cursor=cursor, expand=expand)
+
+    def export_query(self, *, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Select:
+        """Plain-row SELECT of the whole table in primary key order, both dates inclusive"""
+        query = select(self.model.__table__).order_by(self.primary_key)
+        if date_from or date_to:
+            if self.date_column is None:
+                raise ValueError(f"{self.model.__name__} exports cannot be filtered by date")
+            column = getattr(self.model, self.date_column)
+            if date_from:
+                query = query.where(column >= date_from)
+            if date_to:
+                query = query.where(column < date_to + timedelta(days=1))
+        return query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    def export_batches(
+        self, db: Session, *, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> Iterator[Sequence[RowMapping]]:
+        """
+        Stream the table in batches of EXPORT_BATCH_SIZE rows.
+
+        yield_per uses a server-side cursor where the driver supports one, and
+        rows are never turned into ORM objects, so memory stays flat however
+        large the table is.
+        """
+        result = db.execute(self.export_query(date_from=date_from, date_to=date_to))
+        yield from result.mappings().partitions()
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = obj_in.dict()
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        entries = self.index_entries([db_obj])
+        self.reindex(entries)
+        return db_obj
+
+    def conflicting_field(self, db: Session, values: Dict[str, Any]) -> Optional[str]:
+        """Label of the first unique field whose value is already taken"""
+        for field, label in self.unique_fields.items():
+            value = values.get(field)
+            if value is not None and db.query(self.model).filter(getattr(self.model, field) == value).first():
+                return label
+        return None
+
+    def create_unique(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+        """
+        Insert relying on the table's unique constraints instead of lookups.
+
+        INSERT ... ON CONFLICT DO NOTHING RETURNING makes the common case a
+        single round trip and is safe under concurrent creates; the unique
+        fields are only queried afterwards to name the conflict.
+        """
+        values = obj_in.model_dump()
+        statement = (
+            dialect_insert(db)(self.model)
+            .values(**values)
+            .on_conflict_do_nothing()
+            .returning(self.model)
+        )
+        db_obj = db.scalars(statement).first()
+        if db_obj is None:
+            db.rollback()
+            raise DuplicateKeyError(self.model.__name__, self.conflicting_field(db, values))
+        entries = self.index_entries([db_obj])
+        keep_loaded(db, [db_obj])
+        db.commit()
+        self.reindex(entries)
+        return db_obj
+
+    def upsert(self, db: Session, *, key: str, obj_in: CreateSchemaType) -> ModelType:
+        """Insert or update the row identified by the unique column `key`"""
+        values = obj_in.model_dump()
+        statement = dialect_insert(db)(self.model).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={field: statement.excluded[field] for field in values if field != key}
+        ).returning(self.model)
+        try:
+            db_obj = db.scalars(statement, execution_options={"populate_existing": True}).first()
+            entries = self.index_entries([db_obj])
+            keep_loaded(db, [db_obj])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            other_fields = {field: value for field, value in values.items() if field != key}
+            raise DuplicateKeyError(self.model.__name__, self.conflicting_field(db, other_fields))
+        self.invalidate(inspect(db_obj).identity[0])
+        self.reindex(entries)
         return db_obj
 
+    def create_many(
+        self, db: Session, *, objs_in: List[CreateSchemaType], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Tuple[List[ModelType], List[Tuple[int, str]]]:
+        """
+        Insert a batch in one transaction using multi-row INSERT ... RETURNING.
+
+        Each chunk runs in a savepoint; if it violates a constraint the chunk
+        is replayed row by row so only the offending rows are rejected.
+        Returns the created objects and (position, error) pairs for rejects.
+        """
+        created: List[ModelType] = []
+        failures: List[Tuple[int, str]] = []
+        statement = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+
+        for start in range(0, len(objs_in), chunk_size):
+            rows = [obj.model_dump() for obj in objs_in[start:start + chunk_size]]
+            try:
+                with db.begin_nested():
+                    created.extend(db.scalars(statement, rows).all())
+                continue
+            except IntegrityError:
+                pass
+            for offset, row in enumerate(rows):
+                try:
+                    with db.begin_nested():
+                        created.extend(db.scalars(statement, [row]).all())
+                except IntegrityError as e:
+                    failures.append((start + offset, str(e.orig)))
+
+        entries = self.index_entries(created)
+        keep_loaded(db, created)
+        db.commit()
+        self.reindex(entries)
+        return created, failures
+
     def update(
         self, db: Session, *, db_obj: ModelType, obj_in: UpdateSchemaType
     ) -> ModelType:
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
         for field in update_data:
             setattr(db_obj, field, update_data[field])
         db.add(db_obj)
         db.commit()
+        self.invalidate(inspect(db_obj).identity[0])
         db.refresh(db_obj)
+        self.reindex(self.index_entries([db_obj]))
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
+        obj = db.get(self.model, id)
         db.delete(obj)
         db.commit()
+        self.invalidate(id)
+        self.unindex(id)
         return obj
@@ -1,38 +1,93 @@
-from typing import List, Optional
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text
 from src.models.billing import Billing
+from src.models.revenue import REBUILD_SQL, RevenueDaily
 from src.schemas.billing import BillingCreate, BillingUpdate
 from .base import CRUDBase
 
 class CRUDBilling(CRUDBase[Billing, BillingCreate, BillingUpdate]):
+    expandable = ("patient", "appointment")
+    date_column = "service_date"
+
     def __init__(self):
         super().__init__(Billing)
     
     def get_by_patient(
-        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Billing]:
-        return (
+        return self.paginate(
             db.query(Billing)
-            .filter(Billing.patient_id == patient_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Billing.patient_id == patient_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_by_status(
-        self, db: Session, status: str, skip: int = 0, limit: int = 100
+        self, db: Session, status: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Billing]:
-        return (
+        return self.paginate(
             db.query(Billing)
-            .filter(Billing.status == status)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Billing.status == status),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
+        )
+
+    def get_total_revenue(
+        self, db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> float:
+        """Paid revenue by service date, both ends inclusive, from the daily rollup"""
+        query = self.revenue_query(
+            db, func.sum(RevenueDaily.amount), status="Paid", date_from=date_from, date_to=date_to
         )
+        return query.scalar() or 0.0
+
+    def get_daily_revenue(
+        self, db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None,
+        status: Optional[str] = "Paid", group_by: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Revenue and bill count per service date, optionally also per status,
+        doctor or insurer, from the daily rollup
+        """
+        keys = [RevenueDaily.revenue_date]
+        if group_by:
+            keys.append(getattr(RevenueDaily, {"doctor": "doctor_id"}.get(group_by, group_by)))
+        query = self.revenue_query(
+            db, *keys, func.sum(RevenueDaily.bill_count).label("bill_count"),
+            func.sum(RevenueDaily.amount).label("amount"), status=status, date_from=date_from, date_to=date_to
+        )
+        rows = query.group_by(*keys).having(func.sum(RevenueDaily.bill_count) > 0).order_by(*keys)
+        return [row._asdict() for row in rows]
+
+    @staticmethod
+    def revenue_query(
+        db: Session, *columns: Any, status: Optional[str] = None, date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ):
+        query = db.query(*columns)
+        if status:
+            query = query.filter(RevenueDaily.status == status)
+        if date_from:
+            query = query.filter(RevenueDaily.revenue_date >= date_from)
+        if date_to:
+            query = query.filter(RevenueDaily.revenue_date <= date_to)
+        return query
+
+    def rebuild_revenue_rollup(self, db: Session) -> int:
+        """
+        Recompute the daily revenue rollup from billing, repairing any drift
+        (e.g. bills whose appointment later moved to another doctor).
 
-    def get_total_revenue(self, db: Session) -> float:
-        result = db.query(func.sum(Billing.amount)).filter(Billing.status == 'Paid').scalar()
-        return result or 0.0
+        On PostgreSQL bill writes wait until the rebuild commits, so none
+        are lost. Returns the number of rollup rows.
+        """
+        if db.connection().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE billing IN SHARE MODE"))
+        for statement in REBUILD_SQL:
+            db.execute(text(statement))
+        db.commit()
+        return db.query(func.count()).select_from(RevenueDaily).scalar()
 
 billing = CRUDBilling()
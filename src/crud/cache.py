@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+from cachetools import TTLCache
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that reports LRU evictions and TTL expirations to its owner"""
+
+    def __init__(self, owner: "EntityCache", maxsize: int, ttl: float, timer: Callable[[], float]):
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self.owner = owner
+
+    def popitem(self):
+        item = super().popitem()
+        self.owner.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.owner.expirations += len(expired)
+        return expired
+
+class EntityCache:
+    """
+    Bounded read-through cache of entity rows keyed by (table, primary key).
+
+    Stores plain column snapshots rather than ORM instances, so a cached row
+    is never shared between sessions. Entries leave the cache on LRU
+    eviction, after `ttl` seconds, or when CRUDBase writes the row. The cache
+    is per process: writes made by other workers are picked up when the
+    entry expires.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, timer: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = _CountingTTLCache(self, maxsize=maxsize, ttl=ttl, timer=timer)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return values
+
+    def set(self, key: Hashable, values: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = values
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self._entries.maxsize,
+                "ttl": self._entries.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
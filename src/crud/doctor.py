@@ -2,11 +2,16 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from src.models.doctor import Doctor
 from src.schemas.doctor import DoctorCreate, DoctorUpdate
+from .autocomplete import AutocompleteIndex
 from .base import CRUDBase
+from .cache import EntityCache
+from .person import PersonMixin
 
-class CRUDDoctor(CRUDBase[Doctor, DoctorCreate, DoctorUpdate]):
-    def __init__(self):
-        super().__init__(Doctor)
+class CRUDDoctor(PersonMixin, CRUDBase[Doctor, DoctorCreate, DoctorUpdate]):
+    unique_fields = {"phone": "phone number", "email": "email", "license_number": "license number"}
+
+    def __init__(self, cache: Optional[EntityCache] = None, index: Optional[AutocompleteIndex] = None):
+        super().__init__(Doctor, cache=cache, index=index)
     
     def get_by_email(self, db: Session, email: str) -> Optional[Doctor]:
         return db.query(Doctor).filter(Doctor.email == email).first()
@@ -18,37 +23,40 @@ class CRUDDoctor(CRUDBase[Doctor, DoctorCreate, DoctorUpdate]):
         return db.query(Doctor).filter(Doctor.license_number == license_number).first()
 
     def get_by_specialization(
-        self, db: Session, specialization: str, skip: int = 0, limit: int = 100
+        self, db: Session, specialization: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Doctor]:
-        return (
+        return self.paginate(
             db.query(Doctor)
-            .filter(Doctor.specialization == specialization)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Doctor.specialization == specialization),
+            skip=skip, limit=limit, cursor=cursor
         )
 
+    def get_active_ids(self, db: Session, specialization: Optional[str] = None) -> List[int]:
+        query = db.query(Doctor.doctor_id).filter(Doctor.is_active == True)
+        if specialization:
+            query = query.filter(Doctor.specialization == specialization)
+        return [doctor_id for doctor_id, in query]
+
     def get_active_doctors(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Doctor]:
-        return (
+        return self.paginate(
             db.query(Doctor)
-            .filter(Doctor.is_active == True)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Doctor.is_active == True),
+            skip=skip, limit=limit, cursor=cursor
         )
 
     def search_by_name(
-        self, db: Session, name: str, skip: int = 0, limit: int = 100
+        self, db: Session, name: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, active_only: bool = False
     ) -> List[Doctor]:
-        return (
-            db.query(Doctor)
-            .filter(
-                (Doctor.first_name.ilike(f"%{name}%")) |
-                (Doctor.last_name.ilike(f"%{name}%"))
-            )
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        query = db.query(Doctor)
+        if active_only:
+            query = query.filter(Doctor.is_active == True)
+        return self.search_by_full_name(db, query, name, skip=skip, limit=limit, cursor=cursor)
+
+    def get_specializations(self, db: Session) -> List[str]:
+        specializations = db.query(Doctor.specialization).distinct().all()
+        return [spec[0] for spec in specializations]
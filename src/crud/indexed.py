@@ -0,0 +1,79 @@
+import time
+from typing import Any, List, Optional, Sequence, Union
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+from database.config import ROW_CHANGES_RETENTION
+from .autocomplete import AutocompleteIndex
+from .base import EXPORT_BATCH_SIZE
+from .schedule import ScheduleIndex
+from .versions import table_versions
+
+# In-memory indexes a CRUD object keeps current on every write
+RowIndex = Union[AutocompleteIndex, ScheduleIndex]
+
+class IndexedMixin:
+    """
+    CRUDBase mixin keeping an in-memory index of the model's rows current:
+    writes through the CRUD object update it at once, and refresh_index
+    applies the changes other processes made
+    """
+
+    def __init__(self, *args, index: Optional[RowIndex] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = index
+
+    def index_entries(self, objs: Sequence[Any]) -> List[Any]:
+        """Snapshot rows for the in-memory index while they are still loaded"""
+        if self.index is None:
+            return []
+        return [self.index.entry(getattr(obj, self.primary_key.key), obj) for obj in objs]
+
+    def reindex(self, entries: List[Any]) -> None:
+        if self.index is not None:
+            for entry in entries:
+                self.index.put(entry)
+
+    def unindex(self, id: Any) -> None:
+        if self.index is not None:
+            self.index.discard(id)
+
+    def index_query(self) -> Select:
+        """Rows the in-memory index is built from; the whole table by default"""
+        return select(self.primary_key, *(getattr(self.model, field) for field in self.index.fields))
+
+    def build_index(self, db: Session) -> None:
+        """(Re)build the in-memory index"""
+        # Taken first, so changes committed during the build are read again
+        # by the next refresh
+        horizon = table_versions.horizon(db)
+        result = db.execute(self.index_query().execution_options(yield_per=EXPORT_BATCH_SIZE))
+        self.index.build(self.index.entry(row[0], row) for row in result)
+        self.index.horizon = horizon
+
+    def refresh_index(self, db: Session) -> bool:
+        """
+        Bring the in-memory index up to date with the table. Returns whether
+        it was (re)built.
+
+        The index is built if it is not ready, or if its last refresh is
+        older than ROW_CHANGES_RETENTION and the changes since may have been
+        pruned. Otherwise only the rows the change log lists since the last
+        refresh are read again, whichever process wrote them, and the rows
+        no longer in index_query() are dropped.
+        """
+        if not self.index.ready or time.monotonic() - self.index.refreshed_at > ROW_CHANGES_RETENTION:
+            self.build_index(db)
+            return True
+        horizon = table_versions.horizon(db)
+        changed = table_versions.changed_ids(db, self.model.__tablename__, self.index.horizon)
+        for start in range(0, len(changed), EXPORT_BATCH_SIZE):
+            ids = changed[start:start + EXPORT_BATCH_SIZE]
+            rows = {row[0]: row for row in db.execute(self.index_query().where(self.primary_key.in_(ids)))}
+            for id in ids:
+                if id in rows:
+                    self.index.put(self.index.entry(id, rows[id]))
+                else:
+                    self.index.discard(id)
+        self.index.horizon = horizon
+        self.index.refreshed_at = time.monotonic()
+        return False
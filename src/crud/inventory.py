@@ -10,36 +10,33 @@ class CRUDInventory(CRUDBase[Inventory, InventoryCreate, InventoryUpdate]):
         super().__init__(Inventory)
     
     def get_low_stock(
-        self, db: Session, threshold: int = 20, skip: int = 0, limit: int = 100
+        self, db: Session, threshold: int = 20, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Inventory]:
-        return (
+        return self.paginate(
             db.query(Inventory)
-            .filter(Inventory.quantity <= threshold)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Inventory.quantity <= threshold),
+            skip=skip, limit=limit, cursor=cursor
         )
 
     def get_by_category(
-        self, db: Session, category: str, skip: int = 0, limit: int = 100
+        self, db: Session, category: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Inventory]:
-        return (
+        return self.paginate(
             db.query(Inventory)
-            .filter(Inventory.category == category)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Inventory.category == category),
+            skip=skip, limit=limit, cursor=cursor
         )
 
     def get_expired_items(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Inventory]:
-        return (
+        return self.paginate(
             db.query(Inventory)
-            .filter(Inventory.expiration_date <= date.today())
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Inventory.expiration_date <= date.today()),
+            skip=skip, limit=limit, cursor=cursor
         )
 
 inventory = CRUDInventory()
@@ -1,33 +1,34 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from src.models.medical_record import MedicalRecord
 from src.schemas.medical_record import MedicalRecordCreate, MedicalRecordUpdate
 from .base import CRUDBase
 
 class CRUDMedicalRecord(CRUDBase[MedicalRecord, MedicalRecordCreate, MedicalRecordUpdate]):
+    expandable = ("patient", "doctor")
+    date_column = "visit_date"
+
     def __init__(self):
         super().__init__(MedicalRecord)
     
     def get_by_patient(
-        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[MedicalRecord]:
-        return (
+        return self.paginate(
             db.query(MedicalRecord)
-            .filter(MedicalRecord.patient_id == patient_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(MedicalRecord.patient_id == patient_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_by_doctor(
-        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[MedicalRecord]:
-        return (
+        return self.paginate(
             db.query(MedicalRecord)
-            .filter(MedicalRecord.doctor_id == doctor_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(MedicalRecord.doctor_id == doctor_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
 medical_record = CRUDMedicalRecord()
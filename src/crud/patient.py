@@ -1,12 +1,23 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date
 from sqlalchemy.orm import Session
 from src.models.patient import Patient
+from src.models.appointment import Appointment
+from src.models.medical_record import MedicalRecord
+from src.models.prescription import Prescription
+from src.models.billing import Billing
 from src.schemas.patient import PatientCreate, PatientUpdate
+from .autocomplete import AutocompleteIndex
 from .base import CRUDBase
+from .cache import EntityCache
+from .person import PersonMixin
 
-class CRUDPatient(CRUDBase[Patient, PatientCreate, PatientUpdate]):
-    def __init__(self):
-        super().__init__(Patient)
+class CRUDPatient(PersonMixin, CRUDBase[Patient, PatientCreate, PatientUpdate]):
+    unique_fields = {"phone": "phone number", "email": "email"}
+    expandable = ("appointments", "medical_records", "prescriptions", "bills")
+
+    def __init__(self, cache: Optional[EntityCache] = None, index: Optional[AutocompleteIndex] = None):
+        super().__init__(Patient, cache=cache, index=index)
     
     def get_by_email(self, db: Session, email: str) -> Optional[Patient]:
         return db.query(Patient).filter(Patient.email == email).first()
@@ -15,26 +26,72 @@ class CRUDPatient(CRUDBase[Patient, PatientCreate, PatientUpdate]):
         return db.query(Patient).filter(Patient.phone == phone).first()
 
     def search_by_name(
-        self, db: Session, name: str, skip: int = 0, limit: int = 100
+        self, db: Session, name: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Patient]:
-        return (
-            db.query(Patient)
-            .filter(
-                (Patient.first_name.ilike(f"%{name}%")) |
-                (Patient.last_name.ilike(f"%{name}%"))
-            )
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.search_by_full_name(
+            db, db.query(Patient), name, skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_multi_by_gender(
-        self, db: Session, gender: str, skip: int = 0, limit: int = 100
+        self, db: Session, gender: str, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Patient]:
-        return (
+        return self.paginate(
             db.query(Patient)
-            .filter(Patient.gender == gender)
-            .offset(skip)
-            .limit(limit)
+            .filter(Patient.gender == gender),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
+        )
+
+    def get_chart(
+        self, db: Session, patient_id: int, *, appointments_limit: int = 10,
+        records_limit: int = 10, prescriptions_limit: int = 10, bills_limit: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Everything the patient chart screen needs, in five indexed queries:
+        demographics, most recent appointments and medical records, active
+        prescriptions and outstanding bills, each capped by its own limit.
+        """
+        patient = db.get(Patient, patient_id)
+        if patient is None:
+            return None
+
+        appointments = (
+            db.query(Appointment)
+            .filter(Appointment.patient_id == patient_id)
+            .order_by(Appointment.appointment_date.desc())
+            .limit(appointments_limit)
+            .all()
+        )
+        medical_records = (
+            db.query(MedicalRecord)
+            .filter(MedicalRecord.patient_id == patient_id)
+            .order_by(MedicalRecord.visit_date.desc())
+            .limit(records_limit)
+            .all()
+        )
+        prescriptions = (
+            db.query(Prescription)
+            .filter(
+                Prescription.patient_id == patient_id,
+                (Prescription.end_date.is_(None)) |
+                (Prescription.end_date >= date.today())
+            )
+            .order_by(Prescription.start_date.desc())
+            .limit(prescriptions_limit)
+            .all()
+        )
+        bills = (
+            db.query(Billing)
+            .filter(Billing.patient_id == patient_id, Billing.status != "Paid")
+            .order_by(Billing.service_date.desc())
+            .limit(bills_limit)
             .all()
         )
+        return {
+            "patient": patient,
+            "appointments": appointments,
+            "medical_records": medical_records,
+            "active_prescriptions": prescriptions,
+            "outstanding_bills": bills
+        }
@@ -0,0 +1,85 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import String, cast, column, func, literal, literal_column, or_, select, table
+from sqlalchemy.orm import Query, Session
+from .autocomplete import digits, normalize
+from .base import InvalidCursor, like_pattern
+from .indexed import IndexedMixin
+
+# Shortest query the trigram indexes can match; shorter ones use ILIKE
+MIN_TRIGRAM_QUERY = 3
+
+def fts_trigram_query(value: str) -> str:
+    """FTS5 query matching any trigram of value, so near misses still rank"""
+    value = value.lower()
+    trigrams = sorted({value[i:i + 3] for i in range(len(value) - 2)})
+    return " OR ".join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams)
+
+class PersonMixin(IndexedMixin):
+    """
+    Name search and autocomplete for people (patients, doctors): models with
+    first_name, last_name and phone columns and an AutocompleteIndex
+    """
+
+    def search_by_full_name(
+        self, db: Session, query: Query, name: str, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
+    ) -> List[Any]:
+        """
+        Rank rows of query by how well "first_name last_name" matches name.
+
+        Uses the pg_trgm GIN index on PostgreSQL (word similarity, so typos
+        and partial names still match) and the FTS5 trigram table on SQLite
+        (bm25 over shared trigrams). Results are ordered by relevance and
+        paged with skip; there is no cursor for a ranked list.
+        """
+        if cursor:
+            raise InvalidCursor("Search results are paged with skip, not cursor")
+        name = " ".join(name.split())
+        dialect = db.get_bind().dialect.name
+        # Must match the indexed expression exactly, hence the literal separator
+        full_name = self.model.first_name.concat(literal_column("' '")).concat(self.model.last_name).self_group()
+
+        if dialect == "postgresql":
+            query = query.filter(or_(
+                literal(name).op("<%")(full_name),
+                full_name.ilike(like_pattern(name), escape="\\")
+            )).order_by(func.word_similarity(name, full_name).desc(), self.primary_key)
+        elif dialect == "sqlite" and len(name) >= MIN_TRIGRAM_QUERY:
+            fts_name = f"{self.model.__tablename__}_fts"
+            fts = table(fts_name, column("rowid"), column("rank"), column(fts_name))
+            matches = (
+                select(fts.c.rowid, fts.c.rank)
+                .where(fts.c[fts_name].match(fts_trigram_query(name)))
+                .subquery()
+            )
+            query = query.join(matches, self.primary_key == matches.c.rowid).order_by(matches.c.rank, self.primary_key)
+        else:
+            query = query.filter(full_name.ilike(like_pattern(name), escape="\\")).order_by(self.primary_key)
+
+        return query.options(*self.load_options(expand)).offset(skip).limit(limit).all()
+
+    def suggest_from_db(self, db: Session, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        What the autocomplete index would suggest for `q`, from the few rows
+        matching it, for lookups made before the index is built. Matching is
+        case- but not accent-insensitive.
+        """
+        query = normalize(q)
+        first, last = (getattr(self.model, field) for field in self.index.name_fields)
+        if re.search("[a-z]", query):
+            keys = [func.lower(first + " " + last), func.lower(last + " " + first)]
+            candidates = [self.index_query().where(key.like(f"{query}%")).order_by(key) for key in keys]
+        elif digits(query):
+            number = digits(query)
+            id_text = cast(self.primary_key, String)
+            candidates = [
+                self.index_query().where(id_text.like(f"{number}%")).order_by(id_text),
+                # Any phone ending in these digits, whatever its punctuation
+                self.index_query().where(getattr(self.model, self.index.phone_field).like("%" + "%".join(number)))
+            ]
+        else:
+            return []
+        index = self.index.blank()
+        index.build(index.entry(row[0], row) for candidate in candidates for row in db.execute(candidate.limit(limit)))
+        return index.search(q, limit)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from datetime import date
 from src.models.prescription import Prescription
@@ -6,43 +6,42 @@ from src.schemas.prescription import PrescriptionCreate, PrescriptionUpdate
 from .base import CRUDBase
 
 class CRUDPrescription(CRUDBase[Prescription, PrescriptionCreate, PrescriptionUpdate]):
+    expandable = ("patient", "doctor")
+
     def __init__(self):
         super().__init__(Prescription)
     
     def get_by_patient(
-        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, patient_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Prescription]:
-        return (
+        return self.paginate(
             db.query(Prescription)
-            .filter(Prescription.patient_id == patient_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Prescription.patient_id == patient_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_by_doctor(
-        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, doctor_id: int, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Prescription]:
-        return (
+        return self.paginate(
             db.query(Prescription)
-            .filter(Prescription.doctor_id == doctor_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Prescription.doctor_id == doctor_id),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
     def get_active_prescriptions(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, expand: Sequence[str] = ()
     ) -> List[Prescription]:
-        return (
+        return self.paginate(
             db.query(Prescription)
             .filter(
                 (Prescription.end_date.is_(None)) | 
                 (Prescription.end_date >= date.today())
-            )
-            .offset(skip)
-            .limit(limit)
-            .all()
+            ),
+            skip=skip, limit=limit, cursor=cursor, expand=expand
         )
 
 prescription = CRUDPrescription()
@@ -0,0 +1,164 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+
+# Appointments in these states no longer hold their slot
+FREE_STATUSES = ("Cancelled",)
+
+Entry = Tuple[int, Optional[int], Optional[datetime], Optional[str]]
+
+def to_minute(value: datetime) -> int:
+    return int((value - EPOCH).total_seconds() // 60)
+
+def from_minute(minute: int) -> datetime:
+    return EPOCH + timedelta(minutes=minute)
+
+def parse_clock(value: str) -> int:
+    """Minutes since midnight of an "HH:MM" string"""
+    hours, _, minutes = value.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+class ScheduleIndex:
+    """
+    In-process index of booked appointment times per doctor.
+
+    Each doctor has a sorted list of booked start minutes; an appointment
+    occupies one slot of `slot_minutes` from its start. Free slots are found
+    by walking the doctor's working-hour slots alongside that list, so a
+    query costs the slots it walks past rather than a scan of appointments,
+    and several doctors are merged lazily by start time.
+    """
+
+    fields = ("doctor_id", "appointment_date", "status")
+
+    def __init__(
+        self, day_start: str = "09:00", day_end: str = "17:00", slot_minutes: int = 30,
+        workdays: Sequence[int] = (0, 1, 2, 3, 4)
+    ):
+        self.day_start = parse_clock(day_start)
+        self.day_end = parse_clock(day_end)
+        self.slot_minutes = slot_minutes
+        self.workdays = frozenset(workdays)
+        self._lock = threading.Lock()
+        self._booked: Dict[int, List[int]] = {}
+        self._appointments: Dict[int, Tuple[int, int]] = {}
+        self.ready = False
+        self.built_at = 0.0
+        # Change log position the index is current up to and when it got
+        # there, see IndexedMixin.refresh_index
+        self.horizon = 0
+        self.refreshed_at = 0.0
+
+    def blank(self) -> "ScheduleIndex":
+        """An empty index with the same settings"""
+        blank = ScheduleIndex(slot_minutes=self.slot_minutes, workdays=self.workdays)
+        blank.day_start, blank.day_end = self.day_start, self.day_end
+        return blank
+
+    def entry(self, id: int, obj: Any) -> Entry:
+        """Fields of a row (ORM object or result row) needed to index it"""
+        return id, obj.doctor_id, obj.appointment_date, obj.status
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """Replace the whole index with `entries`"""
+        booked: Dict[int, List[int]] = {}
+        appointments: Dict[int, Tuple[int, int]] = {}
+        for id, doctor_id, appointment_date, status in entries:
+            if doctor_id is not None and appointment_date is not None and status not in FREE_STATUSES:
+                minute = to_minute(appointment_date)
+                booked.setdefault(doctor_id, []).append(minute)
+                appointments[id] = (doctor_id, minute)
+        for minutes in booked.values():
+            minutes.sort()
+        with self._lock:
+            self._booked, self._appointments = booked, appointments
+            self.ready = True
+            self.built_at = self.refreshed_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Empty the index until it is built again"""
+        with self._lock:
+            self._booked, self._appointments = {}, {}
+            self.ready = False
+            self.horizon = 0
+
+    def put(self, entry: Entry) -> None:
+        """Add, move or release one appointment"""
+        id, doctor_id, appointment_date, status = entry
+        with self._lock:
+            if not self.ready:
+                return
+            self._discard(id)
+            if doctor_id is not None and appointment_date is not None and status not in FREE_STATUSES:
+                minute = to_minute(appointment_date)
+                insort(self._booked.setdefault(doctor_id, []), minute)
+                self._appointments[id] = (doctor_id, minute)
+
+    def discard(self, id: int) -> None:
+        with self._lock:
+            if self.ready:
+                self._discard(id)
+
+    def _discard(self, id: int) -> None:
+        if id in self._appointments:
+            doctor_id, minute = self._appointments.pop(id)
+            booked = self._booked[doctor_id]
+            del booked[bisect_left(booked, minute)]
+
+    def _slots(self, start: int, end: int) -> Iterator[int]:
+        """Working-hour slot starts in [start, end), aligned to day_start"""
+        day = start // MINUTES_PER_DAY
+        while day * MINUTES_PER_DAY < end:
+            # 1970-01-01 was a Thursday
+            if (day + 3) % 7 in self.workdays:
+                first = day * MINUTES_PER_DAY + self.day_start
+                slot = first + max(0, -(-(start - first) // self.slot_minutes)) * self.slot_minutes
+                last = min(day * MINUTES_PER_DAY + self.day_end - self.slot_minutes, end - 1)
+                while slot <= last:
+                    yield slot
+                    slot += self.slot_minutes
+            day += 1
+
+    def _free(self, doctor_id: int, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        booked = self._booked.get(doctor_id, [])
+        # Appointments starting less than a slot either side of a slot overlap it
+        position = bisect_left(booked, start - self.slot_minutes + 1)
+        for slot in self._slots(start, end):
+            while position < len(booked) and booked[position] <= slot - self.slot_minutes:
+                position += 1
+            if position < len(booked) and booked[position] < slot + self.slot_minutes:
+                continue
+            yield slot, doctor_id
+
+    def free_slots(
+        self, doctor_ids: Iterable[int], start: datetime, end: datetime, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        The first `limit` free slots starting in [start, end) across
+        `doctor_ids`, earliest first (ties by doctor ID)
+        """
+        start_minute, end_minute = to_minute(start), to_minute(end)
+        if start > from_minute(start_minute):
+            start_minute += 1
+        with self._lock:
+            merged = heapq.merge(*(self._free(doctor_id, start_minute, end_minute) for doctor_id in sorted(set(doctor_ids))))
+            found = list(islice(merged, limit))
+        return [
+            {
+                "doctor_id": doctor_id,
+                "start": from_minute(slot),
+                "end": from_minute(slot + self.slot_minutes)
+            }
+            for slot, doctor_id in found
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"ready": self.ready, "doctors": len(self._booked), "appointments": len(self._appointments)}
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from src.models.changes import RowChange
+
+class TableVersions:
+    """
+    Per-table change markers read from the row_changes log.
+
+    The log is written by triggers in the writing transaction, so changes
+    made by other API workers, scripts or psql count the same as this
+    process's own, and rolled back writes never show up.
+    """
+
+    def version(self, db: Session, *tables: str) -> Tuple[int, ...]:
+        """
+        Number and last ID of the logged changes of each table, which any
+        committed write changes (a concurrent commit may land below the
+        last ID, but it still adds to the count)
+        """
+        rows = dict(
+            (table, (count, last))
+            for table, count, last in db.execute(
+                select(RowChange.table_name, func.count(), func.max(RowChange.change_id))
+                .where(RowChange.table_name.in_(tables))
+                .group_by(RowChange.table_name)
+            )
+        )
+        return tuple(value for table in tables for value in rows.get(table, (0, 0)))
+
+    def horizon(self, db: Session) -> int:
+        """
+        Lowest `tx` a change can still commit with: every change below it
+        is already visible, so readers that re-read from here miss nothing
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            return db.execute(select(func.txid_snapshot_xmin(func.txid_current_snapshot()))).scalar_one()
+        return db.execute(select(func.coalesce(func.max(RowChange.change_id), 0) + 1)).scalar_one()
+
+    def changed_ids(self, db: Session, table: str, since: int) -> List[int]:
+        """IDs of the rows of `table` changed by transactions from `since` on"""
+        return list(db.scalars(
+            select(RowChange.row_id).distinct().where(RowChange.table_name == table, RowChange.tx >= since)
+        ))
+
+    def prune(self, db: Session, older_than: timedelta) -> int:
+        """
+        Drop changes older than `older_than`, keeping each table's last one
+        so versions never go back to an earlier value
+        """
+        latest = select(func.max(RowChange.change_id)).group_by(RowChange.table_name)
+        result = db.execute(
+            delete(RowChange)
+            .where(RowChange.changed_at < datetime.utcnow() - older_than, RowChange.change_id.notin_(latest))
+        )
+        db.commit()
+        return result.rowcount
+
+# Shared by the API's ETags and the in-memory index refreshes
+table_versions = TableVersions()
@@ -6,6 +6,9 @@ from .medical_record import MedicalRecord
 from .prescription import Prescription
 from .billing import Billing
 from .inventory import Inventory
+from .revenue import RevenueDaily  # kept current by triggers on billing
+from .changes import RowChange  # filled by triggers on the tracked tables
+from . import search  # name search indexes, created with the tables
 
 # This will help with Alembic migrations
 __all__ = [
@@ -15,5 +18,7 @@ __all__ = [
     "MedicalRecord", 
     "Prescription", 
     "Billing", 
-    "Inventory"
+    "Inventory",
+    "RevenueDaily",
+    "RowChange"
 ]
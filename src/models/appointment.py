@@ -1,10 +1,18 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.config import Base
 from datetime import datetime
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Doctor calendars and booking overlap checks are range scans over
+        # these; status rides along so calendars filtered by it stay in the index
+        Index("idx_appointments_doctor_date", "doctor_id", "appointment_date", postgresql_include=["status"]),
+        Index("idx_appointments_patient_date", "patient_id", "appointment_date"),
+        # Dashboard panels count all doctors' appointments over a date range
+        Index("idx_appointments_date", "appointment_date", postgresql_include=["status"]),
+    )
 
     appointment_id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.patient_id"))
@@ -5,7 +5,6 @@ from datetime import datetime
 
 class Billing(Base):
     __tablename__ = "billing"
-
     bill_id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.patient_id"))
     appointment_id = Column(Integer, ForeignKey("appointments.appointment_id"))
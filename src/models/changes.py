@@ -0,0 +1,89 @@
+"""
+Row change log, filled by triggers on the tracked tables.
+
+Every insert, update or delete of a tracked row appends (table, row ID) to
+row_changes, whoever makes it: any API worker, a script or psql. ETags and
+the in-memory indexes read it to learn what changed since they last
+looked (see src/crud/versions.py).
+
+`tx` orders changes by transaction: the writing transaction's ID on
+PostgreSQL, where concurrent transactions commit out of ID order, and the
+change's own position on SQLite, which has a single writer.
+"""
+from datetime import datetime
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Index, Integer, String, event
+from database.config import Base
+
+# Tables whose changes are logged, with their primary key column
+TRACKED_TABLES = {
+    "patients": "patient_id",
+    "doctors": "doctor_id",
+    "appointments": "appointment_id",
+    "inventory": "item_id",
+}
+
+class RowChange(Base):
+    __tablename__ = "row_changes"
+    __table_args__ = (
+        Index("idx_row_changes_table_tx", "table_name", "tx"),
+    )
+
+    change_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    tx = Column(BigInteger, nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RowChange {self.table_name} {self.row_id}>"
+
+POSTGRES_FUNCTION = """CREATE OR REPLACE FUNCTION log_row_change() RETURNS trigger AS $$
+    DECLARE
+        changed jsonb := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    BEGIN
+        INSERT INTO row_changes (table_name, row_id, tx, changed_at)
+        VALUES (TG_TABLE_NAME, (changed ->> TG_ARGV[0])::integer, txid_current(), now() AT TIME ZONE 'utc');
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql"""
+
+def postgres_triggers(name: str, pk: str) -> list:
+    return [
+        f"DROP TRIGGER IF EXISTS {name}_row_changes ON {name}",
+        f"""CREATE TRIGGER {name}_row_changes AFTER INSERT OR UPDATE OR DELETE ON {name}
+            FOR EACH ROW EXECUTE FUNCTION log_row_change('{pk}')""",
+    ]
+
+def sqlite_triggers(name: str, pk: str) -> list:
+    log = (
+        "INSERT INTO row_changes (table_name, row_id, tx, changed_at) VALUES ("
+        f"'{name}', {{row}}.{pk}, (SELECT COALESCE(MAX(change_id), 0) + 1 FROM row_changes), "
+        "CURRENT_TIMESTAMP)"
+    )
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_changes_insert AFTER INSERT ON {name} BEGIN
+            {log.format(row='new')};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_changes_update AFTER UPDATE ON {name} BEGIN
+            {log.format(row='new')};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_changes_delete AFTER DELETE ON {name} BEGIN
+            {log.format(row='old')};
+        END""",
+    ]
+
+POSTGRES_TRIGGERS = [POSTGRES_FUNCTION] + [
+    statement for name, pk in TRACKED_TABLES.items() for statement in postgres_triggers(name, pk)
+]
+SQLITE_TRIGGERS = [
+    statement for name, pk in TRACKED_TABLES.items() for statement in sqlite_triggers(name, pk)
+]
+
+# Installed once every table exists, since the triggers span several
+for statement in POSTGRES_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Base.metadata, "after_drop",
+    DDL("DROP FUNCTION IF EXISTS log_row_change()").execute_if(dialect="postgresql")
+)
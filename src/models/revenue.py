@@ -0,0 +1,93 @@
+"""
+Daily revenue rollup, kept current by triggers on billing.
+
+Every bill counts towards one revenue_daily row keyed by its service date,
+status, doctor (through its appointment, 0 if none) and insurer (the
+insurance_info text, '' if none). Inserting, deleting or updating a bill
+subtracts its old row and adds its new one in the same transaction, so
+revenue reads scan rollup rows rather than bills. REBUILD_SQL recomputes
+the table from billing (see CRUDBilling.rebuild_revenue_rollup).
+"""
+from sqlalchemy import DDL, Column, Date, Integer, Numeric, String, Text, event
+from database.config import Base
+from .billing import Billing
+
+class RevenueDaily(Base):
+    __tablename__ = "revenue_daily"
+
+    revenue_date = Column(Date, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    doctor_id = Column(Integer, primary_key=True)
+    insurer = Column(Text, primary_key=True)
+    bill_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RevenueDaily {self.revenue_date} {self.status} - ${self.amount}>"
+
+def rollup_key(row: str = "") -> str:
+    """Rollup key columns of a billing row (`row` is "new.", "old." or "b.")"""
+    return (
+        f"{row}service_date, COALESCE({row}status, ''), "
+        f"COALESCE((SELECT doctor_id FROM appointments WHERE appointment_id = {row}appointment_id), 0), "
+        f"COALESCE({row}insurance_info, '')"
+    )
+
+def apply_bill(row: str, sign: str) -> str:
+    """Upsert adding (sign "+") or removing (sign "-") one bill's amount"""
+    return f"""INSERT INTO revenue_daily (revenue_date, status, doctor_id, insurer, bill_count, amount)
+        VALUES ({rollup_key(row)}, {sign}1, {sign}{row}amount)
+        ON CONFLICT (revenue_date, status, doctor_id, insurer) DO UPDATE SET
+            bill_count = revenue_daily.bill_count + excluded.bill_count,
+            amount = revenue_daily.amount + excluded.amount"""
+
+# Columns whose change moves a bill between rollup rows
+ROLLUP_COLUMNS = "service_date, amount, status, appointment_id, insurance_info"
+
+REBUILD_SQL = [
+    "DELETE FROM revenue_daily",
+    f"""INSERT INTO revenue_daily (revenue_date, status, doctor_id, insurer, bill_count, amount)
+        SELECT b.service_date, COALESCE(b.status, ''), COALESCE(a.doctor_id, 0), COALESCE(b.insurance_info, ''),
+               COUNT(*), SUM(b.amount)
+        FROM billing b LEFT JOIN appointments a ON a.appointment_id = b.appointment_id
+        GROUP BY b.service_date, COALESCE(b.status, ''), COALESCE(a.doctor_id, 0), COALESCE(b.insurance_info, '')""",
+]
+
+POSTGRES_TRIGGER = [
+    f"""CREATE OR REPLACE FUNCTION billing_revenue_rollup() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            {apply_bill('OLD.', '-')};
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            {apply_bill('NEW.', '+')};
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS billing_revenue_rollup ON billing",
+    f"""CREATE TRIGGER billing_revenue_rollup
+        AFTER INSERT OR DELETE OR UPDATE OF {ROLLUP_COLUMNS} ON billing
+        FOR EACH ROW EXECUTE FUNCTION billing_revenue_rollup()""",
+]
+
+SQLITE_TRIGGER = [
+    f"""CREATE TRIGGER IF NOT EXISTS billing_revenue_insert AFTER INSERT ON billing BEGIN
+        {apply_bill('new.', '+')};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS billing_revenue_delete AFTER DELETE ON billing BEGIN
+        {apply_bill('old.', '-')};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS billing_revenue_update AFTER UPDATE OF {ROLLUP_COLUMNS} ON billing BEGIN
+        {apply_bill('old.', '-')};
+        {apply_bill('new.', '+')};
+    END""",
+]
+
+for statement in POSTGRES_TRIGGER:
+    event.listen(Billing.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_TRIGGER:
+    event.listen(Billing.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Billing.__table__, "after_drop",
+    DDL("DROP FUNCTION IF EXISTS billing_revenue_rollup()").execute_if(dialect="postgresql")
+)
@@ -0,0 +1,53 @@
+"""
+Name search indexes for patients and doctors.
+
+PostgreSQL gets a pg_trgm GIN index on the full name expression; SQLite
+gets an FTS5 trigram table kept in sync by triggers. Both are created with
+the tables (create_all); init.sql carries the PostgreSQL index too, and
+migration 0004 adds them to existing databases.
+"""
+from typing import List
+from sqlalchemy import DDL, event
+from .patient import Patient
+from .doctor import Doctor
+
+def full_name_sql(prefix: str = "") -> str:
+    return f"{prefix}first_name || ' ' || {prefix}last_name"
+
+def postgres_name_search(name: str, concurrently: bool = False) -> str:
+    """The trigram index on the full name of table `name`"""
+    how = "CONCURRENTLY " if concurrently else ""
+    return f"CREATE INDEX {how}IF NOT EXISTS idx_{name}_name_trgm ON {name} USING gin (({full_name_sql()}) gin_trgm_ops)"
+
+def sqlite_name_search(name: str, pk: str) -> List[str]:
+    """The FTS5 table of table `name`, its sync triggers and the backfill"""
+    fts = f"{name}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, content='', tokenize='trigram')",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {name} BEGIN
+            INSERT INTO {fts}(rowid, name) VALUES (new.{pk}, {full_name_sql('new.')});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {name} BEGIN
+            INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.{pk}, {full_name_sql('old.')});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF first_name, last_name ON {name} BEGIN
+            INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.{pk}, {full_name_sql('old.')});
+            INSERT INTO {fts}(rowid, name) VALUES (new.{pk}, {full_name_sql('new.')});
+        END""",
+        f"INSERT INTO {fts}(rowid, name) SELECT {pk}, {full_name_sql()} FROM {name}",
+    ]
+
+def register_name_search(model) -> None:
+    table = model.__table__
+    name = table.name
+    pk = model.__mapper__.primary_key[0].name
+
+    postgres = ["CREATE EXTENSION IF NOT EXISTS pg_trgm", postgres_name_search(name)]
+    for statement in postgres:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in sqlite_name_search(name, pk):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {name}_fts").execute_if(dialect="sqlite"))
+
+register_name_search(Patient)
+register_name_search(Doctor)
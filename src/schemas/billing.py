@@ -26,3 +26,11 @@ class BillingInDB(BillingBase):
 
 class Billing(BillingInDB):
     pass
+
+class DailyRevenue(BaseModel):
+    revenue_date: date
+    status: Optional[str] = None
+    doctor_id: Optional[int] = None
+    insurer: Optional[str] = None
+    bill_count: int
+    amount: float
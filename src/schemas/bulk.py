@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Generic, List, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+CreateSchema = TypeVar("CreateSchema", bound=BaseModel)
+
+# Largest batch accepted by a single POST /<resource>/bulk call
+MAX_BULK_ROWS = 10000
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: List[Any]
+
+class BulkCreateResult(BaseModel, Generic[T]):
+    created: List[T]
+    errors: List[BulkRowError]
+
+def validate_rows(
+    schema: Type[CreateSchema], rows: List[Dict[str, Any]]
+) -> Tuple[List[Tuple[int, CreateSchema]], List[BulkRowError]]:
+    """Validate each raw row against schema, keeping the row index for errors"""
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as e:
+            errors.append(BulkRowError(index=index, errors=e.errors(include_url=False, include_context=False)))
+    return valid, errors
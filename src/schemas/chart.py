@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+from .patient import Patient
+from .appointment import Appointment
+from .medical_record import MedicalRecord
+from .prescription import Prescription
+from .billing import Billing
+
+class PatientChart(BaseModel):
+    patient: Patient
+    appointments: List[Appointment]
+    medical_records: List[MedicalRecord]
+    active_prescriptions: List[Prescription]
+    outstanding_bills: List[Billing]
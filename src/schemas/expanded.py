@@ -0,0 +1,56 @@
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+from typing import Any, List, Optional
+from .patient import Patient
+from .doctor import Doctor
+from .appointment import Appointment
+from .medical_record import MedicalRecord
+from .prescription import Prescription
+from .billing import Billing
+
+class ExpandedModel(BaseModel):
+    """
+    Response schema with optional nested relationships.
+
+    Only relationships already loaded on the ORM object (via ?expand=) are
+    serialized; the rest are left unset instead of being lazy loaded one row
+    at a time. Routes using these schemas set response_model_exclude_unset
+    so unexpanded relationships are omitted from the payload.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def loaded_attributes_only(cls, data: Any) -> Any:
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "mapper"):
+            return data
+        columns = state.mapper.column_attrs.keys()
+        relationships = state.mapper.relationships.keys()
+        return {
+            key: getattr(data, key)
+            for key in cls.model_fields
+            if key in columns or (key in relationships and key not in state.unloaded)
+        }
+
+class PatientExpanded(ExpandedModel, Patient):
+    appointments: Optional[List[Appointment]] = None
+    medical_records: Optional[List[MedicalRecord]] = None
+    prescriptions: Optional[List[Prescription]] = None
+    bills: Optional[List[Billing]] = None
+
+class AppointmentExpanded(ExpandedModel, Appointment):
+    patient: Optional[Patient] = None
+    doctor: Optional[Doctor] = None
+    bills: Optional[List[Billing]] = None
+
+class MedicalRecordExpanded(ExpandedModel, MedicalRecord):
+    patient: Optional[Patient] = None
+    doctor: Optional[Doctor] = None
+
+class PrescriptionExpanded(ExpandedModel, Prescription):
+    patient: Optional[Patient] = None
+    doctor: Optional[Doctor] = None
+
+class BillingExpanded(ExpandedModel, Billing):
+    patient: Optional[Patient] = None
+    appointment: Optional[Appointment] = None
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class Slot(BaseModel):
+    doctor_id: int
+    start: datetime
+    end: datetime
@@ -2,7 +2,7 @@
 Advanced SQL Queries for Healthcare Management System
 Testing 15+ queries including window functions, OLAP, and complex joins
 """
-from database.config import SessionLocal
+from database.config import ReadSessionLocal
 from sqlalchemy import text, func, case, and_, or_, extract
 from sqlalchemy.sql import expression
 from datetime import datetime, timedelta
@@ -10,7 +10,7 @@ import pandas as pd
 
 class HealthcareSQLQueries:
     def __init__(self):
-        self.db = SessionLocal()
+        self.db = ReadSessionLocal()
     
     def execute_query(self, query_description, sql_query, params=None):
         """Execute SQL query and return formatted results"""
@@ -156,9 +156,7 @@ class HealthcareSQLQueries:
             a.appointment_date,
             b.amount,
             b.status,
-            b.insurance_provider,
-            b.insurance_coverage,
-            b.amount - b.insurance_coverage as patient_responsibility
+            b.insurance_info
         FROM billing b
         JOIN patients p ON b.patient_id = p.patient_id
         LEFT JOIN appointments a ON b.appointment_id = a.appointment_id
@@ -167,7 +165,7 @@ class HealthcareSQLQueries:
         LIMIT 12;
         """
         self.execute_query(
-            "6. Billing analysis with patient responsibility calculation",
+            "6. Billing analysis with patient and appointment details",
             query_6
         )
     
@@ -0,0 +1,51 @@
+"""
+Streamlit-cached data access shared by the dashboards.
+
+Query results are cached per argument combination for DASHBOARD_CACHE_TTL
+seconds, so widget interactions rerun the script without querying again.
+"""
+from typing import Optional, Sequence
+import pyarrow as pa
+import streamlit as st
+from sqlalchemy import select
+from sqlalchemy.orm import scoped_session
+from database.config import DASHBOARD_CACHE_TTL, ReadSessionLocal
+from src.models import Doctor
+from src.ui.panels import dashboard_tasks, load_concurrently
+from src.ui.queries import DOCTOR_GRID, PATIENT_GRID, ages, doctor_filters, grid_page, patient_filters
+
+@st.cache_resource
+def get_db():
+    """
+    Read sessions shared by every rerun in this server process, one per
+    script thread (a Session must not be shared between threads)
+    """
+    return scoped_session(ReadSessionLocal)
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False)
+def load_dashboard(start_date=None, end_date=None, statuses: Sequence[str] = (), panels: Sequence[str] = ()):
+    """
+    The main dashboard panels' data (all of them, or only `panels`), queried
+    concurrently, and the per-panel timings
+    """
+    return load_concurrently(dashboard_tasks(start_date, end_date, statuses, panels))
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False)
+def load_patient_page(columns, search: Optional[str], sort, descending, page, page_size):
+    table, total = grid_page(
+        get_db()(), PATIENT_GRID, columns, patient_filters(search), sort, descending, page, page_size
+    )
+    if "Date of Birth" in columns:
+        table = table.append_column("Age", pa.array(ages(table.column("Date of Birth").to_pylist()), pa.int32()))
+    return table, total
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False)
+def load_doctor_page(columns, specialization: Optional[str], active: Optional[bool], sort, descending, page, page_size):
+    return grid_page(
+        get_db()(), DOCTOR_GRID, columns, doctor_filters(specialization, active), sort, descending, page, page_size
+    )
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False)
+def load_specializations():
+    query = select(Doctor.specialization).distinct().order_by(Doctor.specialization)
+    return list(get_db()().execute(query).scalars())
@@ -0,0 +1,49 @@
+"""
+Server-side paginated grid for the dashboard management pages.
+
+Only the visible page of the selected columns is fetched (as an Arrow
+table); sorting, filtering and paging all happen in SQL.
+"""
+from typing import Any, Callable, Dict
+import streamlit as st
+
+# Rows per page the grids offer; the second is the default
+PAGE_SIZES = [25, 50, 100, 250]
+
+def display_grid(key: str, grid: Dict[str, Any], load: Callable, *filters: Any, empty_message: str = "No rows found.") -> None:
+    """
+    Render the grid `grid` (header -> column) with column, sort and page
+    controls; `load(columns, *filters, sort, descending, page, page_size)`
+    returns the page and the number of matching rows.
+    """
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        columns = st.multiselect("Columns", list(grid), default=list(grid), key=f"{key}_columns")
+    with col2:
+        sort = st.selectbox("Sort by", list(grid), key=f"{key}_sort")
+    with col3:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+    columns = tuple(name for name in grid if name in columns) or ("ID",)
+
+    page_size = st.session_state.get(f"{key}_page_size", PAGE_SIZES[1])
+    page = st.session_state.get(f"{key}_page", 1)
+    table, total = load(columns, *filters, sort, descending, page - 1, page_size)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # Filters shrank the result; show its last page
+        page = pages
+        table, total = load(columns, *filters, sort, descending, page - 1, page_size)
+    if not total:
+        st.info(empty_message)
+        return
+
+    st.dataframe(table, width="stretch", hide_index=True)
+    first = (page - 1) * page_size + 1
+    col1, col2, col3 = st.columns([1, 1, 2])
+    st.session_state[f"{key}_page"] = page
+    with col1:
+        st.number_input("Page", min_value=1, max_value=pages, key=f"{key}_page")
+    with col2:
+        st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    with col3:
+        st.caption(f"Showing {first:,}–{first + table.num_rows - 1:,} of {total:,}")
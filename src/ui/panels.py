@@ -0,0 +1,63 @@
+"""
+Concurrent loading of the dashboard panels.
+
+Panels query independent data, so each panel's query runs on its own read
+session in a thread pool and a page costs roughly its slowest query rather
+than the sum of all of them. Rendering happens afterwards, on the script
+thread, from the plain results.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, sessionmaker
+from database.config import DASHBOARD_WORKERS, ReadSessionLocal
+from src.crud import billing_crud
+from src.ui.queries import (
+    active_doctors, appointment_status_counts, dashboard_kpis, doctors_by_specialization, inventory_value,
+    low_stock_items, patient_demographics
+)
+
+PanelTask = Callable[[Session], Any]
+
+def dashboard_tasks(
+    start_date: Optional[date] = None, end_date: Optional[date] = None, statuses: Sequence[str] = (),
+    panels: Sequence[str] = ()
+) -> Dict[str, PanelTask]:
+    """The queries behind the main dashboard, by panel; only `panels` if given"""
+    tasks = {
+        "kpis": lambda db: dashboard_kpis(db, start_date, end_date, statuses),
+        "demographics": lambda db: patient_demographics(
+            db, start_date=start_date, end_date=end_date, statuses=statuses
+        ),
+        "appointment_status": lambda db: appointment_status_counts(db, start_date, end_date, statuses),
+        "revenue": lambda db: billing_crud.get_daily_revenue(db, start_date, end_date),
+        "specializations": doctors_by_specialization,
+        "active_doctors": active_doctors,
+        "low_stock": low_stock_items,
+        "inventory_value": inventory_value,
+    }
+    return {name: tasks[name] for name in panels} if panels else tasks
+
+def load_concurrently(
+    tasks: Dict[str, PanelTask], session_factory: sessionmaker = ReadSessionLocal,
+    max_workers: int = DASHBOARD_WORKERS
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run every task on its own session, at most `max_workers` at a time.
+
+    Returns the results and each task's duration in seconds, by task name;
+    the first failing task's exception is raised once all have finished.
+    """
+    def run(task: PanelTask) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        with session_factory() as db:
+            result = task(db)
+        return result, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))), thread_name_prefix="panel") as pool:
+        futures = {name: pool.submit(run, task) for name, task in tasks.items()}
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
@@ -0,0 +1,225 @@
+"""
+Aggregate queries behind the Streamlit dashboards.
+
+They take a session and plain filter values and know nothing of Streamlit,
+so the dashboards can cache them with st.cache_data and tests can run them
+against SQLite.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pyarrow as pa
+from sqlalchemy import case, func, literal_column, select
+from sqlalchemy.orm import Session
+from src.crud.base import like_pattern
+from src.models import Appointment, Doctor, Inventory, Patient, RevenueDaily
+
+def day_range(start_date: Optional[date], end_date: Optional[date]):
+    """[start, end) datetimes covering both dates inclusive; None leaves a side open"""
+    start = datetime.combine(start_date, time()) if start_date else None
+    end = datetime.combine(end_date, time()) + timedelta(days=1) if end_date else None
+    return start, end
+
+def appointment_filters(
+    start_date: Optional[date] = None, end_date: Optional[date] = None, statuses: Sequence[str] = ()
+) -> List[Any]:
+    """
+    Conditions selecting appointments on the dates from `start_date` to
+    `end_date` (inclusive) in one of `statuses`; as a half-open range on the
+    bare column, so an index on appointment_date can serve them
+    """
+    start, end = day_range(start_date, end_date)
+    filters = []
+    if start:
+        filters.append(Appointment.appointment_date >= start)
+    if end:
+        filters.append(Appointment.appointment_date < end)
+    if statuses:
+        filters.append(Appointment.status.in_(statuses))
+    return filters
+
+# Patients are bucketed by age in steps of AGE_BUCKET_YEARS up to OLDEST_AGE_BUCKET+
+AGE_BUCKET_YEARS = 10
+OLDEST_AGE_BUCKET = 90
+AGE_GROUPS = [
+    f"{age}-{age + AGE_BUCKET_YEARS - 1}" for age in range(0, OLDEST_AGE_BUCKET, AGE_BUCKET_YEARS)
+] + [f"{OLDEST_AGE_BUCKET}+", "Unknown"]
+
+def years_before(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29 February
+        return day.replace(year=day.year - years, day=28)
+
+def age_group(date_of_birth: Any, today: date) -> Any:
+    """
+    SQL expression naming the age group of `date_of_birth` on `today`.
+
+    Compares birth dates with the birthday cut-offs of each group rather
+    than computing ages in SQL, which works the same on every database.
+    """
+    whens = [(date_of_birth.is_(None), "Unknown")] + [
+        (date_of_birth > years_before(today, age + AGE_BUCKET_YEARS), label)
+        for age, label in zip(range(0, OLDEST_AGE_BUCKET, AGE_BUCKET_YEARS), AGE_GROUPS)
+    ]
+    return case(*whens, else_=f"{OLDEST_AGE_BUCKET}+")
+
+def patient_demographics(
+    db: Session, today: Optional[date] = None, start_date: Optional[date] = None, end_date: Optional[date] = None,
+    statuses: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Patient counts per gender and age group, bucketed in the database so
+    only the counts come back; age groups follow AGE_GROUPS order.
+
+    Given a date range or statuses, only patients seen then (with such an
+    appointment) are counted.
+    """
+    group = age_group(Patient.date_of_birth, today or date.today()).label("age_group")
+    gender = func.coalesce(Patient.gender, "Unknown").label("gender")
+    query = select(gender, group, func.count().label("patients")).group_by(gender, group)
+    seen = appointment_filters(start_date, end_date, statuses)
+    if seen:
+        query = query.where(select(Appointment.appointment_id).where(
+            Appointment.patient_id == Patient.patient_id, *seen
+        ).exists())
+    rows = db.execute(query)
+    return sorted((row._asdict() for row in rows), key=lambda row: (AGE_GROUPS.index(row["age_group"]), row["gender"]))
+
+def dashboard_kpis(
+    db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None,
+    statuses: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    Headline numbers in one statement: patients, active doctors, appointments
+    and paid revenue in the date range (appointments of `statuses` only, if
+    given) and today's appointments.
+
+    Appointments are counted over index ranges of appointment_date and
+    revenue comes from the daily rollup, so a narrow date range costs less
+    than the all-time view.
+    """
+    def appointments(*filters: Any) -> Any:
+        return select(func.count()).select_from(Appointment).where(*filters).scalar_subquery()
+
+    revenue = select(func.coalesce(func.sum(RevenueDaily.amount), 0)).where(RevenueDaily.status == "Paid")
+    if start_date:
+        revenue = revenue.where(RevenueDaily.revenue_date >= start_date)
+    if end_date:
+        revenue = revenue.where(RevenueDaily.revenue_date <= end_date)
+
+    row = db.execute(select(
+        select(func.count()).select_from(Patient).scalar_subquery().label("patients"),
+        select(func.count()).select_from(Doctor).where(Doctor.is_active == True).scalar_subquery()
+        .label("active_doctors"),
+        appointments(*appointment_filters(start_date, end_date, statuses)).label("appointments"),
+        appointments(*appointment_filters(date.today(), date.today())).label("todays_appointments"),
+        revenue.scalar_subquery().label("revenue")
+    )).one()
+    return {**row._asdict(), "revenue": float(row.revenue)}
+
+def appointment_status_counts(
+    db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None, statuses: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """Appointments per status in the date range, of `statuses` only if given"""
+    query = (
+        select(Appointment.status, func.count().label("appointments"))
+        .where(*appointment_filters(start_date, end_date, statuses))
+        .group_by(Appointment.status).order_by(Appointment.status)
+    )
+    return [row._asdict() for row in db.execute(query)]
+
+def doctors_by_specialization(db: Session) -> List[Dict[str, Any]]:
+    """Active doctors per specialization"""
+    query = (
+        select(Doctor.specialization, func.count().label("doctors")).where(Doctor.is_active == True)
+        .group_by(Doctor.specialization).order_by(Doctor.specialization)
+    )
+    return [row._asdict() for row in db.execute(query)]
+
+def active_doctors(db: Session) -> List[Dict[str, Any]]:
+    query = (
+        select(Doctor.first_name, Doctor.last_name, Doctor.specialization, Doctor.phone, Doctor.email)
+        .where(Doctor.is_active == True).order_by(Doctor.last_name, Doctor.first_name)
+    )
+    return [row._asdict() for row in db.execute(query)]
+
+# Stock levels below which inventory items are flagged low and critical
+LOW_STOCK = 20
+CRITICAL_STOCK = 10
+
+def low_stock_items(db: Session, threshold: int = LOW_STOCK) -> List[Dict[str, Any]]:
+    query = (
+        select(Inventory.item_name, Inventory.quantity, Inventory.category)
+        .where(Inventory.quantity < threshold).order_by(Inventory.quantity, Inventory.item_name)
+    )
+    return [row._asdict() for row in db.execute(query)]
+
+def inventory_value(db: Session) -> float:
+    return float(db.execute(select(func.sum(Inventory.quantity * Inventory.unit_price))).scalar() or 0)
+
+def full_name(model: Any) -> Any:
+    # Same expression as the trigram name indexes, so ILIKE searches can use them
+    return model.first_name.concat(literal_column("' '")).concat(model.last_name).self_group()
+
+# Columns the management grids can show, by header; any subset is selected
+PATIENT_GRID = {
+    "ID": Patient.patient_id,
+    "Name": full_name(Patient),
+    "Date of Birth": Patient.date_of_birth,
+    "Gender": Patient.gender,
+    "Phone": Patient.phone,
+    "Email": Patient.email,
+}
+DOCTOR_GRID = {
+    "ID": Doctor.doctor_id,
+    "Name": full_name(Doctor),
+    "Specialization": Doctor.specialization,
+    "Phone": Doctor.phone,
+    "Email": Doctor.email,
+    "Active": Doctor.is_active,
+    "License": Doctor.license_number,
+}
+
+def patient_filters(search: Optional[str] = None) -> List[Any]:
+    if not search:
+        return []
+    return [full_name(Patient).ilike(like_pattern(search), escape="\\")]
+
+def doctor_filters(specialization: Optional[str] = None, active: Optional[bool] = None) -> List[Any]:
+    filters = []
+    if specialization:
+        filters.append(Doctor.specialization == specialization)
+    if active is not None:
+        filters.append(Doctor.is_active == active)
+    return filters
+
+def grid_page(
+    db: Session, grid: Dict[str, Any], columns: Sequence[str], filters: Sequence[Any] = (),
+    sort: str = "ID", descending: bool = False, page: int = 0, page_size: int = 50
+) -> Tuple[pa.Table, int]:
+    """
+    One page of a management grid as an Arrow table, plus the number of
+    matching rows.
+
+    Filtering, sorting (ties broken by ID) and paging happen in SQL and only
+    the requested columns of the requested page are fetched.
+    """
+    key = grid["ID"]
+    total = db.execute(select(func.count()).select_from(key.table).where(*filters)).scalar()
+    order = [grid[sort].desc() if descending else grid[sort].asc()]
+    if sort != "ID":
+        order.append(key)
+    result = db.execute(
+        select(*(grid[name].label(name) for name in columns)).select_from(key.table).where(*filters)
+        .order_by(*order).offset(page * page_size).limit(page_size)
+    )
+    values = list(zip(*result)) or [()] * len(columns)
+    return pa.table({name: pa.array(column) for name, column in zip(columns, values)}), total
+
+def ages(dates_of_birth: Sequence[Optional[date]], today: Optional[date] = None) -> List[Optional[int]]:
+    """Ages in whole years on `today`"""
+    today = today or date.today()
+    return [
+        None if born is None else today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+        for born in dates_of_birth
+    ]
@@ -1,21 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
+import time
 import os
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from database.config import SessionLocal
-from src.models import Patient, Doctor, Appointment, MedicalRecord, Prescription, Billing, Inventory
-from sqlalchemy import func, text
+from src.ui.cached import get_db, load_dashboard, load_doctor_page, load_patient_page, load_specializations
+from src.ui.grid import display_grid
+from src.ui.queries import AGE_GROUPS, CRITICAL_STOCK, DOCTOR_GRID, PATIENT_GRID
 
 class HealthcareDashboard:
     def __init__(self):
-        self.db = SessionLocal()
+        self.db = get_db()
         self.setup_page()
     
     def setup_page(self):
@@ -74,41 +74,57 @@ class HealthcareDashboard:
         
         return page, start_date, end_date, status_filter
     
-    def display_dashboard(self):
+    def display_dashboard(self, start_date, end_date, status_filter):
         """Main dashboard with KPIs and overview"""
         st.markdown('<h1 class="main-header">🏥 Healthcare Management Dashboard</h1>', unsafe_allow_html=True)
         
+        # Every panel is filtered by the sidebar in SQL; sorted so the cache
+        # key does not depend on selection order
+        statuses = tuple(sorted(status_filter))
+        
+        # All panel queries run concurrently, then the panels render
+        started = time.perf_counter()
+        panels, timings = load_dashboard(start_date, end_date, statuses)
+        elapsed = time.perf_counter() - started
+        
         # Key Performance Indicators
-        self.display_kpis()
+        self.display_kpis(panels["kpis"])
         st.markdown("---")
         
         # Main content in columns
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            self.display_patient_demographics()
-            self.display_appointment_metrics()
+            self.display_patient_demographics(panels["demographics"])
+            self.display_appointment_metrics(panels["appointment_status"])
+            self.display_revenue(panels["revenue"])
         
         with col2:
-            self.display_doctor_status()
-            self.display_inventory_alerts()
+            self.display_doctor_status(panels["specializations"], panels["active_doctors"])
+            self.display_inventory_alerts(panels["low_stock"], panels["inventory_value"])
+        
+        self.display_timings(timings, elapsed)
+    
+    def display_timings(self, timings, elapsed):
+        """Per-panel query times, for spotting the panel that holds the page up"""
+        with st.expander("⏱️ Panel timings"):
+            timing_df = pd.DataFrame(
+                [(panel, seconds * 1000) for panel, seconds in timings.items()], columns=['Panel', 'Query (ms)']
+            ).sort_values('Query (ms)', ascending=False)
+            st.dataframe(timing_df, width="stretch", hide_index=True)
+            st.caption(
+                f"Loaded in {elapsed * 1000:,.0f} ms "
+                f"(slowest panel {max(timings.values()) * 1000:,.0f} ms, all panels {sum(timings.values()) * 1000:,.0f} ms); "
+                "timings are from the last load, which may have been served from cache."
+            )
     
-    def display_kpis(self):
-        """Display Key Performance Indicators"""
-        # Calculate metrics
-        total_patients = self.db.query(Patient).count()
-        total_doctors = self.db.query(Doctor).filter(Doctor.is_active == True).count()
-        total_appointments = self.db.query(Appointment).count()
-        
-        # Revenue calculation
-        revenue_result = self.db.query(Billing.amount).filter(Billing.status == 'Paid').all()
-        total_revenue = sum([r[0] for r in revenue_result]) if revenue_result else 0
-        
-        # Today's appointments
-        today = datetime.now().date()
-        todays_appointments = self.db.query(Appointment).filter(
-            Appointment.appointment_date == today
-        ).count()
+    def display_kpis(self, kpis):
+        """Display Key Performance Indicators for the sidebar filters"""
+        total_patients = kpis["patients"]
+        total_doctors = kpis["active_doctors"]
+        total_appointments = kpis["appointments"]
+        todays_appointments = kpis["todays_appointments"]
+        total_revenue = kpis["revenue"]
         
         # Display KPIs
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -129,7 +145,7 @@ class HealthcareDashboard:
         
         with col3:
             st.metric(
-                "Total Appointments", 
+                "Appointments", 
                 total_appointments,
                 delta=f"+{self.get_appointment_growth()}%"
             )
@@ -143,63 +159,52 @@ class HealthcareDashboard:
         
         with col5:
             st.metric(
-                "Total Revenue", 
+                "Revenue", 
                 f"${total_revenue:,.2f}",
                 delta=f"+${(total_revenue * 0.1):.2f}"
             )
     
-    def display_patient_demographics(self):
-        """Display patient demographic charts"""
+    def display_patient_demographics(self, demographics):
+        """Display demographic charts of the patients seen in the period"""
         st.subheader("👥 Patient Demographics")
         
-        # Gender distribution
-        gender_data = self.db.query(
-            Patient.gender, 
-            func.count(Patient.patient_id)
-        ).group_by(Patient.gender).all()
+        # Gender x age group counts, bucketed in SQL
+        demographics = pd.DataFrame(demographics, columns=['gender', 'age_group', 'patients'])
+        if demographics.empty:
+            return
         
-        if gender_data:
-            gender_df = pd.DataFrame(gender_data, columns=['Gender', 'Count'])
-            fig = px.pie(
-                gender_df, 
-                values='Count', 
-                names='Gender', 
-                title='Patient Gender Distribution',
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Age distribution
-        patients = self.db.query(Patient).all()
-        ages = []
-        for patient in patients:
-            if patient.date_of_birth:
-                age = datetime.now().year - patient.date_of_birth.year
-                ages.append(age)
-        
-        if ages:
-            age_df = pd.DataFrame(ages, columns=['Age'])
-            fig = px.histogram(
-                age_df, 
-                x='Age', 
-                title='Patient Age Distribution',
-                nbins=10,
-                color_discrete_sequence=['#2E86AB']
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # Gender distribution
+        gender_df = demographics.groupby('gender', as_index=False)['patients'].sum()
+        gender_df.columns = ['Gender', 'Count']
+        fig = px.pie(
+            gender_df, 
+            values='Count', 
+            names='Gender', 
+            title='Patient Gender Distribution',
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        st.plotly_chart(fig, width="stretch")
+        
+        # Age distribution, split by gender
+        fig = px.bar(
+            demographics, 
+            x='age_group', 
+            y='patients',
+            color='gender',
+            title='Patient Age Distribution',
+            labels={'age_group': 'Age', 'patients': 'Patients', 'gender': 'Gender'},
+            category_orders={'age_group': AGE_GROUPS},
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        st.plotly_chart(fig, width="stretch")
     
-    def display_appointment_metrics(self):
-        """Display appointment-related metrics"""
+    def display_appointment_metrics(self, status_data):
+        """Display appointment-related metrics for the period"""
         st.subheader("📅 Appointment Analytics")
         
         # Appointment status distribution
-        status_data = self.db.query(
-            Appointment.status,
-            func.count(Appointment.appointment_id)
-        ).group_by(Appointment.status).all()
-        
         if status_data:
-            status_df = pd.DataFrame(status_data, columns=['Status', 'Count'])
+            status_df = pd.DataFrame(status_data).rename(columns={'status': 'Status', 'appointments': 'Count'})
             fig = px.bar(
                 status_df,
                 x='Status',
@@ -208,20 +213,33 @@ class HealthcareDashboard:
                 color='Status',
                 color_discrete_sequence=px.colors.qualitative.Pastel
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, width="stretch")
     
-    def display_doctor_status(self):
+    def display_revenue(self, revenue):
+        """Display paid revenue per day for the period"""
+        st.subheader("💰 Revenue")
+        
+        if revenue:
+            revenue_df = pd.DataFrame(revenue)
+            revenue_df['amount'] = revenue_df['amount'].astype(float)
+            fig = px.bar(
+                revenue_df,
+                x='revenue_date',
+                y='amount',
+                title='Paid Revenue by Service Date',
+                labels={'revenue_date': 'Date', 'amount': 'Revenue'}
+            )
+            st.plotly_chart(fig, width="stretch")
+        else:
+            st.info("No paid revenue in this period.")
+    
+    def display_doctor_status(self, spec_data, doctors):
         """Display doctor information and status"""
         st.subheader("👨‍⚕️ Doctor Overview")
         
         # Active doctors by specialization
-        spec_data = self.db.query(
-            Doctor.specialization,
-            func.count(Doctor.doctor_id)
-        ).filter(Doctor.is_active == True).group_by(Doctor.specialization).all()
-        
         if spec_data:
-            spec_df = pd.DataFrame(spec_data, columns=['Specialization', 'Count'])
+            spec_df = pd.DataFrame(spec_data).rename(columns={'specialization': 'Specialization', 'doctors': 'Count'})
             fig = px.pie(
                 spec_df,
                 values='Count',
@@ -229,50 +247,43 @@ class HealthcareDashboard:
                 title='Doctors by Specialization',
                 hole=0.4
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, width="stretch")
         
         # Doctor list
-        doctors = self.db.query(Doctor).filter(Doctor.is_active == True).all()
         doctor_list = []
         for doctor in doctors:
             doctor_list.append({
-                'Name': f"Dr. {doctor.first_name} {doctor.last_name}",
-                'Specialization': doctor.specialization,
-                'Phone': doctor.phone,
-                'Email': doctor.email
+                'Name': f"Dr. {doctor['first_name']} {doctor['last_name']}",
+                'Specialization': doctor['specialization'],
+                'Phone': doctor['phone'],
+                'Email': doctor['email']
             })
         
         if doctor_list:
-            st.dataframe(pd.DataFrame(doctor_list), use_container_width=True)
+            st.dataframe(pd.DataFrame(doctor_list), width="stretch")
     
-    def display_inventory_alerts(self):
+    def display_inventory_alerts(self, low_stock, inventory_value):
         """Display inventory status and alerts"""
         st.subheader("📦 Inventory Status")
         
         # Low stock alert
-        low_stock = self.db.query(Inventory).filter(Inventory.quantity < 20).all()
-        
         if low_stock:
             st.warning(f"🚨 {len(low_stock)} items are running low on stock!")
             
             low_stock_data = []
             for item in low_stock:
                 low_stock_data.append({
-                    'Item': item.item_name,
-                    'Current Stock': item.quantity,
-                    'Category': item.category,
-                    'Status': 'CRITICAL' if item.quantity < 10 else 'LOW'
+                    'Item': item['item_name'],
+                    'Current Stock': item['quantity'],
+                    'Category': item['category'],
+                    'Status': 'CRITICAL' if item['quantity'] < CRITICAL_STOCK else 'LOW'
                 })
             
-            st.dataframe(pd.DataFrame(low_stock_data), use_container_width=True)
+            st.dataframe(pd.DataFrame(low_stock_data), width="stretch")
         else:
             st.success("✅ All inventory items are sufficiently stocked")
         
         # Inventory value summary
-        inventory_value = self.db.query(
-            func.sum(Inventory.quantity * Inventory.unit_price)
-        ).scalar()
-        
         if inventory_value:
             st.metric("Total Inventory Value", f"${inventory_value:,.2f}")
     
@@ -280,40 +291,11 @@ class HealthcareDashboard:
         """Patient management interface"""
         st.title("👥 Patient Management")
         
-        # Patient list with search
         search_term = st.text_input("🔍 Search patients by name:")
-        
-        if search_term:
-            patients = self.db.query(Patient).filter(
-                (Patient.first_name.ilike(f"%{search_term}%")) |
-                (Patient.last_name.ilike(f"%{search_term}%"))
-            ).all()
-        else:
-            patients = self.db.query(Patient).all()
-        
-        # Display patients in a nice table
-        patient_data = []
-        for patient in patients:
-            # Calculate age
-            age = "N/A"
-            if patient.date_of_birth:
-                age = datetime.now().year - patient.date_of_birth.year
-            
-            patient_data.append({
-                'ID': patient.patient_id,
-                'Name': f"{patient.first_name} {patient.last_name}",
-                'Age': age,
-                'Gender': patient.gender,
-                'Phone': patient.phone,
-                'Email': patient.email,
-                'Blood Type': patient.blood_type or 'Unknown'
-            })
-        
-        if patient_data:
-            df = pd.DataFrame(patient_data)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No patients found matching your search criteria.")
+        display_grid(
+            "patients", PATIENT_GRID, load_patient_page, search_term.strip() or None,
+            empty_message="No patients found matching your search criteria."
+        )
     
     def display_doctor_management(self):
         """Doctor management interface"""
@@ -325,7 +307,7 @@ class HealthcareDashboard:
         with col1:
             specialization_filter = st.selectbox(
                 "Filter by specialization:",
-                ["All"] + [spec[0] for spec in self.db.query(Doctor.specialization).distinct().all()]
+                ["All"] + load_specializations()
             )
         
         with col2:
@@ -334,36 +316,12 @@ class HealthcareDashboard:
                 ["All", "Active", "Inactive"]
             )
         
-        # Build query based on filters
-        query = self.db.query(Doctor)
-        
-        if specialization_filter != "All":
-            query = query.filter(Doctor.specialization == specialization_filter)
-        
-        if status_filter == "Active":
-            query = query.filter(Doctor.is_active == True)
-        elif status_filter == "Inactive":
-            query = query.filter(Doctor.is_active == False)
-        
-        doctors = query.all()
-        
-        # Display doctors
-        doctor_data = []
-        for doctor in doctors:
-            doctor_data.append({
-                'ID': doctor.doctor_id,
-                'Name': f"Dr. {doctor.first_name} {doctor.last_name}",
-                'Specialization': doctor.specialization,
-                'Phone': doctor.phone,
-                'Email': doctor.email,
-                'Status': 'Active' if doctor.is_active else 'Inactive',
-                'License': doctor.license_number
-            })
-        
-        if doctor_data:
-            st.dataframe(pd.DataFrame(doctor_data), use_container_width=True)
-        else:
-            st.info("No doctors found matching your criteria.")
+        display_grid(
+            "doctors", DOCTOR_GRID, load_doctor_page,
+            None if specialization_filter == "All" else specialization_filter,
+            None if status_filter == "All" else status_filter == "Active",
+            empty_message="No doctors found matching your criteria."
+        )
     
     def get_patient_growth(self):
         """Calculate patient growth percentage (mock data)"""
@@ -379,7 +337,7 @@ class HealthcareDashboard:
             page, start_date, end_date, status_filter = self.setup_sidebar()
             
             if page == "Dashboard":
-                self.display_dashboard()
+                self.display_dashboard(start_date, end_date, status_filter)
             elif page == "Patient Management":
                 self.display_patient_management()
             elif page == "Doctor Management":
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 import os
@@ -12,18 +11,21 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.insert(0, project_root)
 
 try:
-    from database.config import SessionLocal
-    from src.models import Patient, Doctor, Appointment, MedicalRecord, Prescription, Billing, Inventory
-    from sqlalchemy import func, text
+    from src.ui.cached import get_db, load_dashboard, load_doctor_page, load_patient_page
+    from src.ui.grid import display_grid
+    from src.ui.queries import AGE_GROUPS, DOCTOR_GRID, PATIENT_GRID
     IMPORT_SUCCESS = True
 except ImportError as e:
     st.error(f"Import Error: {e}")
     IMPORT_SUCCESS = False
 
+# Panels rendered by display_dashboard
+DASHBOARD_PANELS = ("kpis", "demographics", "appointment_status", "specializations", "low_stock")
+
 class HealthcareDashboard:
     def __init__(self):
         if IMPORT_SUCCESS:
-            self.db = SessionLocal()
+            self.db = get_db()
         else:
             self.db = None
         self.setup_page()
@@ -52,43 +54,63 @@ class HealthcareDashboard:
              "Appointments", "Medical Records", "Inventory", "Analytics"]
         )
         
-        return page
+        # Quick filters
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("📊 Quick Filters")
+        
+        # Date range filter
+        today = datetime.now()
+        start_date = st.sidebar.date_input("Start Date", today - timedelta(days=30))
+        end_date = st.sidebar.date_input("End Date", today)
+        
+        # Status filter
+        status_filter = st.sidebar.multiselect(
+            "Appointment Status",
+            ["Scheduled", "Completed", "Cancelled", "No-show"],
+            default=["Scheduled", "Completed"]
+        )
+        
+        return page, start_date, end_date, status_filter
     
-    def display_dashboard(self):
+    def display_dashboard(self, start_date, end_date, status_filter):
         """Main dashboard with KPIs and overview"""
         st.markdown('<h1 style="font-size: 2.5rem; color: #1f77b4; text-align: center;">🏥 Healthcare Management Dashboard</h1>', unsafe_allow_html=True)
         
+        # Every panel is filtered by the sidebar in SQL; sorted so the cache
+        # key does not depend on selection order
+        statuses = tuple(sorted(status_filter))
+        
+        # Only the panels this page renders, queried concurrently
+        panels, timings = load_dashboard(start_date, end_date, statuses, DASHBOARD_PANELS)
+        
         # Key Performance Indicators
-        self.display_kpis()
+        self.display_kpis(panels["kpis"])
         st.markdown("---")
         
         # Main content in columns
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            self.display_patient_demographics()
-            self.display_appointment_metrics()
+            self.display_patient_demographics(panels["demographics"])
+            self.display_appointment_metrics(panels["appointment_status"])
         
         with col2:
-            self.display_doctor_status()
-            self.display_inventory_alerts()
+            self.display_doctor_status(panels["specializations"])
+            self.display_inventory_alerts(panels["low_stock"])
+        
+        with st.expander("⏱️ Panel timings"):
+            st.dataframe(
+                pd.DataFrame([(panel, seconds * 1000) for panel, seconds in timings.items()], columns=['Panel', 'Query (ms)']),
+                width="stretch", hide_index=True
+            )
     
-    def display_kpis(self):
+    def display_kpis(self, kpis):
         """Display Key Performance Indicators"""
-        # Calculate metrics
-        total_patients = self.db.query(Patient).count()
-        total_doctors = self.db.query(Doctor).filter(Doctor.is_active == True).count()
-        total_appointments = self.db.query(Appointment).count()
-        
-        # Revenue calculation
-        revenue_result = self.db.query(Billing.amount).filter(Billing.status == 'Paid').all()
-        total_revenue = sum([r[0] for r in revenue_result]) if revenue_result else 0
-        
-        # Today's appointments
-        today = datetime.now().date()
-        todays_appointments = self.db.query(Appointment).filter(
-            Appointment.appointment_date == today
-        ).count()
+        total_patients = kpis["patients"]
+        total_doctors = kpis["active_doctors"]
+        total_appointments = kpis["appointments"]
+        todays_appointments = kpis["todays_appointments"]
+        total_revenue = kpis["revenue"]
         
         # Display KPIs
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -108,103 +130,85 @@ class HealthcareDashboard:
         with col5:
             st.metric("Total Revenue", f"${total_revenue:,.2f}")
     
-    def display_patient_demographics(self):
+    def display_patient_demographics(self, demographics):
         """Display patient demographic charts"""
         st.subheader("👥 Patient Demographics")
         
-        # Gender distribution
-        gender_data = self.db.query(
-            Patient.gender, 
-            func.count(Patient.patient_id)
-        ).group_by(Patient.gender).all()
-        
-        if gender_data:
-            gender_df = pd.DataFrame(gender_data, columns=['Gender', 'Count'])
-            fig = px.pie(
-                gender_df, 
-                values='Count', 
-                names='Gender', 
-                title='Patient Gender Distribution'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Age distribution
-        patients = self.db.query(Patient).all()
-        ages = []
-        for patient in patients:
-            if patient.date_of_birth:
-                age = datetime.now().year - patient.date_of_birth.year
-                ages.append(age)
+        # Gender x age group counts, bucketed in SQL
+        demographics = pd.DataFrame(demographics, columns=['gender', 'age_group', 'patients'])
+        if demographics.empty:
+            return
         
-        if ages:
-            age_df = pd.DataFrame(ages, columns=['Age'])
-            fig = px.histogram(
-                age_df, 
-                x='Age', 
-                title='Patient Age Distribution',
-                nbins=10
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # Gender distribution
+        gender_df = demographics.groupby('gender', as_index=False)['patients'].sum()
+        gender_df.columns = ['Gender', 'Count']
+        fig = px.pie(
+            gender_df, 
+            values='Count', 
+            names='Gender', 
+            title='Patient Gender Distribution'
+        )
+        st.plotly_chart(fig, width="stretch")
+        
+        # Age distribution, split by gender
+        fig = px.bar(
+            demographics, 
+            x='age_group', 
+            y='patients',
+            color='gender',
+            title='Patient Age Distribution',
+            labels={'age_group': 'Age', 'patients': 'Patients', 'gender': 'Gender'},
+            category_orders={'age_group': AGE_GROUPS}
+        )
+        st.plotly_chart(fig, width="stretch")
     
-    def display_appointment_metrics(self):
+    def display_appointment_metrics(self, status_data):
         """Display appointment-related metrics"""
         st.subheader("📅 Appointment Analytics")
         
         # Appointment status distribution
-        status_data = self.db.query(
-            Appointment.status,
-            func.count(Appointment.appointment_id)
-        ).group_by(Appointment.status).all()
-        
         if status_data:
-            status_df = pd.DataFrame(status_data, columns=['Status', 'Count'])
+            status_df = pd.DataFrame(status_data).rename(columns={'status': 'Status', 'appointments': 'Count'})
             fig = px.bar(
                 status_df,
                 x='Status',
                 y='Count',
                 title='Appointments by Status'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, width="stretch")
     
-    def display_doctor_status(self):
+    def display_doctor_status(self, spec_data):
         """Display doctor information and status"""
         st.subheader("👨‍⚕️ Doctor Overview")
         
         # Active doctors by specialization
-        spec_data = self.db.query(
-            Doctor.specialization,
-            func.count(Doctor.doctor_id)
-        ).filter(Doctor.is_active == True).group_by(Doctor.specialization).all()
-        
         if spec_data:
-            spec_df = pd.DataFrame(spec_data, columns=['Specialization', 'Count'])
+            spec_df = pd.DataFrame(spec_data).rename(columns={'specialization': 'Specialization', 'doctors': 'Count'})
             fig = px.pie(
                 spec_df,
                 values='Count',
                 names='Specialization',
                 title='Doctors by Specialization'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, width="stretch")
     
-    def display_inventory_alerts(self):
+    def display_inventory_alerts(self, low_stock):
         """Display inventory status and alerts"""
         st.subheader("📦 Inventory Status")
         
         # Low stock alert
-        low_stock = self.db.query(Inventory).filter(Inventory.quantity < 20).all()
-        
         if low_stock:
             st.warning(f"🚨 {len(low_stock)} items are running low on stock!")
             
             low_stock_data = []
             for item in low_stock:
                 low_stock_data.append({
-                    'Item': item.item_name,
-                    'Current Stock': item.quantity,
-                    'Category': item.category
+                    'Item': item['item_name'],
+                    'Current Stock': item['quantity'],
+                    'Category': item['category']
                 })
             
-            st.dataframe(pd.DataFrame(low_stock_data), use_container_width=True)
+            st.dataframe(pd.DataFrame(low_stock_data), width="stretch")
         else:
             st.success("✅ All inventory items are sufficiently stocked")
     
@@ -212,53 +216,15 @@ class HealthcareDashboard:
         """Patient management interface"""
         st.title("👥 Patient Management")
         
-        patients = self.db.query(Patient).all()
-        
-        # Display patients in a nice table
-        patient_data = []
-        for patient in patients:
-            # Calculate age
-            age = "N/A"
-            if patient.date_of_birth:
-                age = datetime.now().year - patient.date_of_birth.year
-            
-            patient_data.append({
-                'ID': patient.patient_id,
-                'Name': f"{patient.first_name} {patient.last_name}",
-                'Age': age,
-                'Gender': patient.gender,
-                'Phone': patient.phone,
-                'Email': patient.email
-            })
-        
-        if patient_data:
-            df = pd.DataFrame(patient_data)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No patients found in the database.")
+        display_grid("patients", PATIENT_GRID, load_patient_page, None, empty_message="No patients found in the database.")
     
     def display_doctor_management(self):
         """Doctor management interface"""
         st.title("👨‍⚕️ Doctor Management")
         
-        doctors = self.db.query(Doctor).all()
-        
-        # Display doctors
-        doctor_data = []
-        for doctor in doctors:
-            doctor_data.append({
-                'ID': doctor.doctor_id,
-                'Name': f"Dr. {doctor.first_name} {doctor.last_name}",
-                'Specialization': doctor.specialization,
-                'Phone': doctor.phone,
-                'Email': doctor.email,
-                'Status': 'Active' if doctor.is_active else 'Inactive'
-            })
-        
-        if doctor_data:
-            st.dataframe(pd.DataFrame(doctor_data), use_container_width=True)
-        else:
-            st.info("No doctors found in the database.")
+        display_grid(
+            "doctors", DOCTOR_GRID, load_doctor_page, None, None, empty_message="No doctors found in the database."
+        )
     
     def run(self):
         """Main method to run the dashboard"""
@@ -272,10 +238,10 @@ class HealthcareDashboard:
             return
         
         try:
-            page = self.setup_sidebar()
+            page, start_date, end_date, status_filter = self.setup_sidebar()
             
             if page == "Dashboard":
-                self.display_dashboard()
+                self.display_dashboard(start_date, end_date, status_filter)
             elif page == "Patient Management":
                 self.display_patient_management()
             elif page == "Doctor Management":
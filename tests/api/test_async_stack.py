@@ -0,0 +1,80 @@
+"""
+The API routers are async and must behave the same on both database stacks:
+a sync Session (run in worker threads) and an AsyncSession (aiosqlite here,
+asyncpg in production).
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database.config import Base
+from src.api.sessions import get_api_db
+from src.api.main import app
+
+PATIENT = {
+    "first_name": "Alice", "last_name": "Johnson", "date_of_birth": "1990-05-15",
+    "gender": "Female", "phone": "+1555123456", "email": "alice.johnson@example.com"
+}
+DOCTOR = {
+    "first_name": "Michael", "last_name": "Brown", "specialization": "Neurology",
+    "phone": "+1555123457", "email": "michael.brown@hospital.com",
+    "license_number": "MED789012", "hire_date": "2018-08-20"
+}
+
+@pytest.fixture
+def async_client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_api_db] = override_get_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+def exercise_crud(client):
+    patient = client.post("/patients/", json=PATIENT)
+    assert patient.status_code == 201
+    patient_id = patient.json()["patient_id"]
+
+    assert client.post("/patients/", json=PATIENT).status_code == 400
+
+    doctor = client.post("/doctors/", json=DOCTOR)
+    assert doctor.status_code == 201
+    doctor_id = doctor.json()["doctor_id"]
+
+    appointment = client.post("/appointments/", json={
+        "patient_id": patient_id, "doctor_id": doctor_id,
+        "appointment_date": "2030-01-01T09:00:00"
+    })
+    assert appointment.status_code == 201
+
+    assert client.get(f"/doctors/{doctor_id}").json()["last_name"] == "Brown"
+    assert client.get("/doctors/specializations/").json() == ["Neurology"]
+    assert len(client.get("/appointments/", params={"status": "Scheduled"}).json()) == 1
+
+    exported = client.get("/appointments/export", params={"date_from": "2030-01-01"})
+    assert [row["appointment_id"] for row in map(json.loads, exported.text.splitlines())] == [
+        appointment.json()["appointment_id"]
+    ]
+
+    updated = client.put(f"/patients/{patient_id}", json={"address": "1 Elm St"})
+    assert updated.json()["address"] == "1 Elm St"
+
+    assert client.delete(f"/appointments/{appointment.json()['appointment_id']}").status_code == 204
+    assert client.get("/appointments/").json() == []
+
+def test_sync_session_stack(client):
+    exercise_crud(client)
+
+def test_async_session_stack(async_client):
+    exercise_crud(async_client)
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from database.config import ROW_CHANGES_RETENTION
+from src.crud import patient_autocomplete, patient_crud
+from src.models import Patient
+from src.crud.autocomplete import AutocompleteIndex
+
+PATIENT = {
+    "first_name": "Alice", "last_name": "Johnson", "date_of_birth": "1990-05-15",
+    "phone": "+1555123456", "email": "alice.johnson@example.com"
+}
+
+def suggest(client, q, **params):
+    return client.get("/patients/autocomplete", params={"q": q, **params}).json()
+
+def test_suggests_by_name_phone_suffix_and_id(client, patient):
+    expected = [{"id": patient.patient_id, "name": "John Doe", "phone": "+1234567890"}]
+    assert suggest(client, "jo") == expected
+    assert suggest(client, "Doe J") == expected
+    assert suggest(client, "7890") == expected
+    assert suggest(client, str(patient.patient_id)) == expected
+    assert suggest(client, "smith") == []
+
+def test_lookups_go_to_the_database_until_the_index_is_built(client, db, patient):
+    assert suggest(client, "doe")[0]["id"] == patient.patient_id
+    assert suggest(client, "4567890")[0]["id"] == patient.patient_id
+    assert not patient_autocomplete.ready
+
+    patient_crud.build_index(db)
+    assert suggest(client, "doe")[0]["id"] == patient.patient_id
+
+def test_index_follows_api_writes(client, db, patient):
+    patient_crud.build_index(db)
+    assert suggest(client, "alice") == []
+    created = client.post("/patients/", json=PATIENT).json()
+    assert [row["id"] for row in suggest(client, "alice")] == [created["patient_id"]]
+
+    client.put(f"/patients/{created['patient_id']}", json={"last_name": "Cooper"})
+    assert suggest(client, "johnson") == []
+    assert suggest(client, "cooper")[0]["name"] == "Alice Cooper"
+
+    client.delete(f"/patients/{created['patient_id']}")
+    assert suggest(client, "alice") == []
+
+    client.post("/patients/bulk", json=[PATIENT])
+    assert len(suggest(client, "alice")) == 1
+    assert patient_autocomplete.stats()["pending"] > 0
+
+def test_doctor_autocomplete(client, doctor):
+    response = client.get("/doctors/autocomplete", params={"q": "rob"})
+    assert [row["name"] for row in response.json()] == ["Robert Johnson"]
+
+def test_overlay_is_merged_and_limits_apply():
+    index = AutocompleteIndex(merge_threshold=6)
+    index.build([(1, "José", "Álvarez", "555-0101")])
+    for id in range(2, 6):
+        index.put((id, f"Jo{id}", "Smith", f"555-01{id:02d}"))
+    stats = index.stats()
+    assert stats["pending"] == 0 and stats["entries"] == 20
+
+    assert [row["id"] for row in index.search("jo", limit=3)] == [2, 3, 4]
+    assert index.search("alvarez jose")[0]["name"] == "José Álvarez"
+    index.discard(1)
+    assert index.search("alvarez") == []
+
+@pytest.mark.parametrize("merged", [True, False])
+def test_limit_counts_rows_not_keys(merged):
+    # "anna annabel" and "annabel anna" both match, but are one row
+    rows = [(1, "Anna", "Annabel", "555"), (2, "Annie", "Xu", "556")]
+    index = AutocompleteIndex()
+    index.build(rows if merged else [])
+    for row in ([] if merged else rows):
+        index.put(row)
+    assert [row["id"] for row in index.search("ann", 2)] == [1, 2]
+    assert [row["id"] for row in index.search("ann", 1)] == [1]
+
+def test_refresh_applies_other_workers_changes(client, db, session_factory, patient):
+    assert patient_crud.refresh_index(db)
+    assert not patient_crud.refresh_index(db)
+
+    # Writes through the API are already in the index
+    created = client.post("/patients/", json=PATIENT).json()
+    client.delete(f"/patients/{created['patient_id']}")
+    assert not patient_crud.refresh_index(db)
+
+    # Another worker adds, renames and deletes rows behind its back
+    with session_factory() as other:
+        other.add(Patient(first_name="Zoe", last_name="Quinn", date_of_birth=patient.date_of_birth, phone="+1555000111"))
+        other.get(Patient, patient.patient_id).last_name = "Dalton"
+        other.commit()
+    assert suggest(client, "zoe") == []
+    assert not patient_crud.refresh_index(db)
+    assert suggest(client, "zoe")[0]["name"] == "Zoe Quinn"
+    assert suggest(client, "doe") == []
+    assert suggest(client, "dalton")[0]["id"] == patient.patient_id
+
+    with session_factory() as other:
+        other.execute(delete(Patient).where(Patient.first_name == "Zoe"))
+        other.commit()
+    assert not patient_crud.refresh_index(db)
+    assert suggest(client, "zoe") == []
+
+def test_index_is_rebuilt_once_the_change_log_may_be_pruned(db, patient, monkeypatch):
+    assert patient_crud.refresh_index(db)
+    assert not patient_crud.refresh_index(db)
+    monkeypatch.setattr(patient_autocomplete, "refreshed_at", time.monotonic() - ROW_CHANGES_RETENTION - 1)
+    assert patient_crud.refresh_index(db)
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+import pytest
+from src.crud import appointment_crud
+from src.models import Appointment
+from src.crud.schedule import ScheduleIndex
+
+# A Monday comfortably in the future, so "never in the past" does not apply
+MONDAY = date.today() + timedelta(days=14 - date.today().weekday())
+
+def at(hour, minute=0, day=MONDAY):
+    return datetime(day.year, day.month, day.day, hour, minute).isoformat()
+
+def slots(client, url, **params):
+    response = client.get(url, params={"date_from": MONDAY.isoformat(), "limit": 3, **params})
+    assert response.status_code == 200
+    return [(slot["doctor_id"], slot["start"]) for slot in response.json()]
+
+def book(client, patient, doctor, when):
+    response = client.post("/appointments/", json={
+        "patient_id": patient.patient_id, "doctor_id": doctor.doctor_id, "appointment_date": when
+    })
+    assert response.status_code == 201
+    return response.json()
+
+@pytest.mark.parametrize("built", [False, True], ids=["from-db", "from-index"])
+def test_doctor_availability_skips_booked_slots(client, db, patient, doctor, built):
+    if built:
+        appointment_crud.build_index(db)
+    url = f"/doctors/{doctor.doctor_id}/availability"
+    assert [start for _, start in slots(client, url)] == [at(9), at(9, 30), at(10)]
+
+    first = book(client, patient, doctor, at(9))
+    # Off the slot grid, so it overlaps both the 9:30 and 10:00 slots
+    book(client, patient, doctor, at(9, 45))
+    assert [start for _, start in slots(client, url)] == [at(10, 30), at(11), at(11, 30)]
+
+    client.put(f"/appointments/{first['appointment_id']}", json={**first, "status": "Cancelled"})
+    assert [start for _, start in slots(client, url)] == [at(9), at(10, 30), at(11)]
+
+def test_refresh_applies_other_workers_reschedules_and_cancellations(client, db, session_factory, patient, doctor):
+    url = f"/doctors/{doctor.doctor_id}/availability"
+    first = book(client, patient, doctor, at(9))
+    second = book(client, patient, doctor, at(9, 30))
+    assert appointment_crud.refresh_index(db)
+    assert [start for _, start in slots(client, url)] == [at(10), at(10, 30), at(11)]
+
+    # Another worker moves one appointment and cancels the other
+    with session_factory() as other:
+        other.get(Appointment, first["appointment_id"]).appointment_date = datetime.fromisoformat(at(10))
+        other.get(Appointment, second["appointment_id"]).status = "Cancelled"
+        other.commit()
+    assert [start for _, start in slots(client, url)] == [at(10), at(10, 30), at(11)]
+    assert not appointment_crud.refresh_index(db)
+    assert [start for _, start in slots(client, url)] == [at(9), at(9, 30), at(10, 30)]
+
+def test_weekends_and_unknown_doctors(client, doctor):
+    saturday = MONDAY - timedelta(days=2)
+    url = f"/doctors/{doctor.doctor_id}/availability"
+    assert slots(client, url, date_from=saturday.isoformat())[0][1] == at(9)
+    assert slots(client, url, date_from=saturday.isoformat(), date_to=saturday.isoformat()) == []
+    assert client.get("/doctors/999/availability").status_code == 404
+
+def test_slots_across_specialization(client, patient, doctor):
+    other = client.post("/doctors/", json={
+        "first_name": "Emily", "last_name": "Davis", "specialization": "Cardiology",
+        "phone": "+1234567893", "email": "emily.davis@hospital.com",
+        "license_number": "MED123457", "hire_date": "2019-06-01"
+    }).json()
+    client.post("/doctors/", json={
+        "first_name": "Mark", "last_name": "Lee", "specialization": "Dermatology",
+        "phone": "+1234567894", "email": "mark.lee@hospital.com",
+        "license_number": "MED123458", "hire_date": "2018-02-01"
+    })
+    book(client, patient, doctor, at(9))
+
+    assert slots(client, "/appointments/slots", specialization="Cardiology") == [
+        (other["doctor_id"], at(9)), (doctor.doctor_id, at(9, 30)), (other["doctor_id"], at(9, 30))
+    ]
+
+def test_working_hours_bound_slots():
+    index = ScheduleIndex(day_start="08:00", day_end="10:00", slot_minutes=60, workdays=[0])
+    index.build([(1, 7, datetime.combine(MONDAY, datetime.min.time()).replace(hour=8), "Scheduled")])
+    start = datetime.combine(MONDAY, datetime.min.time())
+    found = index.free_slots([7, 8], start, start + timedelta(days=8), limit=10)
+    assert [(slot["doctor_id"], slot["start"].isoformat()) for slot in found] == [
+        (8, at(8)), (7, at(9)), (8, at(9)),
+        (7, at(8, day=MONDAY + timedelta(days=7))), (8, at(8, day=MONDAY + timedelta(days=7))),
+        (7, at(9, day=MONDAY + timedelta(days=7))), (8, at(9, day=MONDAY + timedelta(days=7)))
+    ]
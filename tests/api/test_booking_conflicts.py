@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+MONDAY = datetime.combine(datetime.now().date() + timedelta(days=14 - datetime.now().weekday()), datetime.min.time())
+
+def book(client, patient_id, doctor_id, when, **fields):
+    return client.post("/appointments/", json={
+        "patient_id": patient_id, "doctor_id": doctor_id, "appointment_date": when.isoformat(), **fields
+    })
+
+def second_doctor(client):
+    return client.post("/doctors/", json={
+        "first_name": "Emily", "last_name": "Davis", "specialization": "Cardiology",
+        "phone": "+1234567893", "email": "emily.davis@hospital.com",
+        "license_number": "MED123457", "hire_date": "2019-06-01"
+    }).json()["doctor_id"]
+
+def second_patient(client):
+    return client.post("/patients/", json={
+        "first_name": "Alice", "last_name": "Johnson", "date_of_birth": "1990-05-15",
+        "phone": "+1555123456", "email": "alice.johnson@example.com"
+    }).json()["patient_id"]
+
+def test_overlapping_bookings_are_rejected(client, patient, doctor):
+    nine = MONDAY.replace(hour=9)
+    first = book(client, patient.patient_id, doctor.doctor_id, nine).json()
+
+    response = book(client, second_patient(client), doctor.doctor_id, nine + timedelta(minutes=15))
+    assert response.status_code == 409
+    assert response.json()["conflict"]["appointment_id"] == first["appointment_id"]
+    assert response.json()["detail"].startswith(f"Doctor {doctor.doctor_id}")
+
+    response = book(client, patient.patient_id, second_doctor(client), nine - timedelta(minutes=20))
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith(f"Patient {patient.patient_id}")
+
+    # Back to back is fine, and so is booking over a cancelled appointment
+    assert book(client, patient.patient_id, doctor.doctor_id, nine + timedelta(minutes=30)).status_code == 201
+    client.put(f"/appointments/{first['appointment_id']}", json={**first, "status": "Cancelled"})
+    assert book(client, patient.patient_id, doctor.doctor_id, nine).status_code == 201
+
+def test_updates_are_checked_against_other_appointments(client, patient, doctor):
+    first = book(client, patient.patient_id, doctor.doctor_id, MONDAY.replace(hour=9)).json()
+    second = book(client, patient.patient_id, doctor.doctor_id, MONDAY.replace(hour=10)).json()
+
+    moved = client.put(f"/appointments/{second['appointment_id']}", json={**second, "appointment_date": first["appointment_date"]})
+    assert moved.status_code == 409
+    assert client.get(f"/appointments/{second['appointment_id']}").json()["appointment_date"] == second["appointment_date"]
+
+    same = client.put(f"/appointments/{first['appointment_id']}", json={**first, "reason": "Follow-up"})
+    assert same.status_code == 200
+
+def test_bulk_bookings_are_checked_within_the_batch(client, patient, doctor):
+    nine = MONDAY.replace(hour=9)
+    stored = book(client, patient.patient_id, doctor.doctor_id, nine).json()
+    other = second_patient(client)
+    inactive = client.post("/doctors/", json={
+        "first_name": "Robert", "last_name": "Miller", "specialization": "Neurology",
+        "phone": "+1234567894", "email": "robert.miller@hospital.com",
+        "license_number": "MED123458", "hire_date": "2010-01-01", "is_active": False
+    }).json()["doctor_id"]
+
+    def row(patient_id, doctor_id, when, **fields):
+        return {"patient_id": patient_id, "doctor_id": doctor_id, "appointment_date": when.isoformat(), **fields}
+
+    rows = [
+        row(other, doctor.doctor_id, nine + timedelta(hours=1)),
+        row(other, doctor.doctor_id, nine + timedelta(hours=1)),              # same slot as row 0
+        row(patient.patient_id, doctor.doctor_id, nine + timedelta(minutes=70)),  # doctor busy from row 0
+        row(other, doctor.doctor_id, nine + timedelta(minutes=10)),           # overlaps the stored booking
+        row(other, doctor.doctor_id, nine + timedelta(hours=2), status="Cancelled"),
+        row(other, doctor.doctor_id, nine + timedelta(hours=2)),              # cancelled rows hold no slot
+        row(other, inactive, nine + timedelta(hours=3)),
+    ]
+    response = client.post("/appointments/bulk", json=rows)
+    assert response.status_code == 201
+    body = response.json()
+
+    errors = {e["index"]: e["errors"][0]["msg"] for e in body["errors"]}
+    assert sorted(errors) == [1, 2, 3, 6]
+    assert errors[1].startswith(f"Doctor {doctor.doctor_id} already has an appointment") and "in this batch" in errors[1]
+    assert errors[3] == f"Doctor {doctor.doctor_id} already has an appointment at {stored['appointment_date']}"
+    assert errors[6] == "Cannot schedule appointment with inactive doctor"
+    assert len(body["created"]) == 3
+    assert len(client.get(f"/appointments/doctor/{doctor.doctor_id}").json()) == 4
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import event
+
+from src.models import Patient
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+def patient_row(i, **overrides):
+    row = {
+        "first_name": f"Bulk{i}", "last_name": "Import", "date_of_birth": "1970-01-01",
+        "phone": f"+1444000{i:04d}"
+    }
+    row.update(overrides)
+    return row
+
+def test_bulk_create_inserts_all_valid_rows(client, db):
+    rows = [patient_row(i) for i in range(2500)]
+    response = client.post("/patients/bulk", json=rows)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["errors"] == []
+    assert [p["first_name"] for p in body["created"][:3]] == ["Bulk0", "Bulk1", "Bulk2"]
+    assert db.query(Patient).count() == 2500
+
+def test_bulk_create_reports_per_row_errors(client, db, patient):
+    rows = [
+        patient_row(0),
+        patient_row(1, first_name=None),         # fails validation
+        patient_row(2, phone=patient.phone),     # collides with an existing patient
+        patient_row(3),
+        patient_row(4, phone=patient_row(0)["phone"]),  # collides within the batch
+    ]
+    body = client.post("/patients/bulk", json=rows).json()
+
+    assert [e["index"] for e in body["errors"]] == [1, 2, 4]
+    assert body["errors"][0]["errors"][0]["loc"] == ["first_name"]
+    assert body["errors"][1]["errors"][0]["type"] == "integrity_error"
+    assert sorted(p["first_name"] for p in body["created"]) == ["Bulk0", "Bulk3"]
+    assert db.query(Patient).count() == 3
+
+def test_bulk_create_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr("src.api.bulk.MAX_BULK_ROWS", 2)
+    response = client.post("/patients/bulk", json=[patient_row(i) for i in range(3)])
+    assert response.status_code == 413
+
+def test_bulk_create_response_is_built_without_reloading_rows(client, statements):
+    rows = [{"item_name": f"Item {i}", "category": "Supplies", "quantity": i} for i in range(200)]
+    body = client.post("/inventory/bulk", json=rows).json()
+    assert len(body["created"]) == 200 and body["created"][0]["created_at"]
+    assert [s for s in statements if s.lstrip().upper().startswith("SELECT")] == []
+    # SQLite runs one INSERT ... RETURNING per row to keep their order
+    assert len(statements) <= len(rows) + 2
+
+@pytest.mark.parametrize("upsert", [False, True], ids=["create", "upsert"])
+def test_single_creates_are_not_reloaded_after_insert(client, statements, upsert):
+    row = patient_row(1)
+    if upsert:
+        response = client.put(f"/patients/by-phone/{row['phone']}", json=row)
+    else:
+        response = client.post("/patients/", json=row)
+    assert response.json()["created_at"]
+    inserts = [i for i, s in enumerate(statements) if s.lstrip().upper().startswith("INSERT INTO PATIENTS")]
+    assert inserts and not any(s.lstrip().upper().startswith("SELECT") for s in statements[inserts[0]:])
@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlalchemy import text
+from src.crud import appointment_crud
+from src.models import Appointment
+
+def add(db, patient, doctor, when, status="Scheduled"):
+    db.add(Appointment(patient_id=patient.patient_id, doctor_id=doctor.doctor_id, appointment_date=when, status=status))
+
+def calendar(client, doctor, **params):
+    response = client.get(f"/doctors/{doctor.doctor_id}/calendar", params=params)
+    assert response.status_code == 200
+    return [(row["appointment_date"], row["status"]) for row in response.json()]
+
+def test_calendar_is_a_sorted_inclusive_range(client, db, patient, doctor):
+    add(db, patient, doctor, datetime(2030, 3, 5, 14))
+    add(db, patient, doctor, datetime(2030, 3, 4, 9), status="Cancelled")
+    add(db, patient, doctor, datetime(2030, 3, 4, 23, 30))
+    add(db, patient, doctor, datetime(2030, 3, 3, 23, 59))
+    add(db, patient, doctor, datetime(2030, 3, 6, 0, 0))
+    db.commit()
+
+    assert calendar(client, doctor, **{"from": "2030-03-04"}) == [
+        ("2030-03-04T09:00:00", "Cancelled"), ("2030-03-04T23:30:00", "Scheduled")
+    ]
+    assert [when for when, _ in calendar(client, doctor, **{"from": "2030-03-04", "to": "2030-03-05"})] == [
+        "2030-03-04T09:00:00", "2030-03-04T23:30:00", "2030-03-05T14:00:00"
+    ]
+    assert calendar(client, doctor, **{"from": "2030-03-04", "to": "2030-03-05", "status": "Cancelled"}) == [
+        ("2030-03-04T09:00:00", "Cancelled")
+    ]
+
+def test_calendar_rejects_bad_ranges_and_unknown_doctors(client, doctor):
+    url = f"/doctors/{doctor.doctor_id}/calendar"
+    assert client.get(url, params={"from": "2030-03-04", "to": "2030-03-03"}).status_code == 400
+    assert client.get(url, params={"from": "2030-03-01", "to": "2030-04-30"}).status_code == 400
+    assert client.get(url).status_code == 422
+    assert client.get("/doctors/999/calendar", params={"from": "2030-03-04"}).status_code == 404
+
+def test_calendar_query_is_an_index_range_scan(db):
+    query = db.query(Appointment).filter(
+        Appointment.doctor_id == 1,
+        Appointment.appointment_date >= datetime(2030, 3, 4),
+        Appointment.appointment_date < datetime(2030, 3, 11)
+    ).order_by(Appointment.appointment_date, Appointment.appointment_id)
+    sql = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "idx_appointments_doctor_date (doctor_id=? AND appointment_date>? AND appointment_date<?)" in plan
+    assert appointment_crud.get_doctor_calendar(db, 1, datetime(2030, 3, 4), datetime(2030, 3, 11)) == []
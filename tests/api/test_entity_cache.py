@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import event
+
+from src.crud import entity_cache, patient_crud
+from src.crud.cache import EntityCache
+
+pytestmark = pytest.mark.skipif(entity_cache is None, reason="entity cache disabled")
+
+@pytest.fixture
+def selects(engine):
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_repeated_detail_reads_hit_the_cache(client, patient, selects):
+    patient_id = patient.patient_id
+    hits = entity_cache.stats()["hits"]
+    selects.clear()
+    first = client.get(f"/patients/{patient_id}")
+    second = client.get(f"/patients/{patient_id}")
+    assert first.json() == second.json()
+    assert len(selects) == 1
+    assert entity_cache.stats()["hits"] == hits + 1
+
+def test_update_invalidates_cached_row(client, patient):
+    patient_id = patient.patient_id
+    client.get(f"/patients/{patient_id}")
+    client.put(f"/patients/{patient_id}", json={"address": "12 Elm St"})
+    assert client.get(f"/patients/{patient_id}").json()["address"] == "12 Elm St"
+
+def test_delete_invalidates_cached_row(client, doctor):
+    doctor_id = doctor.doctor_id
+    client.get(f"/doctors/{doctor_id}")
+    assert client.delete(f"/doctors/{doctor_id}").status_code == 204
+    assert client.get(f"/doctors/{doctor_id}").status_code == 404
+
+def test_cached_instance_is_usable_in_a_new_session(session_factory, patient):
+    patient_id = patient.patient_id
+    with session_factory() as first:
+        patient_crud.get(first, patient_id)
+    with session_factory() as second:
+        cached = patient_crud.get(second, patient_id)
+        assert cached.first_name == "John"
+        assert cached in second
+
+def test_lru_eviction_and_ttl_expiry():
+    timer = FakeTimer()
+    cache = EntityCache(maxsize=2, ttl=10, timer=timer)
+    cache.set(("patients", 1), {"patient_id": 1})
+    cache.set(("patients", 2), {"patient_id": 2})
+    cache.get(("patients", 1))
+    cache.set(("patients", 3), {"patient_id": 3})
+    assert cache.get(("patients", 2)) is None
+    assert cache.get(("patients", 1)) is not None
+
+    timer.now = 11
+    assert cache.get(("patients", 1)) is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 2
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+def test_cache_stats_endpoint(client):
+    body = client.get("/health/cache").json()
+    assert body["enabled"] is True
+    assert {"hits", "misses", "evictions", "expirations"} <= body.keys()
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from src.crud import table_versions
+from src.models import Inventory, RowChange
+
+DOCTOR = {
+    "first_name": "Michael", "last_name": "Brown", "specialization": "Neurology",
+    "phone": "+1555123457", "email": "michael.brown@hospital.com",
+    "license_number": "MED789012", "hire_date": "2018-08-20"
+}
+ITEM = {"item_name": "Gauze", "category": "Supplies", "quantity": 10}
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+def test_unchanged_list_is_not_modified_after_one_version_lookup(client, doctor, statements):
+    first = client.get("/doctors/")
+    etag = first.headers["ETag"]
+    statements.clear()
+    second = client.get("/doctors/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert len(statements) == 1
+    assert "row_changes" in statements[0]
+
+def test_writes_change_the_etag(client, doctor):
+    etag = client.get("/doctors/specializations/").headers["ETag"]
+    client.post("/doctors/", json=DOCTOR)
+    response = client.get("/doctors/specializations/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == ["Cardiology", "Neurology"]
+    assert response.headers["ETag"] != etag
+
+def test_bulk_inserts_change_the_etag(client):
+    etag = client.get("/inventory/").headers["ETag"]
+    assert client.post("/inventory/bulk", json=[ITEM, ITEM]).status_code == 201
+    response = client.get("/inventory/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+def test_writes_to_other_tables_keep_the_etag(client, patient):
+    etag = client.get("/inventory/").headers["ETag"]
+    client.put(f"/patients/{patient.patient_id}", json={"address": "12 Elm St"})
+    assert client.get("/inventory/", headers={"If-None-Match": etag}).status_code == 304
+
+def test_rolled_back_writes_keep_the_etag(client, db):
+    etag = client.get("/inventory/").headers["ETag"]
+    db.add(Inventory(**ITEM))
+    db.flush()
+    db.rollback()
+    assert client.get("/inventory/", headers={"If-None-Match": etag}).status_code == 304
+
+def test_writes_outside_the_api_change_the_etag(client, db, doctor):
+    # Another worker or a script writing straight to the database
+    etag = client.get("/doctors/").headers["ETag"]
+    db.execute(text("UPDATE doctors SET phone = '+1555000000' WHERE doctor_id = :id"), {"id": doctor.doctor_id})
+    db.commit()
+    response = client.get("/doctors/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["phone"] == "+1555000000"
+
+    etag = response.headers["ETag"]
+    db.execute(text("DELETE FROM doctors"))
+    db.commit()
+    assert client.get("/doctors/", headers={"If-None-Match": etag}).status_code == 200
+
+def test_pruning_keeps_each_tables_last_change(db, doctor):
+    db.add_all([Inventory(**ITEM), Inventory(**ITEM)])
+    db.commit()
+    assert db.query(RowChange).count() == 3
+    assert table_versions.prune(db, timedelta(seconds=-1)) == 1
+    assert table_versions.version(db, "doctors", "inventory")[::2] == (1, 1)
+
+@pytest.mark.parametrize("header", ["*", 'W/"{}"', '"other", "{}"'])
+def test_if_none_match_forms(client, header):
+    etag = client.get("/inventory/").headers["ETag"]
+    value = header.format(etag.strip('"'))
+    assert client.get("/inventory/", headers={"If-None-Match": value}).status_code == 304
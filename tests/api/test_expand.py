@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.models import Appointment, Billing
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def appointments(db, patient, doctor):
+    start = datetime(2030, 1, 1, 9)
+    for i in range(40):
+        appointment = Appointment(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+            appointment_date=start + timedelta(hours=i)
+        )
+        appointment.bills = [
+            Billing(patient_id=patient.patient_id, service_date=date(2030, 1, 1), amount=50 + j)
+            for j in range(2)
+        ]
+        db.add(appointment)
+    db.commit()
+
+def test_expand_embeds_relationships(client, appointments):
+    page = client.get("/appointments/", params={"expand": "patient,doctor,bills", "limit": 5}).json()
+    assert len(page) == 5
+    assert page[0]["patient"]["last_name"] == "Doe"
+    assert page[0]["doctor"]["specialization"] == "Cardiology"
+    assert len(page[0]["bills"]) == 2
+
+def test_unexpanded_relationships_are_omitted(client, appointments):
+    page = client.get("/appointments/", params={"limit": 5}).json()
+    assert "patient" not in page[0] and "bills" not in page[0]
+
+@pytest.mark.parametrize("limit", [5, 40])
+def test_statement_count_is_independent_of_page_size(client, appointments, statements, limit):
+    client.get("/appointments/", params={"expand": "patient,doctor,bills", "limit": limit})
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    # one joined query for the page plus one SELECT ... IN for bills
+    assert len(selects) == 2
+
+def test_expand_on_detail_endpoint(client, patient, appointments, statements):
+    patient_id = patient.patient_id
+    statements.clear()
+    body = client.get(f"/patients/{patient_id}", params={"expand": "appointments,bills"}).json()
+    assert len(body["appointments"]) == 40
+    assert len(body["bills"]) == 80
+    assert "prescriptions" not in body
+    assert len(statements) == 3
+
+def test_unknown_expand_is_rejected(client):
+    response = client.get("/appointments/", params={"expand": "insurer"})
+    assert response.status_code == 400
+    assert "insurer" in response.json()["detail"]
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.crud import billing_crud
+from src.models import Appointment, Billing
+
+@pytest.fixture
+def appointments(db, patient, doctor):
+    start = datetime(2030, 1, 1, 9)
+    for i in range(5):
+        appointment = Appointment(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+            appointment_date=start + timedelta(days=i)
+        )
+        appointment.bills = [
+            Billing(patient_id=patient.patient_id, service_date=date(2030, 1, 1 + i), amount=50 + i)
+        ]
+        db.add(appointment)
+    db.commit()
+
+def test_ndjson_export_streams_every_row(client, appointments):
+    response = client.get("/appointments/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["appointment_id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["appointment_date"] == "2030-01-01T09:00:00"
+
+def test_date_range_is_inclusive(client, appointments):
+    response = client.get("/appointments/export", params={"date_from": "2030-01-02", "date_to": "2030-01-04"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["appointment_date"][:10] for row in rows] == ["2030-01-02", "2030-01-03", "2030-01-04"]
+
+def test_csv_export(client, appointments):
+    response = client.get("/billing/export", params={"format": "csv", "date_to": "2030-01-02"})
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="billing.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["amount"] for row in rows] == ["50.00", "51.00"]
+
+def test_ndjson_amounts_match_the_json_api(client, appointments):
+    response = client.get("/billing/export", params={"date_to": "2030-01-02"})
+    exported = [json.loads(line)["amount"] for line in response.text.splitlines()]
+    assert exported == [50.0, 51.0]
+    assert exported == [bill["amount"] for bill in client.get("/billing/", params={"limit": 2}).json()]
+
+def test_empty_csv_export_has_header(client):
+    response = client.get("/inventory/export", params={"format": "csv"})
+    assert response.text.splitlines() == [
+        "item_id,item_name,category,quantity,unit_price,expiration_date,supplier,created_at"
+    ]
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/patients/export", params={"format": "xml"}).status_code == 422
+
+def test_export_is_fetched_in_batches(db, appointments, monkeypatch):
+    monkeypatch.setattr("src.crud.base.EXPORT_BATCH_SIZE", 2)
+    batches = list(billing_crud.export_batches(db))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
@@ -0,0 +1,49 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from src.models import Appointment, Billing, Inventory, MedicalRecord, Prescription
+
+LIST_ROUTES = [
+    "/patients/", "/doctors/?active_only=false", "/appointments/", "/medical-records/",
+    "/prescriptions/", "/billing/", "/inventory/"
+]
+
+@pytest.fixture
+def rows(db, patient, doctor):
+    appointment = Appointment(
+        patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+        appointment_date=datetime(2030, 1, 1, 9, 30, 15, 250000), reason="Checkup"
+    )
+    appointment.bills = [Billing(patient_id=patient.patient_id, service_date=date(2030, 1, 1), amount=Decimal("150.50"))]
+    db.add_all([
+        appointment,
+        MedicalRecord(patient_id=patient.patient_id, doctor_id=doctor.doctor_id, visit_date=date(2030, 1, 1)),
+        Prescription(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+            medication_name="Lisinopril", start_date=date(2030, 1, 1)
+        ),
+        Inventory(item_name="Gauze", quantity=10, unit_price=Decimal("2.25")),
+        Inventory(item_name="Tape", quantity=5)
+    ])
+    db.commit()
+
+@pytest.mark.parametrize("url", LIST_ROUTES)
+def test_fast_path_matches_response_models(client, rows, url, monkeypatch):
+    validated = client.get(url, params={"limit": 1})
+    monkeypatch.setattr("src.api.serialize.FAST_SERIALIZATION", True)
+    fast = client.get(url, params={"limit": 1})
+    assert fast.status_code == 200
+    assert fast.json() == validated.json() != []
+    assert fast.headers.get("X-Next-Cursor") == validated.headers.get("X-Next-Cursor")
+
+def test_fast_path_keeps_etag(client, rows, monkeypatch):
+    monkeypatch.setattr("src.api.serialize.FAST_SERIALIZATION", True)
+    etag = client.get("/inventory/").headers["ETag"]
+    assert client.get("/inventory/", headers={"If-None-Match": etag}).status_code == 304
+
+def test_expanded_pages_use_response_models(client, rows, monkeypatch):
+    monkeypatch.setattr("src.api.serialize.FAST_SERIALIZATION", True)
+    page = client.get("/appointments/", params={"expand": "bills"}).json()
+    assert page[0]["bills"][0]["amount"] == 150.5
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from src.models import Doctor, Patient
+
+NAMES = [("John", "Doe"), ("Jane", "Smith"), ("Johnny", "Dough"), ("Maria", "Garcia"), ("Jon", "Snow")]
+
+@pytest.fixture
+def patients(db):
+    for i, (first, last) in enumerate(NAMES):
+        db.add(Patient(first_name=first, last_name=last, date_of_birth=date(1980, 1, 1), phone=f"+1555000{i:04d}"))
+    db.commit()
+
+def names(response):
+    return [f"{row['first_name']} {row['last_name']}" for row in response.json()]
+
+def test_full_name_query_ranks_exact_match_first(client, patients):
+    response = client.get("/patients/", params={"search": "John Doe"})
+    assert names(response)[0] == "John Doe"
+    assert "Jane Smith" not in names(response)
+    assert "X-Next-Cursor" not in response.headers
+
+def test_typos_still_match(client, patients):
+    assert names(client.get("/patients/", params={"search": "Garcai"}))[0] == "Maria Garcia"
+    assert names(client.get("/patients/", params={"search": "Smiht"})) == ["Jane Smith"]
+
+def test_short_queries_match_substrings(client, patients):
+    assert names(client.get("/patients/", params={"search": "Sn"})) == ["Jon Snow"]
+
+def test_like_wildcards_are_literal(client, patients):
+    assert client.get("/patients/", params={"search": "%"}).json() == []
+
+def test_search_is_paged_with_skip(client, patients):
+    everyone = names(client.get("/patients/", params={"search": "John Doe"}))
+    page = names(client.get("/patients/", params={"search": "John Doe", "skip": 1, "limit": 1}))
+    assert page == everyone[1:2]
+    response = client.get("/patients/", params={"search": "John", "cursor": "MQ"})
+    assert response.status_code == 400
+
+def test_index_follows_renames_and_deletes(client, patients, db):
+    patient = db.query(Patient).filter(Patient.last_name == "Garcia").one()
+    patient.last_name = "Lopez"
+    db.commit()
+    assert names(client.get("/patients/", params={"search": "Lopez"})) == ["Maria Lopez"]
+    assert client.get("/patients/", params={"search": "Garcia"}).json() == []
+
+    db.delete(patient)
+    db.commit()
+    assert client.get("/patients/", params={"search": "Lopez"}).json() == []
+
+def test_doctor_search_respects_active_only(client, db, doctor):
+    db.add(Doctor(
+        first_name="Sarah", last_name="Wilsen", specialization="Neurology", phone="+1555999",
+        email="s.wilsen@hospital.com", license_number="MED999", hire_date=date(2010, 1, 1), is_active=False
+    ))
+    db.commit()
+    assert client.get("/doctors/", params={"search": "Wilsen"}).json() == []
+    response = client.get("/doctors/", params={"search": "Wilsen", "active_only": False})
+    assert [row["last_name"] for row in response.json()] == ["Wilsen"]
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta
+
+from src.api.pagination import NEXT_CURSOR_HEADER
+from src.crud import appointment_crud
+from src.models import Patient, Appointment
+
+def add_patients(db, count):
+    for i in range(count):
+        db.add(Patient(
+            first_name=f"First{i}", last_name="Smith", date_of_birth=date(1980, 1, 1),
+            gender="Female" if i % 2 else "Male", phone=f"+1555000{i:04d}"
+        ))
+    db.commit()
+
+def walk_pages(client, path, limit, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(path, params=query)
+        assert response.status_code == 200
+        seen.extend(row["patient_id"] for row in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return seen
+
+def test_cursor_walks_every_row_once_in_key_order(client, db):
+    add_patients(db, 25)
+    ids = walk_pages(client, "/patients/", limit=10)
+    assert ids == sorted(ids)
+    assert len(ids) == len(set(ids)) == 25
+
+def test_cursor_applies_to_filtered_helpers(client, db):
+    add_patients(db, 25)
+    ids = walk_pages(client, "/patients/", limit=4, gender="Female")
+    assert len(ids) == 12
+
+def test_skip_limit_still_supported(client, db):
+    add_patients(db, 5)
+    page = client.get("/patients/", params={"skip": 3, "limit": 10}).json()
+    assert [p["first_name"] for p in page] == ["First3", "First4"]
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/patients/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_keyset_on_sort_column_with_ties(db, patient, doctor):
+    start = datetime(2030, 1, 1, 9)
+    for i in range(7):
+        db.add(Appointment(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+            appointment_date=start + timedelta(hours=i // 2)
+        ))
+    db.commit()
+
+    order_by = Appointment.appointment_date
+    query = db.query(Appointment)
+    first = appointment_crud.paginate(query, limit=3, order_by=order_by)
+    cursor = appointment_crud.next_cursor(first, 3, order_by=order_by)
+    rest = appointment_crud.paginate(query, limit=10, cursor=cursor, order_by=order_by)
+
+    keys = [(a.appointment_date, a.appointment_id) for a in first + rest]
+    assert keys == sorted(keys)
+    assert len(keys) == 7
+
+def test_upcoming_route_walks_pages_across_equal_times(client, db, patient, doctor):
+    start = datetime.now().replace(microsecond=0) + timedelta(days=30)
+    # Inserted latest first, so time order and ID order disagree
+    for i in reversed(range(7)):
+        db.add(Appointment(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+            appointment_date=start + timedelta(hours=i // 2), status="Scheduled"
+        ))
+    db.commit()
+
+    keys, cursor = [], None
+    while True:
+        params = {"upcoming": True, "limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/appointments/", params=params)
+        assert response.status_code == 200
+        keys.extend((row["appointment_date"], row["appointment_id"]) for row in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 7
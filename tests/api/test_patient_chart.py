@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+
+from src.models import Appointment, Billing, MedicalRecord, Prescription
+
+def test_chart_sections_are_filtered_sorted_and_limited(client, db, patient, doctor):
+    patient_id, doctor_id = patient.patient_id, doctor.doctor_id
+    for i in range(15):
+        db.add(Appointment(patient_id=patient_id, doctor_id=doctor_id,
+                           appointment_date=datetime(2030, 1, 1) + timedelta(days=i)))
+        db.add(MedicalRecord(patient_id=patient_id, doctor_id=doctor_id,
+                             visit_date=date(2024, 1, 1) + timedelta(days=i)))
+    db.add(Prescription(patient_id=patient_id, doctor_id=doctor_id, medication_name="Metformin",
+                        start_date=date(2024, 1, 1)))
+    db.add(Prescription(patient_id=patient_id, doctor_id=doctor_id, medication_name="Expired",
+                        start_date=date(2020, 1, 1), end_date=date(2020, 2, 1)))
+    db.commit()
+    appointment_id = db.query(Appointment.appointment_id).first()[0]
+    db.add(Billing(patient_id=patient_id, appointment_id=appointment_id, service_date=date(2024, 1, 1),
+                   amount=80, status="Pending"))
+    db.add(Billing(patient_id=patient_id, appointment_id=appointment_id, service_date=date(2024, 1, 2),
+                   amount=90, status="Paid"))
+    db.commit()
+
+    chart = client.get(f"/patients/{patient_id}/chart", params={"appointments_limit": 3}).json()
+
+    assert chart["patient"]["phone"] == "+1234567890"
+    assert [a["appointment_date"][:10] for a in chart["appointments"]] == [
+        "2030-01-15", "2030-01-14", "2030-01-13"
+    ]
+    assert len(chart["medical_records"]) == 10
+    assert [p["medication_name"] for p in chart["active_prescriptions"]] == ["Metformin"]
+    assert [b["status"] for b in chart["outstanding_bills"]] == ["Pending"]
+
+def test_chart_uses_a_fixed_number_of_queries(client, engine, patient):
+    patient_id = patient.patient_id
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        client.get(f"/patients/{patient_id}/chart")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 5
+
+def test_chart_for_unknown_patient(client):
+    assert client.get("/patients/999/chart").status_code == 404
+
+def test_patient_appointments_are_serialized(client, db, patient, doctor):
+    db.add(Appointment(patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+                       appointment_date=datetime(2030, 1, 1)))
+    db.commit()
+    response = client.get(f"/patients/{patient.patient_id}/appointments")
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == "Scheduled"
+
+def test_doctor_appointments_are_serialized(client, db, patient, doctor):
+    db.add(Appointment(patient_id=patient.patient_id, doctor_id=doctor.doctor_id,
+                       appointment_date=datetime(2030, 1, 1)))
+    db.commit()
+    response = client.get(f"/doctors/{doctor.doctor_id}/appointments")
+    assert response.status_code == 200
+    assert [a["patient_id"] for a in response.json()] == [patient.patient_id]
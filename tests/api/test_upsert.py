@@ -0,0 +1,65 @@
+from src.crud import patient_autocomplete, patient_crud
+from src.models import Patient, Doctor
+
+PATIENT = {
+    "first_name": "Alice", "last_name": "Johnson", "date_of_birth": "1990-05-15",
+    "phone": "+1555123456", "email": "alice.johnson@example.com"
+}
+DOCTOR = {
+    "first_name": "Michael", "last_name": "Brown", "specialization": "Neurology",
+    "phone": "+1555123457", "email": "michael.brown@hospital.com",
+    "license_number": "MED789012", "hire_date": "2018-08-20"
+}
+
+def test_create_patient_conflicts_keep_existing_messages(client, patient):
+    response = client.post("/patients/", json=dict(PATIENT, phone=patient.phone))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Patient with this phone number already exists"
+
+    response = client.post("/patients/", json=dict(PATIENT, email=patient.email))
+    assert response.json()["detail"] == "Patient with this email already exists"
+
+    assert client.post("/patients/", json=PATIENT).status_code == 201
+
+def test_create_doctor_conflicts_keep_existing_messages(client, doctor):
+    response = client.post("/doctors/", json=dict(DOCTOR, license_number=doctor.license_number))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Doctor with this license number already exists"
+
+def test_upsert_patient_by_phone_is_idempotent(client, db):
+    url = f"/patients/by-phone/{PATIENT['phone']}"
+    first = client.put(url, json=PATIENT)
+    assert first.status_code == 200
+    second = client.put(url, json=dict(PATIENT, address="9 Oak Ave"))
+    assert second.json()["patient_id"] == first.json()["patient_id"]
+    assert second.json()["address"] == "9 Oak Ave"
+    assert db.query(Patient).count() == 1
+
+def test_upsert_reports_conflicts_on_other_unique_fields(client, patient):
+    url = f"/patients/by-phone/{PATIENT['phone']}"
+    response = client.put(url, json=dict(PATIENT, email=patient.email))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Patient with this email already exists"
+
+    assert client.put("/patients/by-phone/+1000", json=PATIENT).status_code == 400
+
+def test_upsert_doctor_by_license(client, db):
+    url = f"/doctors/by-license/{DOCTOR['license_number']}"
+    client.put(url, json=DOCTOR)
+    response = client.put(url, json=dict(DOCTOR, specialization="Cardiology"))
+    assert response.json()["specialization"] == "Cardiology"
+    assert db.query(Doctor).count() == 1
+
+def test_upserts_keep_the_index_current_without_a_rebuild(client, db, patient):
+    patient_crud.build_index(db)
+    built_at = patient_autocomplete.built_at
+    url = f"/patients/by-phone/{PATIENT['phone']}"
+    created = client.put(url, json=PATIENT).json()
+    suggestions = client.get("/patients/autocomplete", params={"q": "alice"}).json()
+    assert [row["id"] for row in suggestions] == [created["patient_id"]]
+
+    client.put(url, json=dict(PATIENT, last_name="Cooper"))
+    assert not patient_crud.refresh_index(db)
+    assert patient_autocomplete.built_at == built_at
+    suggestions = client.get("/patients/autocomplete", params={"q": "alice"}).json()
+    assert [row["name"] for row in suggestions] == ["Alice Cooper"]
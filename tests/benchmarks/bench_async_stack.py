@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Sync vs async API stack benchmark
+
+Starts the API twice under uvicorn (USE_ASYNC_DB=false, then true) against
+DATABASE_URL and drives read endpoints at 50/200/1000 concurrent clients,
+reporting requests/sec and p99 latency for each stack.
+
+Usage:
+    python tests/benchmarks/bench_async_stack.py [--requests 5000] [--port 8100]
+
+Requires a populated database (python generate_mock_data.py).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONCURRENCY_LEVELS = [50, 200, 1000]
+PATHS = ["/patients/1", "/doctors/1", "/patients/?limit=20", "/appointments/?limit=20"]
+
+def start_server(use_async, port):
+    env = dict(os.environ, USE_ASYNC_DB="true" if use_async else "false", SQL_ECHO="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not start")
+
+async def run_load(base_url, concurrency, total_requests):
+    latencies = []
+    errors = 0
+    counter = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    print(f"{'stack':<6} {'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for use_async in (False, True):
+        process = start_server(use_async, args.port)
+        try:
+            for concurrency in CONCURRENCY_LEVELS:
+                stats = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", concurrency, args.requests))
+                print(
+                    f"{'async' if use_async else 'sync':<6} {concurrency:>8} {stats['rps']:>10.1f} "
+                    f"{stats['p50_ms']:>10.1f} {stats['p99_ms']:>10.1f} {stats['errors']:>8}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Autocomplete benchmark
+
+Builds an AutocompleteIndex over synthetic patients and reports build time,
+index size and per-lookup latency for name, phone-suffix and ID queries,
+plus the cost of indexing a write.
+
+Usage:
+    python tests/benchmarks/bench_autocomplete.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.crud.autocomplete import AutocompleteIndex
+
+FIRST_NAMES = ["John", "Jane", "Michael", "Sarah", "David", "Emily", "Robert", "Maria", "James", "Linda"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Wilson"]
+QUERIES = ["mar", "garcia m", "wilson2", "emilyc", "4821", "12345"]
+
+def rows(count):
+    rng = random.Random(count)
+    for i in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES) + rng.choice("abcdefghij")
+        last = rng.choice(LAST_NAMES) + str(rng.randrange(10000))
+        yield i, first, last, f"+1{rng.randrange(10 ** 10):010d}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    index = AutocompleteIndex()
+    started = time.perf_counter()
+    index.build(rows(args.rows))
+    build = time.perf_counter() - started
+    stats = index.stats()
+    print(f"built {args.rows} rows / {stats['entries']} entries in {build:.1f}s, "
+          f"{stats['bytes'] / 2 ** 20:.0f} MiB ({stats['bytes'] / args.rows:.0f} bytes/row)")
+
+    print(f"{'query':<12} {'us/lookup':>10} {'results':>8}")
+    for query in QUERIES:
+        started = time.perf_counter()
+        for _ in range(args.lookups // len(QUERIES)):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - started) / (args.lookups // len(QUERIES))
+        print(f"{query:<12} {elapsed * 1e6:>10.1f} {len(results):>8}")
+
+    started = time.perf_counter()
+    for id in range(1, 1001):
+        index.put((id, "Renamed", f"Patient{id}", "+15550000000"))
+    print(f"put: {(time.perf_counter() - started) / 1000 * 1e6:.1f} µs/write (1000 writes)")
+
+if __name__ == "__main__":
+    main()
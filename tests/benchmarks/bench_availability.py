@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Availability benchmark
+
+Builds a ScheduleIndex over synthetic bookings for many doctors across a
+90-day horizon and reports build time and per-query latency for one doctor
+and for a specialization-sized group of doctors, at light and heavy load.
+
+Usage:
+    python tests/benchmarks/bench_availability.py [--doctors 500] [--booked 0.9]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.crud.schedule import ScheduleIndex
+
+HORIZON_DAYS = 90
+
+def bookings(index, doctors, booked, start):
+    """Book about `booked` of every working-hour slot, at random"""
+    rng = random.Random(doctors)
+    slots = list(index._slots(index_minute(start), index_minute(start + timedelta(days=HORIZON_DAYS))))
+    id = 0
+    for doctor_id in range(1, doctors + 1):
+        for minute in rng.sample(slots, int(len(slots) * booked)):
+            id += 1
+            yield id, doctor_id, datetime(1970, 1, 1) + timedelta(minutes=minute), "Scheduled"
+
+def index_minute(value):
+    return int((value - datetime(1970, 1, 1)).total_seconds() // 60)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--booked", type=float, default=0.9)
+    parser.add_argument("--group", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    end = start + timedelta(days=HORIZON_DAYS)
+    index = ScheduleIndex()
+    started = time.perf_counter()
+    index.build(bookings(index, args.doctors, args.booked, start))
+    print(f"build: {time.perf_counter() - started:.2f} s, {index.stats()}")
+
+    group = list(range(1, args.group + 1))
+    print(f"{'query':<24} {'ms/query':>10}")
+    for label, doctor_ids, limit in (
+        ("one doctor, 10 slots", [1], 10),
+        (f"{args.group} doctors, 10 slots", group, 10),
+        (f"{args.group} doctors, 100 slots", group, 100),
+        (f"all {args.doctors}, 10 slots", range(1, args.doctors + 1), 10)
+    ):
+        started = time.perf_counter()
+        for _ in range(args.queries):
+            index.free_slots(doctor_ids, start, end, limit)
+        print(f"{label:<24} {(time.perf_counter() - started) / args.queries * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Bulk create benchmark
+
+Compares inserting patients one at a time through CRUDBase.create (add +
+commit + refresh per row) with CRUDBase.create_many (multi-row INSERT ...
+RETURNING in one transaction).
+
+Usage:
+    python tests/benchmarks/bench_bulk_create.py [--rows 10000] [--url URL]
+
+--url should point at a scratch database; it defaults to a temporary SQLite
+file. Tables are created if missing and the benchmark rows are removed after.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.config import Base
+from src.crud import patient_crud
+from src.models import Patient
+from src.schemas.patient import PatientCreate
+
+def make_patients(count, prefix):
+    return [
+        PatientCreate(
+            first_name=f"Bench{i}", last_name="Patient", date_of_birth=date(1980, 1, 1),
+            phone=f"+{prefix}{i:08d}"
+        )
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--url", default=f"sqlite:///{tempfile.mkdtemp()}/bench_bulk.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    try:
+        started = time.perf_counter()
+        for obj in make_patients(args.rows, "91"):
+            patient_crud.create(db, obj_in=obj)
+        per_row = time.perf_counter() - started
+
+        started = time.perf_counter()
+        created, failures = patient_crud.create_many(db, objs_in=make_patients(args.rows, "92"))
+        bulk = time.perf_counter() - started
+        assert len(created) == args.rows and not failures
+
+        print(f"{'path':<12} {'rows':>8} {'seconds':>10} {'rows/s':>12}")
+        print(f"{'per-row':<12} {args.rows:>8} {per_row:>10.2f} {args.rows / per_row:>12.0f}")
+        print(f"{'create_many':<12} {args.rows:>8} {bulk:>10.2f} {args.rows / bulk:>12.0f}")
+        print(f"speedup: {per_row / bulk:.1f}x")
+    finally:
+        db.rollback()
+        db.query(Patient).filter(Patient.first_name.like("Bench%")).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    main()
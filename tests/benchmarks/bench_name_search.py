@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Name search benchmark
+
+Times patient name searches with the old unindexed
+first_name/last_name ILIKE '%name%' filter against the indexed ranked
+search (pg_trgm on PostgreSQL, FTS5 trigrams on SQLite) at several table
+sizes.
+
+Usage:
+    python tests/benchmarks/bench_name_search.py [--sizes 100000,1000000] [--url URL]
+
+--url should point at an empty scratch database (its patients table is
+emptied between sizes); it defaults to a fresh temporary SQLite file per
+size.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from database.config import Base
+from src.crud import patient_crud
+from src.models import Patient
+
+FIRST_NAMES = ["John", "Jane", "Michael", "Sarah", "David", "Emily", "Robert", "Maria", "James", "Linda"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Wilson"]
+QUERIES = ["Maria Garcia", "Wilsno", "Rodrigez", "Emily"]
+
+def random_name(rng):
+    # Suffixes make most names unique, like a real patient table
+    return rng.choice(FIRST_NAMES) + rng.choice("abcdefghij"), rng.choice(LAST_NAMES) + str(rng.randrange(10000))
+
+def fill(engine, size, batch=50000):
+    rng = random.Random(size)
+    with engine.begin() as conn:
+        conn.execute(delete(Patient))
+        for start in range(0, size, batch):
+            rows = []
+            for i in range(start, min(start + batch, size)):
+                first_name, last_name = random_name(rng)
+                rows.append({
+                    "first_name": first_name, "last_name": last_name,
+                    "date_of_birth": date(1980, 1, 1), "phone": f"+{i:012d}"
+                })
+            conn.execute(insert(Patient), rows)
+
+def ilike_search(db, name, limit=20):
+    return (
+        db.query(Patient)
+        .filter(Patient.first_name.ilike(f"%{name}%") | Patient.last_name.ilike(f"%{name}%"))
+        .order_by(Patient.patient_id)
+        .limit(limit)
+        .all()
+    )
+
+def indexed_search(db, name, limit=20):
+    return patient_crud.search_by_name(db, name=name, limit=limit)
+
+def milliseconds_per_query(db, search, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name in QUERIES:
+            search(db, name)
+    return (time.perf_counter() - started) / (repeat * len(QUERIES)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    print(f"{'patients':>10} {'ilike ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for size in map(int, args.sizes.split(",")):
+        engine = create_engine(args.url or f"sqlite:///{tempfile.mkdtemp()}/bench_search.db")
+        Base.metadata.create_all(bind=engine)
+        fill(engine, size)
+        db = sessionmaker(bind=engine)()
+        try:
+            ilike = milliseconds_per_query(db, ilike_search)
+            indexed = milliseconds_per_query(db, indexed_search)
+            print(f"{size:>10} {ilike:>10.1f} {indexed:>11.1f} {ilike / indexed:>7.1f}x")
+        finally:
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Vectorized analytics benchmark
+
+Builds synthetic frames with --rows billing and appointment rows (and
+proportionate patients, records and prescriptions) and reports the time of
+each vectorized HealthcareSQLQueries analysis, best of --repeat runs.
+
+Usage:
+    python tests/benchmarks/bench_olap.py [--rows 1000000]
+    python tests/benchmarks/bench_olap.py --rows 10000000 --repeat 1
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.analytics.olap import ANALYSES
+
+FIRST_NAMES = np.array(["John", "Jane", "Michael", "Sarah", "David", "Emily", "Robert", "Maria", "James", "Linda"], dtype=object)
+LAST_NAMES = np.array(["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Wilson"], dtype=object)
+SPECIALIZATIONS = np.array(["Cardiology", "Neurology", "Pediatrics", "Orthopedics", "Dermatology"], dtype=object)
+APPOINTMENT_STATUSES = np.array(["Scheduled", "Completed", "Cancelled", "No-Show"], dtype=object)
+BILL_STATUSES = np.array(["Paid", "Pending", "Overdue"], dtype=object)
+MEDICATIONS = np.array(["Lisinopril", "Metformin", "Atorvastatin", "Amoxicillin", "Ibuprofen", "Omeprazole"], dtype=object)
+
+def timestamps(rng, today, count, days_back, days_ahead=0):
+    start = np.datetime64(today, "s") - np.timedelta64(days_back, "D")
+    seconds = rng.integers(0, (days_back + days_ahead) * 86400, count)
+    return (start + seconds.astype("timedelta64[s]")).astype("datetime64[us]")
+
+def frames(rows, today):
+    rng = np.random.default_rng(rows)
+    patients, doctors, records = max(rows // 20, 1), max(rows // 2000, 1), max(rows // 4, 1)
+    patient_ids = np.arange(1, patients + 1)
+    doctor_ids = np.arange(1, doctors + 1)
+    appointment_ids = np.arange(1, rows + 1)
+    appointment_dates = timestamps(rng, today, rows, 730, 60)
+    return {
+        "patients": pd.DataFrame({
+            "patient_id": patient_ids,
+            "first_name": rng.choice(FIRST_NAMES, patients),
+            "last_name": rng.choice(LAST_NAMES, patients),
+            "date_of_birth": timestamps(rng, today, patients, 90 * 365).astype("datetime64[D]").astype("datetime64[s]"),
+            "gender": rng.choice(np.array(["Male", "Female"], dtype=object), patients),
+            "phone": pd.Series(patient_ids).map("+1{:010d}".format).to_numpy(dtype=object),
+            "email": pd.Series(patient_ids).map("patient{}@email.com".format).to_numpy(dtype=object),
+        }),
+        "doctors": pd.DataFrame({
+            "doctor_id": doctor_ids,
+            "first_name": rng.choice(FIRST_NAMES, doctors),
+            "last_name": rng.choice(LAST_NAMES, doctors) + pd.Series(doctor_ids).astype(str).to_numpy(dtype=object),
+            "specialization": rng.choice(SPECIALIZATIONS, doctors),
+            "is_active": rng.random(doctors) < 0.9,
+        }),
+        "appointments": pd.DataFrame({
+            "appointment_id": appointment_ids,
+            "patient_id": rng.choice(patient_ids, rows),
+            "doctor_id": rng.choice(doctor_ids, rows),
+            "appointment_date": appointment_dates,
+            "status": rng.choice(APPOINTMENT_STATUSES, rows),
+            "reason": rng.choice(np.array(["Checkup", "Follow-up", "Consultation"], dtype=object), rows),
+            "created_at": appointment_dates - rng.integers(1, 60 * 86400, rows).astype("timedelta64[s]"),
+        }),
+        "medical_records": pd.DataFrame({
+            "record_id": np.arange(1, records + 1),
+            "patient_id": rng.choice(patient_ids, records),
+            "doctor_id": rng.choice(doctor_ids, records),
+            "visit_date": timestamps(rng, today, records, 730).astype("datetime64[D]").astype("datetime64[s]"),
+            "diagnosis": rng.choice(np.array(["Hypertension", "Diabetes", "Flu", "Migraine"], dtype=object), records),
+            "treatment": rng.choice(np.array(["Medication", "Rest", "Therapy"], dtype=object), records),
+        }),
+        "prescriptions": pd.DataFrame({
+            "prescription_id": np.arange(1, records + 1),
+            "patient_id": rng.choice(patient_ids, records),
+            "doctor_id": rng.choice(doctor_ids, records),
+            "medication_name": rng.choice(MEDICATIONS, records),
+            "dosage": rng.choice(np.array(["10mg", "20mg", "500mg"], dtype=object), records),
+            "frequency": rng.choice(np.array(["Daily", "Twice daily"], dtype=object), records),
+            "start_date": timestamps(rng, today, records, 730).astype("datetime64[D]").astype("datetime64[s]"),
+        }),
+        "billing": pd.DataFrame({
+            "bill_id": np.arange(1, rows + 1),
+            "patient_id": rng.choice(patient_ids, rows),
+            "appointment_id": rng.choice(appointment_ids, rows),
+            "amount": rng.integers(2000, 50000, rows) / 100,
+            "status": rng.choice(BILL_STATUSES, rows),
+            "insurance_info": rng.choice(np.array(["Aetna", "Cigna", None], dtype=object), rows),
+            "created_at": timestamps(rng, today, rows, 730),
+        }),
+        "inventory": pd.DataFrame({
+            "item_id": np.arange(1, 51),
+            "item_name": np.concatenate([MEDICATIONS, [f"Supply {i}" for i in range(44)]]).astype(object),
+            "category": np.where(np.arange(50) < len(MEDICATIONS), "Medication", "Supplies").astype(object),
+            "quantity": rng.integers(0, 200, 50),
+            "unit_price": rng.integers(10, 5000, 50) / 100,
+        }),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="billing and appointment rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    today = date.today()
+    started = time.perf_counter()
+    data = frames(args.rows, today)
+    print(f"Generated {args.rows:,} billing/appointment rows in {time.perf_counter() - started:.1f}s")
+
+    total = 0.0
+    for number, analysis in ANALYSES.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = analysis(data, today)
+            best = min(best, time.perf_counter() - started)
+        total += best
+        print(f"{number:>2}. {analysis.__name__:<28} {best * 1000:>9.1f} ms  ({len(result)} rows)")
+    print(f"All analyses: {total:.2f}s")
+
+if __name__ == "__main__":
+    main()
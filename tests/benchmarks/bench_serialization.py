@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark
+
+Measures the per-row cost of turning a page of ORM rows into a JSON body for
+every list response schema: the response model path FastAPI takes by default
+(validate each row from attributes, dump to JSON-compatible data, encode)
+against the RowEncoder used when FAST_SERIALIZATION is on.
+
+Usage:
+    python tests/benchmarks/bench_serialization.py [--rows 1000] [--repeat 20]
+
+Rows are built in memory, so no database is needed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pydantic import TypeAdapter
+
+from src.api.serialize import encoder_for
+from src.models import Appointment, Billing, Doctor, Inventory, MedicalRecord, Patient, Prescription
+from src.schemas import appointment, billing, doctor, inventory, medical_record, patient, prescription
+
+CREATED = datetime(2024, 1, 1, 12, 0, 0, 123456)
+
+ROWS = {
+    patient.Patient: lambda i: Patient(
+        patient_id=i, first_name="John", last_name="Doe", date_of_birth=date(1985, 3, 15), gender="Male",
+        phone=f"+1{i:010d}", email=f"patient{i}@example.com", address="123 Main St",
+        emergency_contact="Jane Doe", created_at=CREATED
+    ),
+    doctor.Doctor: lambda i: Doctor(
+        doctor_id=i, first_name="Sarah", last_name="Wilson", specialization="Cardiology",
+        phone=f"+1{i:010d}", email=f"doctor{i}@hospital.com", license_number=f"MED{i}",
+        hire_date=date(2015, 6, 1), is_active=True, created_at=CREATED
+    ),
+    appointment.Appointment: lambda i: Appointment(
+        appointment_id=i, patient_id=i, doctor_id=i, appointment_date=CREATED,
+        status="Scheduled", reason="Checkup", created_at=CREATED
+    ),
+    medical_record.MedicalRecord: lambda i: MedicalRecord(
+        record_id=i, patient_id=i, doctor_id=i, visit_date=date(2024, 1, 1), diagnosis="Hypertension",
+        treatment="Lifestyle changes", notes="Follow up", follow_up_date=date(2024, 2, 1), created_at=CREATED
+    ),
+    prescription.Prescription: lambda i: Prescription(
+        prescription_id=i, patient_id=i, doctor_id=i, medication_name="Lisinopril", dosage="10mg",
+        frequency="Daily", start_date=date(2024, 1, 1), end_date=date(2024, 6, 1), created_at=CREATED
+    ),
+    billing.Billing: lambda i: Billing(
+        bill_id=i, patient_id=i, appointment_id=i, service_date=date(2024, 1, 1),
+        amount=Decimal("150.00"), status="Pending", insurance_info="Blue Cross", created_at=CREATED
+    ),
+    inventory.Inventory: lambda i: Inventory(
+        item_id=i, item_name="Gauze", category="Supplies", quantity=100, unit_price=Decimal("2.50"),
+        expiration_date=date(2026, 1, 1), supplier="MedSupply", created_at=CREATED
+    ),
+}
+
+def per_row_microseconds(fn, items, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(items)
+    return (time.perf_counter() - started) / (repeat * len(items)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'schema':<16} {'model us/row':>14} {'fast us/row':>12} {'speedup':>8}")
+    for schema, make_row in ROWS.items():
+        items = [make_row(i) for i in range(args.rows)]
+        adapter = TypeAdapter(List[schema])
+        encoder = encoder_for(schema)
+
+        def validated(rows):
+            return json.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")).encode()
+
+        assert json.loads(validated(items)) == json.loads(encoder.encode(items))
+        model = per_row_microseconds(validated, items, args.repeat)
+        fast = per_row_microseconds(encoder.encode, items, args.repeat)
+        print(f"{schema.__name__:<16} {model:>14.2f} {fast:>12.2f} {model / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Shared fixtures: an in-memory SQLite database with the full schema and a
+FastAPI TestClient wired to it through the get_api_db dependency.
+"""
+import os
+from datetime import date
+
+# The app would otherwise build autocomplete indexes from the real database
+os.environ.setdefault("AUTOCOMPLETE_WARMUP", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.config import Base
+from src.api.sessions import get_api_db
+from src.api.main import app
+from src.crud import doctor_autocomplete, doctor_schedule, entity_cache, patient_autocomplete
+from src.models import Patient, Doctor
+
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    # Every test gets a fresh database, so cached rows must not leak across
+    if entity_cache is not None:
+        entity_cache.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def clear_autocomplete():
+    patient_autocomplete.clear()
+    doctor_autocomplete.clear()
+    doctor_schedule.clear()
+    yield
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_api_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def patient(db):
+    obj = Patient(
+        first_name="John", last_name="Doe", date_of_birth=date(1985, 3, 15),
+        gender="Male", phone="+1234567890", email="john.doe@email.com"
+    )
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+@pytest.fixture
+def doctor(db):
+    obj = Doctor(
+        first_name="Robert", last_name="Johnson", specialization="Cardiology",
+        phone="+1234567892", email="robert.johnson@hospital.com",
+        license_number="MED123456", hire_date=date(2020, 1, 15)
+    )
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
@@ -0,0 +1,128 @@
+"""
+Booking stress test: thousands of concurrent bookings aimed at a handful of
+doctor slots, each through its own connection to one SQLite file (or a
+PostgreSQL database, with POSTGRES_TEST_URL set), must leave no two live
+appointments overlapping.
+"""
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import anyio
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from database.config import SCHEDULE_SLOT_MINUTES, Base
+from src.crud import appointment_crud
+from src.crud.appointment import BookingConflict
+from src.models import Appointment, Doctor, Patient
+from src.schemas.appointment import AppointmentCreate
+
+BOOKINGS = 2000
+DOCTORS = 3
+PATIENTS = 200
+SLOT_STARTS = [datetime(2030, 1, 7, 9) + timedelta(minutes=minutes) for minutes in (0, 10, 30, 45, 60)]
+
+def overlaps(rows):
+    slot = timedelta(minutes=SCHEDULE_SLOT_MINUTES)
+    return [
+        (a, b) for i, a in enumerate(rows) for b in rows[i + 1:]
+        if (a.doctor_id == b.doctor_id or a.patient_id == b.patient_id)
+        and abs(a.appointment_date - b.appointment_date) < slot
+    ]
+
+def seed(factory):
+    with factory() as db:
+        db.add_all(
+            Doctor(
+                first_name="Doctor", last_name=str(i), specialization="Cardiology", phone=f"+1000{i}",
+                email=f"doctor{i}@hospital.com", license_number=f"MED{i}", hire_date=date(2020, 1, 1)
+            )
+            for i in range(1, DOCTORS + 1)
+        )
+        db.add_all(
+            Patient(first_name="Patient", last_name=str(i), date_of_birth=date(1980, 1, 1), phone=f"+2000{i}")
+            for i in range(1, PATIENTS + 1)
+        )
+        db.commit()
+
+def book_concurrently(factory):
+    """Run BOOKINGS random bookings on 16 threads and check the result"""
+    rng = random.Random(0)
+    requests = [
+        AppointmentCreate(
+            patient_id=rng.randint(1, PATIENTS), doctor_id=rng.randint(1, DOCTORS),
+            appointment_date=rng.choice(SLOT_STARTS)
+        )
+        for _ in range(BOOKINGS)
+    ]
+
+    def attempt(obj_in):
+        with factory() as db:
+            try:
+                appointment_crud.create(db, obj_in=obj_in)
+                return True
+            except BookingConflict:
+                return False
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        booked = sum(pool.map(attempt, requests))
+
+    with factory() as db:
+        rows = db.query(Appointment).all()
+    assert len(rows) == booked
+    assert overlaps(rows) == []
+    # Three non-overlapping starts (9:00 or 9:10, 9:30 or 9:45, 10:00) per doctor at most
+    assert 0 < booked <= 3 * DOCTORS
+
+def test_concurrent_bookings_never_overlap(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'bookings.db'}", connect_args={"timeout": 60, "check_same_thread": False},
+        pool_size=16, max_overflow=0
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    seed(factory)
+    book_concurrently(factory)
+    engine.dispose()
+
+@pytest.mark.skipif("POSTGRES_TEST_URL" not in os.environ, reason="set POSTGRES_TEST_URL to a scratch PostgreSQL database")
+def test_concurrent_bookings_never_overlap_on_postgresql():
+    # Advisory locks serialize the bookings; READ COMMITTED alone would not
+    engine = create_engine(os.environ["POSTGRES_TEST_URL"], pool_size=16, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    factory = sessionmaker(bind=engine)
+    seed(factory)
+    try:
+        book_concurrently(factory)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        engine.dispose()
+
+def test_async_sqlite_bookings_take_the_write_lock_first(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bookings.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    seed(sessionmaker(bind=create_engine(url)))
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    obj_in = AppointmentCreate(patient_id=1, doctor_id=1, appointment_date=SLOT_STARTS[0])
+
+    async def book():
+        async with AsyncSession(engine) as db:
+            await db.run_sync(lambda session: appointment_crud.create(session, obj_in=obj_in))
+        await engine.dispose()
+
+    anyio.run(book)
+    assert statements[0] == "BEGIN IMMEDIATE"
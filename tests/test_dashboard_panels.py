@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.config import Base
+from src.models import Appointment, Billing, Doctor, Inventory, Patient
+from src.ui.panels import dashboard_tasks, load_concurrently
+
+def test_tasks_run_concurrently_on_their_own_sessions(session_factory):
+    sessions = []
+
+    def task(db):
+        sessions.append(db)
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+    started = time.perf_counter()
+    results, timings = load_concurrently({f"panel{i}": task for i in range(5)}, session_factory, max_workers=5)
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == [f"panel{i}" for i in range(5)]
+    assert len(set(results.values())) == 5
+    assert len({id(db) for db in sessions}) == 5
+    assert all(seconds >= 0.2 for seconds in timings.values())
+    assert elapsed < 0.6
+
+def test_failures_surface_after_every_task_finishes(session_factory):
+    finished = []
+
+    def slow(db):
+        time.sleep(0.1)
+        finished.append(True)
+
+    def fail(db):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        load_concurrently({"fail": fail, "slow": slow}, session_factory)
+    assert finished == [True]
+
+def test_dashboard_panels_load_from_one_database(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'dashboard.db'}", connect_args={"check_same_thread": False},
+        pool_size=8, max_overflow=0
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        patient = Patient(first_name="John", last_name="Doe", date_of_birth=date(1985, 3, 15), gender="Male", phone="+1")
+        doctor = Doctor(
+            first_name="Robert", last_name="Johnson", specialization="Cardiology", phone="+2", email="rj@hospital.com",
+            license_number="MED1", hire_date=date(2020, 1, 15)
+        )
+        db.add_all([patient, doctor])
+        db.flush()
+        db.add(Appointment(
+            patient_id=patient.patient_id, doctor_id=doctor.doctor_id, appointment_date=datetime(2024, 5, 2, 10),
+            status="Completed"
+        ))
+        db.add(Billing(patient_id=patient.patient_id, service_date=date(2024, 5, 2), amount=80, status="Paid"))
+        db.add_all([
+            Inventory(item_name="Gauze", category="Supplies", quantity=5, unit_price=2),
+            Inventory(item_name="Masks", category="Supplies", quantity=100, unit_price=1),
+        ])
+        db.commit()
+
+    results, timings = load_concurrently(dashboard_tasks(date(2024, 5, 1), date(2024, 5, 31), ("Completed",)), factory)
+    engine.dispose()
+
+    assert set(timings) == set(results)
+    assert results["kpis"]["appointments"] == 1
+    assert results["kpis"]["revenue"] == 80.0
+    assert results["appointment_status"] == [{"status": "Completed", "appointments": 1}]
+    assert results["demographics"][0]["patients"] == 1
+    assert [day["amount"] for day in results["revenue"]] == [80]
+    assert results["specializations"] == [{"specialization": "Cardiology", "doctors": 1}]
+    assert [doctor["last_name"] for doctor in results["active_doctors"]] == ["Johnson"]
+    assert [item["item_name"] for item in results["low_stock"]] == ["Gauze"]
+    assert results["inventory_value"] == 110.0
+
+def test_dashboard_tasks_can_be_limited_to_some_panels():
+    tasks = dashboard_tasks(date(2024, 5, 1), date(2024, 5, 31), ("Completed",), panels=("kpis", "low_stock"))
+    assert list(tasks) == ["kpis", "low_stock"]
@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import event, select, text
+from src.models import Appointment, Billing, Doctor, Patient
+from src.ui.queries import (
+    DOCTOR_GRID, PATIENT_GRID, ages, appointment_filters, appointment_status_counts, dashboard_kpis, doctor_filters,
+    grid_page, patient_demographics, patient_filters, years_before
+)
+
+def test_kpis_come_from_one_statement(engine, db, patient, doctor):
+    today = datetime.combine(date.today(), time(10))
+    for when, status in (
+        (today, "Scheduled"), (today - timedelta(days=3), "Completed"),
+        (today - timedelta(days=3), "Cancelled"), (today - timedelta(days=40), "Completed")
+    ):
+        db.add(Appointment(patient_id=patient.patient_id, doctor_id=doctor.doctor_id, appointment_date=when, status=status))
+    db.flush()
+    for days_ago, amount, status in ((1, 100, "Paid"), (2, 50, "Pending"), (60, 70, "Paid")):
+        db.add(Billing(
+            patient_id=patient.patient_id, appointment_id=1, service_date=date.today() - timedelta(days=days_ago),
+            amount=amount, status=status
+        ))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    kpis = dashboard_kpis(
+        db, date.today() - timedelta(days=30), date.today(), statuses=("Scheduled", "Completed")
+    )
+    assert len(statements) == 1
+    assert kpis == {
+        "patients": 1, "active_doctors": 1, "appointments": 2, "todays_appointments": 1, "revenue": 100.0
+    }
+    assert dashboard_kpis(db)["appointments"] == 4
+    assert dashboard_kpis(db)["revenue"] == 170.0
+
+def test_demographics_are_bucketed_in_sql(db):
+    today = date(2024, 2, 29)
+    for i, (born, gender) in enumerate((
+        (date(2014, 2, 28), "Female"),  # turned 10 today (no 29 February in 2014)
+        (date(2014, 3, 1), "Female"),   # still 9
+        (date(1990, 6, 1), None),
+        (date(1930, 1, 1), "Male"),
+        (date(1985, 1, 1), "Male"),
+        (date(1985, 12, 31), "Male"),
+    )):
+        db.add(Patient(first_name="P", last_name=str(i), date_of_birth=born, gender=gender, phone=f"+1{i}"))
+    db.commit()
+
+    assert years_before(today, 10) == date(2014, 2, 28)
+    assert patient_demographics(db, today=today) == [
+        {"gender": "Female", "age_group": "0-9", "patients": 1},
+        {"gender": "Female", "age_group": "10-19", "patients": 1},
+        {"gender": "Male", "age_group": "30-39", "patients": 2},
+        {"gender": "Unknown", "age_group": "30-39", "patients": 1},
+        {"gender": "Male", "age_group": "90+", "patients": 1},
+    ]
+
+def test_panels_follow_the_date_range(db, patient, doctor):
+    other = Patient(first_name="Ann", last_name="Lee", date_of_birth=date(2010, 5, 1), gender="Female", phone="+199")
+    db.add(other)
+    db.flush()
+    for who, day, status in (
+        (patient, date(2024, 5, 1), "Completed"), (patient, date(2024, 5, 31), "Cancelled"),
+        (other, date(2024, 6, 1), "Completed"), (other, date(2024, 4, 30), "Scheduled"),
+    ):
+        db.add(Appointment(
+            patient_id=who.patient_id, doctor_id=doctor.doctor_id,
+            appointment_date=datetime.combine(day, time(23, 30)), status=status
+        ))
+    db.commit()
+
+    may = (date(2024, 5, 1), date(2024, 5, 31))
+    assert appointment_status_counts(db, *may) == [
+        {"status": "Cancelled", "appointments": 1}, {"status": "Completed", "appointments": 1}
+    ]
+    assert appointment_status_counts(db, *may, statuses=("Scheduled",)) == []
+    assert len(appointment_status_counts(db)) == 3
+    # Only patients seen in the period are counted
+    today = date(2024, 7, 1)
+    assert patient_demographics(db, today, *may) == [{"gender": "Male", "age_group": "30-39", "patients": 1}]
+    assert patient_demographics(db, today, date(2024, 4, 1), date(2024, 4, 30)) == [
+        {"gender": "Female", "age_group": "10-19", "patients": 1}
+    ]
+    assert sum(row["patients"] for row in patient_demographics(db, today)) == 2
+
+def test_date_range_uses_the_appointment_date_index(db):
+    query = select(Appointment.status).where(*appointment_filters(date(2024, 5, 1), date(2024, 5, 31)))
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "idx_appointments_date (appointment_date>? AND appointment_date<?)" in plan
+
+def test_patient_grid_pages_in_sql(engine, db):
+    for i in range(25):
+        db.add(Patient(
+            first_name="Ann" if i % 2 else "Bob", last_name=f"Lee{i:02d}", date_of_birth=date(1990, 1, 1 + i),
+            phone=f"+1{i:03d}", email=f"p{i}@example.com"
+        ))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    table, total = grid_page(
+        db, PATIENT_GRID, ("ID", "Name"), patient_filters("ann lee"), sort="Name", descending=True,
+        page=1, page_size=5
+    )
+    assert total == 12
+    assert table.column_names == ["ID", "Name"]
+    assert table.column("Name").to_pylist() == [f"Ann Lee{i:02d}" for i in (13, 11, 9, 7, 5)]
+    # Only the selected columns and one page are fetched
+    assert len(statements) == 2
+    assert "email" not in statements[1].lower()
+    assert "LIMIT" in statements[1]
+
+    table, total = grid_page(db, PATIENT_GRID, ("ID", "Date of Birth"), page=4, page_size=5)
+    assert (total, table.num_rows) == (25, 5)
+    assert table.column("ID").to_pylist() == list(range(21, 26))
+    table, _ = grid_page(db, PATIENT_GRID, list(PATIENT_GRID), patient_filters("%"))
+    assert table.num_rows == 0
+    assert table.column_names == list(PATIENT_GRID)
+
+def test_doctor_grid_filters(db, doctor):
+    db.add(Doctor(
+        first_name="Ada", last_name="Moss", specialization="Neurology", phone="+1999", email="ada@hospital.com",
+        license_number="MED999", hire_date=date(2021, 1, 1), is_active=False
+    ))
+    db.commit()
+
+    table, total = grid_page(db, DOCTOR_GRID, ("Name", "Active"), doctor_filters(active=False))
+    assert total == 1
+    assert table.to_pylist() == [{"Name": "Ada Moss", "Active": False}]
+    _, total = grid_page(db, DOCTOR_GRID, ("ID",), doctor_filters("Cardiology", True))
+    assert total == 1
+
+def test_ages():
+    today = date(2024, 3, 1)
+    assert ages([date(2000, 3, 1), date(2000, 3, 2), None], today) == [24, 23, None]
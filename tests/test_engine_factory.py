@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import exc
+
+from database.config import engine_options, make_engine
+from database.pool import MeteredAsyncQueuePool, MeteredQueuePool, pool_stats
+
+def test_postgres_engines_get_sized_metered_pools():
+    options = engine_options("postgresql://u:p@db/healthcare", pool_size=20)
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["pool_size"] == 20
+    assert options["echo"] is False
+
+    options = engine_options("postgresql+asyncpg://u:p@db/healthcare", is_async=True)
+    assert options["poolclass"] is MeteredAsyncQueuePool
+
+def test_statement_timeout_per_driver():
+    options = engine_options("postgresql://u:p@db/healthcare", statement_timeout=5000)
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    options = engine_options("postgresql+asyncpg://u:p@db/healthcare", is_async=True, statement_timeout=5000)
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    assert "connect_args" not in engine_options("postgresql://u:p@db/healthcare", statement_timeout=0)
+
+def test_sqlite_keeps_its_default_pool():
+    options = engine_options("sqlite://")
+    assert "poolclass" not in options and "pool_size" not in options
+
+def test_pool_telemetry_counts_checkouts_and_timeouts(tmp_path):
+    engine = make_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    with engine.connect():
+        stats = pool_stats(engine.pool)
+        assert (stats["size"], stats["checked_out"]) == (1, 1)
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 0
+    assert (stats["checkouts"], stats["timeouts"]) == (1, 1)
+    assert stats["wait_seconds_max"] >= 0.05
+
+    engine.dispose()
+    assert pool_stats(engine.pool)["checkouts"] == 1
+
+def test_pool_stats_endpoint(client):
+    body = client.get("/health/db-pool").json()
+    assert "pool" in body["sync"]
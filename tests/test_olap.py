@@ -0,0 +1,221 @@
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from database.config import Base
+from src.analytics import export_snapshots
+from src.analytics.olap import ANALYSES, database_frames, run_all, snapshot_frames
+from src.models import Appointment, Billing, Doctor, Inventory, MedicalRecord, Patient, Prescription
+from src.sql_queries.healthcare_queries import HealthcareSQLQueries
+
+TODAY = date(2024, 6, 15)
+
+def at(today, days, hour=9):
+    return datetime.combine(today + timedelta(days=days), time(hour))
+
+def seed(db, today):
+    """
+    A small hospital with distinct sort keys wherever a LIMIT could cut
+    through ties, so SQL and the vectorized analyses must return the same rows
+    """
+    patients = [
+        Patient(first_name=first, last_name=last, date_of_birth=born, gender=gender, phone=f"+10{i}", email=f"p{i}@x.com")
+        for i, (first, last, born, gender) in enumerate([
+            ("Alice", "Adams", date(1950, 2, 10), "Female"),
+            ("Beth", "Baker", date(1980, 7, 4), "Female"),
+            ("Carl", "Clark", date(1999, 12, 31), "Male"),
+            ("Dana", "Diaz", date(2001, 5, 5), "Female"),
+            ("Evan", "Evans", date(1970, 1, 20), "Male"),
+            ("Faye", "Ford", date(1995, 9, 9), "Female"),
+        ])
+    ]
+    doctors = [
+        Doctor(
+            first_name=first, last_name=last, specialization=specialization, phone=f"+20{i}", email=f"d{i}@x.com",
+            license_number=f"MED{i}", hire_date=date(2015, 1, 1), is_active=active
+        )
+        for i, (first, last, specialization, active) in enumerate([
+            ("Greg", "Grant", "Cardiology", True),
+            ("Hana", "Hill", "Cardiology", True),
+            ("Ivan", "Irwin", "Neurology", True),
+            ("Jill", "Jones", "Dermatology", False),
+        ])
+    ]
+    db.add_all(patients + doctors)
+    db.flush()
+    p = [patient.patient_id for patient in patients]
+    d = [doctor.doctor_id for doctor in doctors]
+
+    appointments = [
+        Appointment(
+            patient_id=p[patient], doctor_id=d[doctor], appointment_date=at(today, days, 9 + i % 3),
+            created_at=at(today, days - 5 - i, 8), status=status, reason=f"Visit {i}"
+        )
+        for i, (patient, doctor, days, status) in enumerate([
+            (0, 0, -60, "Completed"), (1, 0, -45, "Completed"), (2, 0, -30, "Completed"), (4, 1, -20, "Completed"),
+            (0, 1, -10, "Cancelled"), (1, 0, 1, "Scheduled"), (3, 2, 2, "Scheduled"), (5, 0, 3, "Scheduled"),
+        ])
+    ]
+    db.add_all(appointments)
+    db.flush()
+    db.add_all([
+        Billing(
+            patient_id=p[patient], appointment_id=appointments[appointment].appointment_id,
+            service_date=today + timedelta(days=days), amount=Decimal(amount), status=status,
+            insurance_info=insurer, created_at=at(today, days)
+        )
+        for patient, appointment, days, amount, status, insurer in [
+            (0, 0, -60, "150.00", "Paid", "Aetna"), (1, 1, -45, "200.00", "Paid", None),
+            (2, 2, -30, "80.00", "Pending", "Aetna"), (4, 3, -20, "120.00", "Paid", "Cigna"),
+            (0, 4, -10, "50.00", "Paid", None), (2, 2, -28, "200.00", "Paid", "Cigna"),
+        ]
+    ])
+    db.add_all([
+        MedicalRecord(
+            patient_id=p[patient], doctor_id=d[doctor], visit_date=today + timedelta(days=days),
+            diagnosis=diagnosis, treatment=diagnosis and f"Treat {diagnosis}"
+        )
+        for patient, doctor, days, diagnosis in [
+            (0, 0, -60, "Hypertension"), (0, 1, -40, "Hypertension follow-up"), (1, 0, -45, "Migraine"),
+            (1, 0, -5, "Migraine"), (2, 0, -30, "Flu"), (2, 2, -27, "Flu"), (4, 1, -20, None),
+        ]
+    ])
+    db.add_all([
+        Prescription(
+            patient_id=p[patient], doctor_id=d[doctor], medication_name=name, dosage="1 tablet",
+            frequency="Daily", start_date=today + timedelta(days=days)
+        )
+        for patient, doctor, name, days in [
+            (0, 0, "Lisinopril 10mg", -60), (1, 0, "Sumatriptan", -45), (2, 0, "Paracetamol", -30),
+            (2, 2, "paracetamol", -27), (4, 1, "Ibuprofen", -20),
+        ]
+    ])
+    db.add_all([
+        Inventory(item_name=name, category=category, quantity=quantity, unit_price=Decimal(price))
+        for name, category, quantity, price in [
+            ("Lisinopril", "Medication", 50, "0.50"), ("Paracetamol", "Medication", 5, "0.10"),
+            ("Ibuprofen", "Medication", 15, "0.20"), ("Sumatriptan", "Medication", 7, "2.50"),
+            ("Gauze", "Supplies", 150, "1.00"), ("Bandage", "Supplies", 30, "0.75"),
+        ]
+    ])
+    db.commit()
+
+def test_window_analyses(db):
+    seed(db, TODAY)
+    results = run_all(database_frames(db), TODAY)
+
+    # Three patients tie at 200 paid: one rank, and one running total for all peers
+    spending = results[8]
+    assert spending.spending_rank.tolist() == [1, 1, 1, 4, 5, 5]
+    assert spending.running_total.tolist() == [600.0, 600.0, 600.0, 720.0, 720.0, 720.0]
+    assert spending.avg_patient_spending.iloc[0] == 120.0
+
+    rankings = results[7]
+    assert rankings.appointment_count.tolist() == [5, 2, 1, 0]
+    assert rankings.percentage_of_total.tolist() == [62.5, 25.0, 12.5, 0.0]
+
+    readmissions = results[12]
+    assert readmissions.patient_name.tolist() == ["Carl Clark", "Alice Adams"]
+    assert readmissions.days_between_visits.tolist() == [3, 20]
+
+def test_olap_analyses(db):
+    seed(db, TODAY)
+    results = run_all(database_frames(db), TODAY)
+
+    cube = results[10].set_index(["month", "specialization", "billing_status"])
+    assert cube.loc[("2024-05", "Cardiology", "Paid"), "total_amount"] == 520.0
+    assert cube.loc[("2024-05", "Cardiology", "All Statuses"), "bill_count"] == 4
+    assert cube.loc[("All Months", "All Specializations", "All Statuses"), "avg_amount"] == 133.33
+    assert len(results[10]) == 20
+
+    demographics = results[11].set_index(["gender", "age_group"])
+    assert demographics.loc[("Female", "Under 30"), "patient_count"] == 2
+    assert demographics.loc[("All Genders", "50+"), "patient_count"] == 2
+    # Percentages are of every output row, subtotals included, as SUM(COUNT(*)) OVER ()
+    assert demographics.loc[("All Genders", "All Age Groups"), "percentage"] == 25.0
+
+def test_inventory_and_performance(db):
+    seed(db, TODAY)
+    results = run_all(database_frames(db), TODAY)
+
+    inventory = results[13]
+    assert inventory.item_name.tolist()[:3] == ["Paracetamol", "Sumatriptan", "Ibuprofen"]
+    # Both spellings match, and 5 // 2 truncates as integer division does in SQL
+    assert inventory.monthly_prescriptions.tolist()[0] == 2
+    assert inventory.months_of_supply.tolist()[0] == 2
+
+    performance = results[14].set_index("doctor_name")
+    assert performance.index.tolist() == ["Greg Grant", "Hana Hill", "Ivan Irwin"]
+    assert performance.loc["Greg Grant", "completion_rate_percent"] == 60.0
+    assert performance.loc["Greg Grant", "unique_patients"] == 4
+    assert performance.loc["Greg Grant", "avg_appointments_per_patient"] == 0.8
+    assert performance.loc["Ivan Irwin", "completion_rate_percent"] == 0.0
+
+def test_snapshots_and_database_give_the_same_results(db, tmp_path):
+    seed(db, TODAY)
+    export_snapshots(db, str(tmp_path), now=datetime.utcnow() + timedelta(days=1), lag=0)
+    from_database = run_all(database_frames(db), TODAY)
+    from_snapshots = run_all(snapshot_frames(str(tmp_path)), TODAY)
+    for number in ANALYSES:
+        pd.testing.assert_frame_equal(from_snapshots[number], from_database[number], check_dtype=False)
+
+# Columns each query orders by (as output), so their sequence must match too
+ORDER_KEYS = {
+    1: ["age"], 2: ["doctor_count"], 3: ["total_appointments"], 4: ["appointment_date"],
+    5: ["patient_name", "visit_date"], 6: ["amount"], 7: ["rank_by_appointments"], 8: ["spending_rank"],
+    9: ["month"], 10: ["month", "specialization", "billing_status"], 11: ["gender", "age_group"],
+    12: ["days_between_visits"], 13: ["stock_status", "months_of_supply"], 14: ["total_appointments"],
+    15: ["revenue_date"],
+}
+
+def normalized(frame):
+    def value(cell):
+        if cell is None or (isinstance(cell, float) and pd.isna(cell)) or cell is pd.NaT:
+            return None
+        if isinstance(cell, (Decimal, float, int)) and not isinstance(cell, bool):
+            return round(float(cell), 6)
+        if isinstance(cell, (date, pd.Timestamp)):
+            return pd.Timestamp(cell)
+        return cell
+    return [tuple(value(cell) for cell in row) for row in frame.astype(object).itertuples(index=False)]
+
+@pytest.mark.skipif("POSTGRES_TEST_URL" not in os.environ, reason="set POSTGRES_TEST_URL to a scratch PostgreSQL database")
+def test_parity_with_postgresql(tmp_path):
+    engine = create_engine(os.environ["POSTGRES_TEST_URL"])
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        today = connection.execute(text("SELECT CURRENT_DATE")).scalar()
+
+    # Collect the SQL of every query instead of printing its results
+    queries = {}
+    tester = HealthcareSQLQueries()
+    tester.execute_query = lambda description, sql, params=None: queries.setdefault(int(description.split(".")[0]), sql)
+    for suite in (tester.test_basic_queries, tester.test_advanced_joins, tester.test_window_functions,
+                  tester.test_olap_queries, tester.test_complex_analytics):
+        suite()
+    tester.close_connection()
+
+    with sessionmaker(bind=engine)() as db:
+        seed(db, today)
+        export_snapshots(db, str(tmp_path), now=datetime.utcnow() + timedelta(days=1), lag=0)
+        frames = database_frames(db)
+    snapshots = snapshot_frames(str(tmp_path))
+    try:
+        for number, analysis in ANALYSES.items():
+            with engine.connect() as connection:
+                expected = pd.read_sql(text(queries[number]), connection)
+            for source in (frames, snapshots):
+                actual = analysis(source, today)
+                assert actual.columns.tolist() == expected.columns.tolist(), number
+                assert sorted(normalized(actual), key=repr) == sorted(normalized(expected), key=repr), number
+                keys = ORDER_KEYS[number]
+                assert normalized(actual[keys]) == normalized(expected[keys]), number
+    finally:
+        engine.dispose()
@@ -0,0 +1,131 @@
+"""
+Replica routing against two SQLite files standing in for the primary and
+a replica; the replica is given different data so reads show where they ran.
+"""
+from datetime import date
+
+import anyio
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from database.config import Base
+from database.routing import ReplicaSet, RoutingSession
+from src.api.sessions import get_routed_db
+from src.crud import CRUDPatient, EntityCache
+from src.models import Patient
+
+def make_database(path, first_name):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Patient(first_name=first_name, last_name="Doe", date_of_birth=date(1985, 3, 15), phone="+1234567890"))
+        db.commit()
+    return engine
+
+@pytest.fixture
+def primary(tmp_path):
+    return make_database(tmp_path / "primary.db", "Primary")
+
+@pytest.fixture
+def replicas(tmp_path):
+    return ReplicaSet([make_database(tmp_path / "replica1.db", "Replica1"), make_database(tmp_path / "replica2.db", "Replica2")])
+
+def first_name(db):
+    return db.query(Patient.first_name).filter(Patient.patient_id == 1).scalar()
+
+def test_reads_go_to_replicas_round_robin(primary, replicas):
+    factory = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+    names = []
+    for _ in range(3):
+        with factory() as db:
+            names.append(first_name(db))
+            assert first_name(db) == names[-1]
+    assert names == ["Replica1", "Replica2", "Replica1"]
+
+def test_read_after_write_stays_on_primary(primary, replicas):
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)() as db:
+        assert first_name(db) == "Replica1"
+        db.get(Patient, 1).address = "1 Elm St"
+        db.commit()
+        assert first_name(db) == "Primary"
+        assert db.get(Patient, 1, populate_existing=True).address == "1 Elm St"
+
+def test_raw_sql_uses_replica_only_for_read_only_sessions(primary, replicas):
+    query = text("SELECT first_name FROM patients")
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)() as db:
+        assert db.execute(query).scalar() == "Primary"
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas, read_only=True)() as db:
+        assert db.execute(query).scalar() == "Replica1"
+
+def test_failover_skips_unreachable_replicas(primary, tmp_path):
+    down = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([down, make_database(tmp_path / "replica.db", "Replica")])
+    factory = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+    for _ in range(2):
+        with factory() as db:
+            assert first_name(db) == "Replica"
+
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=ReplicaSet([down]))() as db:
+        assert first_name(db) == "Primary"
+
+def test_reads_stay_on_primary_for_max_lag_after_a_write(primary, tmp_path):
+    now = [0.0]
+    replicas = ReplicaSet([make_database(tmp_path / "replica.db", "Replica")], max_lag=5, timer=lambda: now[0])
+    factory = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+    replicas.track(factory)
+    with factory() as db:
+        assert first_name(db) == "Replica"
+
+    with factory() as db:
+        db.get(Patient, 1).first_name = "Renamed"
+        db.commit()
+    now[0] = 4.9
+    with factory() as db:
+        assert first_name(db) == "Renamed"
+    # Past the lag bound the replica is trusted to have caught up
+    now[0] = 5.0
+    with factory() as db:
+        assert first_name(db) == "Replica"
+
+def test_entity_cache_is_not_filled_from_replica_reads(primary, replicas):
+    crud = CRUDPatient(cache=EntityCache())
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)() as db:
+        assert crud.get(db, 1).first_name == "Replica1"
+    assert crud.cache.stats()["size"] == 0
+
+    with sessionmaker(bind=primary)() as db:
+        assert crud.get(db, 1).first_name == "Primary"
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)() as db:
+        # Served from the cache, filled by the primary read
+        assert crud.get(db, 1).first_name == "Primary"
+
+@pytest.mark.parametrize("method, routed", [("GET", True), ("HEAD", True), ("POST", False)])
+def test_api_dependency_routes_by_method(method, routed):
+    dependency = get_routed_db(Request({"type": "http", "method": method, "headers": []}))
+    db = next(dependency)
+    assert isinstance(db, RoutingSession) is routed
+    dependency.close()
+
+def test_async_sessions_read_from_async_replicas(tmp_path, primary):
+    make_database(tmp_path / "replica.db", "Replica")
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}", poolclass=NullPool)
+        for name in ("primary.db", "replica.db")
+    ]
+    factory = async_sessionmaker(
+        engines[0], class_=AsyncSession, sync_session_class=RoutingSession,
+        replicas=ReplicaSet([engines[1].sync_engine])
+    )
+    query = select(Patient.first_name).where(Patient.patient_id == 1)
+
+    async def names():
+        async with factory() as db:
+            read = await db.scalar(query)
+            await db.execute(text("UPDATE patients SET last_name = 'Roe'"))
+            return read, await db.scalar(query)
+
+    assert anyio.run(names) == ("Replica", "Primary")